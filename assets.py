@@ -0,0 +1,194 @@
+import hashlib
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+import metrics
+import output
+import transport
+from cache import ResponseCache
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # logos are published as downloaded, without resizing
+    Image = None
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Served by the site alongside public/calendar
+LOGO_DIR = "public/logos"
+LOGO_URL = "/logos"
+
+# Downloaded originals and their ETag/Last-Modified validators
+CACHE_DIR = ".cache/logos"
+
+# Square variants rendered for every logo, in pixels
+SIZES = (64, 128)
+FORMATS = ("webp", "png")
+
+# The variant clubs.json points at; the others sit next to it
+DEFAULT_SIZE = 128
+DEFAULT_FORMAT = "png"
+
+# Hex characters of the sha256 used as a logo's directory name
+DIGEST_LENGTH = 16
+# Part of that hash, so variants rendered differently never reuse old paths
+RENDER_VERSION = 2
+
+# Logos fetched in parallel; the transport's per-host limit still applies
+FETCH_WORKERS = 8
+
+
+# ---------------------------------------------------------------------------
+# Images
+# ---------------------------------------------------------------------------
+
+_SIGNATURES = (
+    (b"\x89PNG", "png"),
+    (b"\xff\xd8", "jpg"),
+    (b"GIF8", "gif"),
+)
+
+
+def sniff(body: bytes) -> str | None:
+    """File extension of an image body, or None if it is not an image."""
+    for magic, ext in _SIGNATURES:
+        if body.startswith(magic):
+            return ext
+
+    if body[:4] == b"RIFF" and body[8:12] == b"WEBP":
+        return "webp"
+
+    head = body[:1024].lstrip().lower()
+    if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head):
+        return "svg"
+
+    return None
+
+
+@metrics.instrument("render_logo")
+def render(body: bytes, size: int, fmt: str) -> bytes:
+    """Scale an image down to fit a transparent size x size square.
+
+    Images smaller than that are never enlarged: the square shrinks to
+    their longest side instead.
+    """
+    with Image.open(io.BytesIO(body)) as image:
+        image = ImageOps.exif_transpose(image).convert("RGBA")
+
+    side = min(size, max(image.size))
+    image = ImageOps.contain(image, (side, side), Image.LANCZOS)
+    canvas = Image.new("RGBA", (side, side), (0, 0, 0, 0))
+    canvas.paste(image, ((side - image.width) // 2, (side - image.height) // 2))
+
+    buf = io.BytesIO()
+    if fmt == "webp":
+        canvas.save(buf, "WEBP", quality=90, method=6)
+    else:
+        canvas.save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Logo store
+# ---------------------------------------------------------------------------
+
+class LogoStore:
+    """Local copies of club logos, addressed by the hash of their content.
+
+    Every distinct URL is downloaded once per run, conditionally on the
+    validators cached from the previous download, and published as
+    {root}/{sha256}/{size}.{webp,png}, at most size pixels square. Teams
+    sharing an image share its files, and a logo replaced upstream gets a
+    new path rather than going stale in browser caches.
+    """
+
+    def __init__(self, root: str = LOGO_DIR, url_prefix: str = LOGO_URL, cache_dir: str = CACHE_DIR):
+        self.root = Path(root)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.cache = ResponseCache(cache_dir)
+        self._lock = threading.Lock()
+        # Remote URL -> local URL, or None when it could not be fetched
+        self._urls: dict[str, str | None] = {}
+
+    def localize(self, urls: list[str]) -> dict[str, str]:
+        """Map remote logo URLs to local ones, fetching those not seen this run."""
+        with self._lock:
+            pending = sorted({url for url in urls if url and url not in self._urls})
+            if pending:
+                with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(pending))) as pool:
+                    self._urls.update(zip(pending, pool.map(self._fetch, pending)))
+
+                missing = sum(1 for url in pending if self._urls[url] is None)
+                if missing:
+                    print(f"⚠️  {missing} logo(s) unavailable, keeping their remote URLs")
+
+            return {url: self._urls[url] for url in urls if self._urls.get(url)}
+
+    def localize_clubs(self, clubs: dict, field: str = "logo") -> dict:
+        """Copy of clubs with each club's logo URL replaced by its local copy."""
+        local = self.localize([club.get(field, "") for club in clubs.values()])
+        return {
+            club_id: {**club, field: local[club[field]]} if club.get(field) in local else club
+            for club_id, club in clubs.items()
+        }
+
+    def _fetch(self, url: str) -> str | None:
+        try:
+            body, _ = transport.fetch_bytes(url, self.cache)
+        except (requests.RequestException, RuntimeError):
+            # Fall back to the copy from an earlier run
+            body = self.cache.load(self.cache.key(url, None))
+
+        if body is None or sniff(body) is None:
+            return None
+
+        try:
+            return self.publish(body)
+        except OSError as e:
+            print(f"⚠️  Could not convert logo {url}: {e}")
+            return None
+
+    def publish(self, body: bytes) -> str:
+        """Write an image's variants and return the URL of the default one."""
+        digest = hashlib.sha256(b"%d:" % RENDER_VERSION + body).hexdigest()[:DIGEST_LENGTH]
+        ext = sniff(body)
+
+        # SVGs scale by themselves
+        if Image is None or ext == "svg":
+            output.write_file(self.root / digest / f"original.{ext}", body)
+            return f"{self.url_prefix}/{digest}/original.{ext}"
+
+        for size in SIZES:
+            for fmt in FORMATS:
+                path = self.root / digest / f"{size}.{fmt}"
+                # Paths are content addressed, so existing variants are final
+                if not output.exists(path):
+                    output.write_file(path, render(body, size, fmt))
+
+        return f"{self.url_prefix}/{digest}/{DEFAULT_SIZE}.{DEFAULT_FORMAT}"
+
+
+# ---------------------------------------------------------------------------
+# State
+# ---------------------------------------------------------------------------
+
+_logos: LogoStore | None = None
+
+
+def set_logos(logos: LogoStore | None) -> None:
+    """Publish local logo copies through logos (None keeps the remote URLs)."""
+    global _logos
+    _logos = logos
+    if logos is not None and Image is None:
+        print("⚠️  Pillow is not installed, logos will not be resized")
+
+
+def get_logos() -> LogoStore | None:
+    return _logos
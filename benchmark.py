@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Time the scrape pipeline stages against synthetic payloads.
+
+Each stage is timed at 1x, 10x and 100x the size of a production union
+(see generate_sample_data.PRODUCTION_SCALE) and the results are written
+as JSON so runs can be compared over time.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import main
+import output
+from registry import ClubRegistry
+from generate_sample_data import PRODUCTION_SCALE, generate_league_table_payload
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+SCALES = (1, 10, 100)
+
+
+# ---------------------------------------------------------------------------
+# Workloads
+# ---------------------------------------------------------------------------
+
+def build_workload(scale: int, seed: int = 0) -> list[bytes]:
+    """Serialized league_table payloads for `scale` production unions."""
+    rng = random.Random(seed)
+    payloads = []
+    for c in range(PRODUCTION_SCALE["competitions"] * scale):
+        payload = generate_league_table_payload(
+            100000 + c,
+            PRODUCTION_SCALE["teams"],
+            PRODUCTION_SCALE["fixtures"],
+            rng,
+        )
+        payloads.append(json.dumps(payload["data"]).encode("utf-8"))
+    return payloads
+
+
+def fresh(payloads: list[bytes]) -> list[dict]:
+    """Decode a new copy of the payloads, since the stages mutate them in place."""
+    return [json.loads(p) for p in payloads]
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+def stage_normalize_fixture(tables: list[dict], _: ClubRegistry) -> int:
+    count = 0
+    for table in tables:
+        table["fixtures"] = [main.normalize_fixture(f) for f in table["fixtures"]]
+        count += len(table["fixtures"])
+    return count
+
+
+def stage_extract_teams(tables: list[dict], clubs: ClubRegistry) -> int:
+    count = 0
+    for table in tables:
+        main.extract_teams_from_league_table(clubs, table["leagueTable"])
+        count += len(table["leagueTable"])
+    return count
+
+
+def stage_create_ics(tables: list[dict], clubs: ClubRegistry) -> int:
+    count = 0
+    for table in tables:
+        for fixture in table["fixtures"]:
+            main.create_ics(fixture, clubs, "bc", "Benchmark League")
+            count += 1
+    return count
+
+
+def stage_dump_json(tables: list[dict], clubs: ClubRegistry) -> int:
+    fixtures = {str(i): t["fixtures"] for i, t in enumerate(tables)}
+    standings = {str(i): t["leagueTable"] for i, t in enumerate(tables)}
+    output.dump_json("clubs.json", clubs.to_json())
+    output.dump_json("fixtures.json", fixtures)
+    output.dump_json("standings.json", standings)
+    return 3
+
+
+@contextlib.contextmanager
+def scratch_dir():
+    """Run inside an empty temporary directory."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def time_stages(payloads: list[bytes], repeat: int) -> dict:
+    """Run every stage `repeat` times, each on freshly decoded payloads."""
+    timings = {
+        "normalize_fixture": [],
+        "extract_teams_from_league_table": [],
+        "create_ics": [],
+        "dump_json": [],
+    }
+    items = {}
+
+    for _ in range(repeat):
+        # Each repetition runs in an empty directory so nothing is skipped
+        # as unchanged by the output manifest.
+        with scratch_dir():
+            tables = fresh(payloads)
+            clubs = ClubRegistry()
+
+            for name, stage in (
+                ("normalize_fixture", stage_normalize_fixture),
+                ("extract_teams_from_league_table", stage_extract_teams),
+                ("create_ics", stage_create_ics),
+                ("dump_json", stage_dump_json),
+            ):
+                start = time.perf_counter()
+                items[name] = stage(tables, clubs)
+                timings[name].append(time.perf_counter() - start)
+
+    return {
+        name: {
+            "items": items[name],
+            "min_s": min(samples),
+            "mean_s": statistics.mean(samples),
+            "per_item_us": min(samples) / max(1, items[name]) * 1e6,
+        }
+        for name, samples in timings.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Entrypoint
+# ---------------------------------------------------------------------------
+
+def run(scales: tuple[int, ...] = SCALES, repeat: int = 3, seed: int = 0) -> dict:
+    results = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "production_scale": PRODUCTION_SCALE,
+        "repeat": repeat,
+        "scales": {},
+    }
+
+    for scale in scales:
+        payloads = build_workload(scale, seed)
+        print(f"⏱️  Scale {scale}x: {len(payloads)} competitions")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            stages = time_stages(payloads, repeat)
+
+        results["scales"][str(scale)] = {
+            "competitions": len(payloads),
+            "payload_bytes": sum(len(p) for p in payloads),
+            "stages": stages,
+        }
+        for name, stats in stages.items():
+            print(f"    {name:<34} {stats['min_s']:8.3f}s  {stats['per_item_us']:9.1f}µs/item")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrape pipeline")
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        type=int,
+        default=list(SCALES),
+        help="Multiples of a production union to benchmark (default: 1 10 100)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="bench_results.json",
+        help="Where to write the JSON results (default: bench_results.json)",
+    )
+    args = parser.parse_args()
+
+    results = run(tuple(args.scales), args.repeat, args.seed)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"✅ Results written to {os.path.abspath(args.output)}")
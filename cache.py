@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Iterable
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+CACHE_DIR = ".cache/http"
+
+# Entries not used for this long are evicted
+MAX_AGE = 30 * 24 * 3600
+
+# Total size of cached bodies before the least recently used are evicted
+MAX_BYTES = 256 * 1024 * 1024
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+class ResponseCache:
+    """On-disk cache of API responses keyed by url + params.
+
+    Each entry is a raw body file plus a small metadata file holding the
+    ETag/Last-Modified validators and a sha256 of the body. The digest is
+    reported for every response, 304s included, so callers can tell an
+    unchanged payload from the one they last published even when the
+    server ignores conditional requests.
+    """
+
+    def __init__(self, root: str = CACHE_DIR, max_age: float = MAX_AGE, max_bytes: int = MAX_BYTES):
+        self.root = Path(root)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, params: dict | None) -> str:
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        raw = json.dumps([url, items], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _body_path(self, key: str) -> Path:
+        return self.root / f"{key}.body"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / f"{key}.meta.json"
+
+    def meta(self, key: str) -> dict | None:
+        """Return the metadata for an entry, or None if it is missing."""
+        try:
+            with open(self._meta_path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def validators(self, key: str) -> dict:
+        """Conditional request headers for an entry."""
+        meta = self.meta(key)
+        if not meta or not self._body_path(key).exists():
+            return {}
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load(self, key: str) -> bytes | None:
+        """Return the cached body and mark the entry as recently used."""
+        try:
+            body = self._body_path(key).read_bytes()
+        except OSError:
+            return None
+
+        meta = self.meta(key) or {}
+        meta["used_at"] = time.time()
+        self._write_meta(key, meta)
+        return body
+
+    def body_path(self, key: str) -> Path | None:
+        """Path of the cached body, marking the entry as recently used; None if missing."""
+        path = self._body_path(key)
+        if not path.exists():
+            return None
+
+        meta = self.meta(key) or {}
+        meta["used_at"] = time.time()
+        self._write_meta(key, meta)
+        return path
+
+    def digest(self, key: str) -> str | None:
+        """sha256 of the cached body, or None if the entry is missing."""
+        return (self.meta(key) or {}).get("hash")
+
+    def store(self, key: str, url: str, params: dict | None, body: bytes, headers) -> str:
+        """Store a fresh body and return its sha256."""
+        digest = hashlib.sha256(body).hexdigest()
+        previous = self.meta(key)
+
+        if not previous or previous.get("hash") != digest or not self._body_path(key).exists():
+            tmp = self._body_path(key).with_suffix(".tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, self._body_path(key))
+
+        self._stored(key, url, params, headers, digest, len(body))
+        return digest
+
+    def store_stream(self, key: str, url: str, params: dict | None, chunks: Iterable[bytes], headers) -> str:
+        """Like store, but for a body read in chunks and written straight to disk."""
+        digest = hashlib.sha256()
+        size = 0
+        tmp = self._body_path(key).with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+        digest = digest.hexdigest()
+        os.replace(tmp, self._body_path(key))
+
+        self._stored(key, url, params, headers, digest, size)
+        return digest
+
+    def _stored(self, key: str, url: str, params: dict | None, headers, digest: str, size: int) -> None:
+        now = time.time()
+        self._write_meta(key, {
+            "url": url,
+            "params": {str(k): str(v) for k, v in (params or {}).items()},
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "hash": digest,
+            "size": size,
+            "fetched_at": now,
+            "used_at": now,
+        })
+
+    def _write_meta(self, key: str, meta: dict) -> None:
+        tmp = self._meta_path(key).with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(key))
+
+    def evict(self) -> int:
+        """Remove stale entries and trim the cache to max_bytes."""
+        now = time.time()
+        entries = []
+        for meta_path in self.root.glob("*.meta.json"):
+            key = meta_path.name[: -len(".meta.json")]
+            meta = self.meta(key) or {}
+            entries.append((meta.get("used_at", 0), meta.get("size", 0), key))
+
+        removed = 0
+        total = sum(size for _, size, _ in entries)
+        for used_at, size, key in sorted(entries):
+            if now - used_at <= self.max_age and total <= self.max_bytes:
+                continue
+            self._body_path(key).unlink(missing_ok=True)
+            self._meta_path(key).unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            print(f"🧹 Evicted {removed} cached response(s)")
+        return removed
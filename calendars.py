@@ -0,0 +1,311 @@
+import hashlib
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+PRODID = "-//clubrugby.ca//clubrugby-data//EN"
+
+EVENT_DURATION = timedelta(hours=2)
+ALARM_TRIGGER = "-PT3H"
+
+# RFC 5545 3.1: content lines are folded at 75 octets
+MAX_LINE_OCTETS = 75
+
+# "fast" renders iCalendar text directly, "ics" goes through the ics library
+BACKENDS = ("fast", "ics")
+
+DAY = 24 * 3600
+
+_backend = "fast"
+# Days before and after now whose fixtures get standalone calendars (None: no limit)
+_retention: tuple[int | None, int | None] = (None, None)
+# Remove fixture calendars that are no longer published
+_collect = True
+
+
+def set_backend(backend: str) -> None:
+    """Select the calendar renderer used by render_fixture."""
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown calendar backend: {backend}")
+    _backend = backend
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def set_retention(past_days: int | None, future_days: int | None, collect: bool = True) -> None:
+    """Limit standalone calendars to fixtures kicking off within the window.
+
+    Finished fixtures keep their calendar for past_days, and fixtures are
+    only published future_days ahead. With collect, calendars outside the
+    window or of fixtures that no longer exist are deleted after a run.
+    """
+    global _retention, _collect
+    _retention = (past_days, future_days)
+    _collect = collect
+
+
+def collect_enabled() -> bool:
+    return _collect
+
+
+def retention_window(now: float | None = None) -> tuple[float | None, float | None]:
+    """(earliest, latest) kickoff timestamps of the fixtures to publish."""
+    if now is None:
+        now = datetime.now(timezone.utc).timestamp()
+    past_days, future_days = _retention
+    return (
+        None if past_days is None else now - past_days * DAY,
+        None if future_days is None else now + future_days * DAY,
+    )
+
+
+def in_window(fixture: dict, window: tuple[float | None, float | None]) -> bool:
+    """Whether a fixture kicks off within window; undated fixtures always do."""
+    kickoff = fixture.get("fixtureDate")
+    if not isinstance(kickoff, (int, float)):
+        return True
+    start, end = window
+    return (start is None or kickoff >= start) and (end is None or kickoff <= end)
+
+
+# ---------------------------------------------------------------------------
+# Formatting
+# ---------------------------------------------------------------------------
+
+_TEXT_ESCAPES = str.maketrans({
+    "\\": "\\\\",
+    ";": "\\;",
+    ",": "\\,",
+    "\n": "\\n",
+})
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT property value (RFC 5545 3.3.11)."""
+    return value.replace("\r\n", "\n").translate(_TEXT_ESCAPES)
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line into CRLF-separated chunks of at most 75 octets."""
+    if line.isascii():
+        if len(line) <= MAX_LINE_OCTETS:
+            return line
+        # Continuation lines start with a space, which counts toward the limit
+        step = MAX_LINE_OCTETS - 1
+        chunks = [line[:MAX_LINE_OCTETS]]
+        chunks += [line[i:i + step] for i in range(MAX_LINE_OCTETS, len(line), step)]
+        return "\r\n ".join(chunks)
+
+    if len(line.encode("utf-8")) <= MAX_LINE_OCTETS:
+        return line
+
+    chunks = []
+    current = []
+    size = 0
+    limit = MAX_LINE_OCTETS
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > limit:
+            chunks.append("".join(current))
+            current = []
+            size = 0
+            limit = MAX_LINE_OCTETS - 1
+        current.append(char)
+        size += width
+    chunks.append("".join(current))
+
+    return "\r\n ".join(chunks)
+
+
+_DTSTAMP_LINE = re.compile(r"^DTSTAMP:[^\r\n]*\r?\n", re.MULTILINE)
+
+
+def content_digest(text: str) -> str:
+    """Hash a rendered calendar, ignoring DTSTAMP which changes every run."""
+    return hashlib.sha256(_DTSTAMP_LINE.sub("", text).encode("utf-8")).hexdigest()
+
+
+def format_utc(dt: datetime) -> str:
+    """Format a datetime as an RFC 5545 UTC DATE-TIME."""
+    return dt.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+def fixture_url(fixture: dict, union: str) -> str:
+    return f"https://clubrugby.ca/{union}#/fixture/{fixture['fixtureId']}"
+
+
+def fixture_event_lines(
+    fixture: dict,
+    home: str,
+    away: str,
+    union: str,
+    league_name: str = "",
+    dtstamp: datetime | None = None,
+) -> list[str]:
+    """Render a normalized fixture as the folded lines of one VEVENT."""
+    if dtstamp is None:
+        dtstamp = datetime.now(timezone.utc)
+
+    start_dt = datetime.fromtimestamp(fixture["fixtureDate"], tz=timezone.utc)
+    end_dt = start_dt + EVENT_DURATION
+    url = fixture_url(fixture, union)
+
+    description = (
+        f"{league_name}\n"
+        f"{home} vs {away}\n\n"
+        f"Match details:\n"
+        f"{url}"
+    )
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{fixture['fixtureId']}@clubrugby.ca",
+        f"DTSTAMP:{format_utc(dtstamp)}",
+        f"DTSTART:{format_utc(start_dt)}",
+        f"DTEND:{format_utc(end_dt)}",
+        f"SUMMARY:{escape_text(f'{home} vs {away}')}",
+    ]
+
+    location = fixture.get("venue", "TBD")
+    if location:
+        lines.append(f"LOCATION:{escape_text(location)}")
+
+    lat = fixture.get("venuelat")
+    lng = fixture.get("venuelng")
+    if lat and lng:
+        lines.append(f"GEO:{float(lat):f};{float(lng):f}")
+
+    lines += [
+        f"DESCRIPTION:{escape_text(description)}",
+        f"URL:{url}",
+        "BEGIN:VALARM",
+        "ACTION:DISPLAY",
+        "DESCRIPTION:",
+        f"TRIGGER:{ALARM_TRIGGER}",
+        "END:VALARM",
+        "END:VEVENT",
+    ]
+
+    return [fold_line(line) for line in lines]
+
+
+def render_calendar(events: Iterable[list[str]], name: str | None = None) -> str:
+    """Wrap rendered VEVENTs in a VCALENDAR."""
+    parts = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+    ]
+    if name:
+        parts.append(fold_line(f"X-WR-CALNAME:{escape_text(name)}"))
+
+    for event in events:
+        parts.extend(event)
+
+    parts.append("END:VCALENDAR")
+    return "\r\n".join(parts) + "\r\n"
+
+
+def render_fixture_ics(
+    fixture: dict,
+    home: str,
+    away: str,
+    union: str,
+    league_name: str = "",
+    dtstamp: datetime | None = None,
+) -> str:
+    """Render a fixture through the ics library (slow fallback)."""
+    from ics import Calendar, Event, DisplayAlarm
+
+    start_dt = datetime.fromtimestamp(fixture["fixtureDate"], tz=timezone.utc)
+
+    c = Calendar()
+    e = Event()
+
+    e.uid = f"{fixture['fixtureId']}@clubrugby.ca"
+    e.name = f"{home} vs {away}"
+    e.begin = start_dt
+    e.end = start_dt + EVENT_DURATION
+
+    e.location = fixture.get("venue", "TBD")
+
+    lat = fixture.get("venuelat")
+    lng = fixture.get("venuelng")
+    if lat and lng:
+        e.geo = (float(lat), float(lng))
+
+    e.description = (
+        f"{league_name}\n"
+        f"{home} vs {away}\n\n"
+        f"Match details:\n"
+        f"{fixture_url(fixture, union)}"
+    )
+
+    e.url = fixture_url(fixture, union)
+    e.created = dtstamp or datetime.now(timezone.utc)
+
+    # reminder
+    e.alarms = [DisplayAlarm(trigger=timedelta(hours=-3))]
+
+    c.events.add(e)
+
+    return c.serialize()
+
+
+def render_fixture(
+    fixture: dict,
+    home: str,
+    away: str,
+    union: str,
+    league_name: str = "",
+    dtstamp: datetime | None = None,
+    event: list[str] | None = None,
+) -> str:
+    """Render a single-fixture calendar with the selected backend.
+
+    event may pass in lines already rendered by fixture_event_lines.
+    """
+    if _backend == "ics":
+        return render_fixture_ics(fixture, home, away, union, league_name, dtstamp)
+    if event is None:
+        event = fixture_event_lines(fixture, home, away, union, league_name, dtstamp)
+    return render_calendar([event])
+
+
+# ---------------------------------------------------------------------------
+# Aggregated feeds
+# ---------------------------------------------------------------------------
+
+class FeedIndex:
+    """Rendered events grouped by club and by league, for subscription feeds."""
+
+    def __init__(self):
+        self.clubs: dict[str, list[tuple]] = {}
+        self.leagues: dict[str, list[tuple]] = {}
+
+    def add(self, fixture: dict, event: list[str], league_id) -> None:
+        entry = (fixture["fixtureDate"], str(fixture["fixtureId"]), event)
+
+        club_ids = {fixture["home"].get("club_id"), fixture["away"].get("club_id")}
+        for club_id in club_ids:
+            if club_id:
+                self.clubs.setdefault(str(club_id), []).append(entry)
+
+        self.leagues.setdefault(str(league_id), []).append(entry)
+
+    @staticmethod
+    def render(entries: list[tuple], name: str | None = None) -> str:
+        """Render a feed with events in kickoff order."""
+        return render_calendar((event for *_, event in sorted(entries, key=lambda e: e[:2])), name=name)
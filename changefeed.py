@@ -0,0 +1,174 @@
+import json
+import os
+from datetime import datetime, timezone
+from typing import Callable, Mapping
+
+import output
+import shards
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Written next to manifest.json in every output directory
+CHANGES_FILE = "changes.jsonl"
+CURSOR_FILE = "cursor.json"
+
+# Fixture fields whose changes are reported as a reschedule or a score change;
+# any other difference is reported as fixture_updated.
+SCHEDULE_KEYS = ("fixtureDate", "venue", "venuelat", "venuelng", "date", "time")
+SCORE_KEYS = ("status", "home", "away", "home_score", "away_score")
+
+
+# ---------------------------------------------------------------------------
+# Diffing
+# ---------------------------------------------------------------------------
+
+def _by_key(groups: dict, key: Callable[[dict], object]) -> dict:
+    """Flatten {league_id: [record, ...]} into {(league_id, key(record)): record}."""
+    return {
+        (str(league_id), key(item)): item
+        for league_id, items in groups.items()
+        for item in items
+    }
+
+
+def _fixture_id(fixture: dict):
+    return fixture.get("fixtureId")
+
+
+def _team_id(row: dict):
+    return row.get("team_id")
+
+
+def _changed_fields(old: dict, new: dict, keys) -> dict:
+    return {key: new.get(key) for key in keys if old.get(key) != new.get(key)}
+
+
+def diff_fixtures(old: dict, new: dict, key: Callable[[dict], object] = _fixture_id) -> list[dict]:
+    """Change events between two {league_id: [fixture, ...]} snapshots."""
+    old_fixtures = _by_key(old, key)
+    new_fixtures = _by_key(new, key)
+    events = []
+
+    for (league_id, fixture_id), fixture in new_fixtures.items():
+        ids = {"league": league_id, "fixtureId": fixture_id}
+        previous = old_fixtures.get((league_id, fixture_id))
+
+        if previous is None:
+            events.append({"type": "fixture_added", **ids, "fixture": fixture})
+            continue
+        if previous == fixture:
+            continue
+
+        schedule = _changed_fields(previous, fixture, SCHEDULE_KEYS)
+        if schedule:
+            events.append({"type": "fixture_rescheduled", **ids, "changes": schedule})
+
+        score = _changed_fields(previous, fixture, SCORE_KEYS)
+        if score:
+            events.append({"type": "score_changed", **ids, "changes": score})
+
+        other = [key for key in fixture.keys() | previous.keys() if key not in SCHEDULE_KEYS and key not in SCORE_KEYS]
+        rest = _changed_fields(previous, fixture, sorted(other))
+        if rest:
+            events.append({"type": "fixture_updated", **ids, "changes": rest})
+
+    for league_id, fixture_id in old_fixtures.keys() - new_fixtures.keys():
+        events.append({"type": "fixture_removed", "league": league_id, "fixtureId": fixture_id})
+
+    return events
+
+
+def diff_standings(old: dict, new: dict) -> list[dict]:
+    """Change events between two {league_id: [table row, ...]} snapshots."""
+    old_rows = _by_key(old, _team_id)
+    new_rows = _by_key(new, _team_id)
+    events = []
+
+    for (league_id, team_id), row in new_rows.items():
+        ids = {"league": league_id, "team_id": team_id}
+        previous = old_rows.get((league_id, team_id))
+
+        if previous is None:
+            events.append({"type": "table_row_added", **ids, "row": row})
+        elif previous != row:
+            changes = _changed_fields(previous, row, sorted(row.keys() | previous.keys()))
+            events.append({"type": "table_row_changed", **ids, "changes": changes})
+
+    for league_id, team_id in old_rows.keys() - new_rows.keys():
+        events.append({"type": "table_row_removed", "league": league_id, "team_id": team_id})
+
+    return events
+
+
+# ---------------------------------------------------------------------------
+# Feed
+# ---------------------------------------------------------------------------
+
+def read_cursor(output_dir: str) -> dict:
+    return output.load_json(os.path.join(output_dir, CURSOR_FILE)) or {"seq": 0, "offset": 0, "updated_at": None}
+
+
+def record(
+    output_dir: str,
+    fixtures: Mapping,
+    standings: Mapping,
+    fixture_key: Callable[[dict], object] = _fixture_id,
+) -> int:
+    """Append the changes since the snapshot in output_dir; returns how many.
+
+    Must run before the new fixtures and standings are written, as the
+    files on disk are the previous snapshot. Without a previous snapshot the
+    run is taken as the baseline and nothing is appended.
+
+    Each line of changes.jsonl is one event carrying a sequence number that
+    increases by one per event. cursor.json holds the last sequence number
+    and the byte size of changes.jsonl, so consumers can poll the cursor and
+    fetch only the new tail of the feed with a Range request.
+
+    fixture_key identifies a fixture across runs, for sources whose
+    fixtures have no fixtureId.
+
+    Leagues are compared one at a time, old and new, so only a single
+    league of either snapshot is in memory at once.
+    """
+    snapshot = shards.snapshot_leagues(output_dir)
+    if snapshot is None:
+        return 0
+
+    fixture_events = []
+    table_events = []
+    league_ids = [str(league_id) for league_id in fixtures]
+    for league_id in league_ids + [league_id for league_id in snapshot if league_id not in league_ids]:
+        old_fixtures, old_standings = snapshot[league_id]() if league_id in snapshot else ([], [])
+
+        # Round-trip through JSON so in-memory values compare like the loaded ones
+        new_fixtures = json.loads(json.dumps(fixtures.get(league_id, [])))
+        new_standings = json.loads(json.dumps(standings.get(league_id, [])))
+
+        fixture_events += diff_fixtures({league_id: old_fixtures}, {league_id: new_fixtures}, fixture_key)
+        table_events += diff_standings({league_id: old_standings}, {league_id: new_standings})
+
+    events = fixture_events + table_events
+    if not events:
+        return 0
+
+    cursor = read_cursor(output_dir)
+    seq = cursor["seq"]
+    at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    lines = []
+    for event in events:
+        seq += 1
+        lines.append(json.dumps({"seq": seq, "at": at, **event}, ensure_ascii=False, separators=(",", ":")))
+
+    offset = output.append_file(os.path.join(output_dir, CHANGES_FILE), "\n".join(lines) + "\n")
+    output.write_file(
+        os.path.join(output_dir, CURSOR_FILE),
+        json.dumps({"seq": seq, "offset": offset, "updated_at": at}),
+    )
+
+    print(f"📰 Appended {len(events)} change(s) to {CHANGES_FILE} (seq {seq})")
+    return len(events)
@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Journal of the sportsmanager scrape, kept until a run completes cleanly
+CHECKPOINT_PATH = ".cache/checkpoint.jsonl"
+
+
+# ---------------------------------------------------------------------------
+# Journal
+# ---------------------------------------------------------------------------
+
+class Journal:
+    """Append-only record of the work a run has finished.
+
+    Entries are keys such as ("bc", "2026") or ("bc", "2026", "133291"),
+    with the sha256 of the response body they were built from (None
+    without a response cache, see transport.fetch_json). Each line is
+    synced as it is written, so the journal survives whatever stopped the
+    run. Without resume the previous journal is discarded; a run that
+    completes calls clear().
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH, resume: bool = False):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, ...], str | None] = {}
+        self.started_at: str | None = None
+
+        if resume:
+            self._read()
+        else:
+            self.clear()
+
+    def _read(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The last line may have been cut short by the interruption
+                continue
+            self._entries[tuple(entry["key"])] = entry.get("digest")
+            self.started_at = self.started_at or entry.get("at")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def done(self, *key) -> bool:
+        return tuple(str(part) for part in key) in self._entries
+
+    def digest(self, *key) -> str | None:
+        return self._entries.get(tuple(str(part) for part in key))
+
+    def record(self, *key, digest: str | None = None) -> None:
+        key = tuple(str(part) for part in key)
+        entry = {
+            "key": list(key),
+            "digest": digest,
+            "at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._entries[key] = digest
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
@@ -1,10 +1,22 @@
 #!/usr/bin/env python3
-"""Generate minimal sample data for testing purposes."""
+"""Generate sample data for testing and benchmarking.
 
+Two kinds of data are produced:
+
+* minimal site data (clubs/leagues/fixtures/standings JSON) for every union,
+* raw sportsmanager API payloads (``competitions`` and ``league_table``)
+  at a configurable scale, written as a replay archive for
+  ``main.py --replay``.
+"""
+
+import argparse
 import json
-import os
+import random
 from pathlib import Path
 
+import main
+import transport
+
 
 SAMPLE_DATA = {
     "clubs": {
@@ -121,5 +133,241 @@ def generate_sample_data(output_dir: str = "src/data", year: int = 2026) -> None
         print(f"✅ Generated sample data for {union} {year}")
 
 
+# ---------------------------------------------------------------------------
+# Raw API payloads
+# ---------------------------------------------------------------------------
+
+# Sizes of a typical production union
+PRODUCTION_SCALE = {
+    "competitions": 6,
+    "teams": 8,
+    "fixtures": 56,
+}
+
+CLUB_NAMES = [
+    "Ravens", "Blues", "Titans", "Carabins", "Gaiters", "Stingers",
+    "Rouge et Or", "Vulkins", "Cheetahs", "Trappeurs", "Dynamiques",
+    "Piranhas", "Gee-Gees", "Diablos", "Lauréats", "Volontaires",
+]
+
+VENUES = [
+    ("Brockton Oval, Stanley Park", 49.2976, -123.1205),
+    ("Stade Émile-Legault", 45.5134, -73.6819),
+    ("Twin Elm Rugby Park", 45.2611, -75.8128),
+    ("Ellerslie Rugby Park", 53.4288, -113.5152),
+    ("Wanderers Grounds; Halifax", 44.6459, -63.5838),
+]
+
+OFFICIAL_ROLES = ["Referee", "Assistant Referee 1", "Assistant Referee 2"]
+
+SEASON_START = 1777000000  # late April 2026
+
+
+def generate_competitions_payload(user_id: int, season_id: str, competitions: int) -> dict:
+    """Build a feedType=competitions payload with the given number of competitions."""
+    comps = []
+    for c in range(competitions):
+        comps.append({
+            "fixtureid": str(user_id * 1000 + c),
+            "name": f"{main.UNIONS.get(user_id, 'XX')} Division {c + 1} ",
+            "shortname": f"D{c + 1}",
+            "compLogo": "",
+            "Description": "",
+            "groupid": "1",
+            "seasonid": season_id,
+            "type": "league",
+            "gender": "male" if c % 2 == 0 else "female",
+            "displayStats": "1",
+            "organisationType": "union",
+            "competitionLevel": "senior",
+            "teamType": "club",
+            "comment": "",
+            "sportid": "5",
+            "sport": "Rugby Union",
+        })
+
+    return {"data": {str(user_id): comps}}
+
+
+def generate_groups_payload(user_id: int, season_id: str) -> dict:
+    """Build a feedType=competitions&type=groups payload with one active season."""
+    years = [
+        {"seasonid": str(int(season_id) - 1), "active": "no"},
+        {"seasonid": season_id, "active": "yes"},
+    ]
+    return {"settings": {"season": {str(user_id): {"year": years}}}}
+
+
+def _team(competition_id: int, t: int) -> dict:
+    club_id = 50000 + (competition_id % 1000) // 2 * 100 + t
+    return {
+        "team_id": competition_id * 100 + t,
+        "club_id": club_id,
+        "name": f"{CLUB_NAMES[club_id % len(CLUB_NAMES)]} {club_id}",
+    }
+
+
+def generate_league_table_payload(competition_id: int, teams: int, fixtures: int, rng: random.Random) -> dict:
+    """Build a feedType=fixture&type=league_table payload."""
+    roster = [_team(competition_id, t) for t in range(teams)]
+
+    table = []
+    for pos, team in enumerate(roster, start=1):
+        won = rng.randint(0, 10)
+        table.append({
+            "team_id": team["team_id"],
+            "club_id": team["club_id"],
+            "team": f" {team['name']} ",
+            "club_logo": f"https://example.invalid/logos/{team['club_id']}.png",
+            "pos": pos,
+            "played": 10,
+            "won": won,
+            "drawn": 0,
+            "lost": 10 - won,
+            "pointsFor": rng.randint(50, 400),
+            "pointsAgainst": rng.randint(50, 400),
+            "bonusPoints": rng.randint(0, 6),
+            "points": won * 4,
+            "goalsFor": 0, "goalsAgainst": 0, "goalsDifference": 0,
+            "bonusPointsM": 0, "teamDeduction": 0, "setQuotient": 0,
+            "scoresFor": 0, "scoresAgainst": 0, "scoredraw": 0,
+            "scorelessdraw": 0, "scoreRatio": 0, "3-0": 0, "3-1": 0,
+            "3-2": 0, "2-3": 0, "1-3": 0, "0-3": 0, "gamesBehind": 0,
+            "fpp": 0, "fieldingpoints": 0, "inningsbatted": 0,
+            "inningsfielded": 0, "runrate": 0,
+        })
+
+    fixture_list = []
+    for f in range(fixtures):
+        home, away = rng.sample(roster, 2)
+        played = f < fixtures // 2
+        venue, lat, lng = rng.choice(VENUES)
+        fixture = {
+            "fixtureId": competition_id * 1000 + f,
+            "fixtureDate": SEASON_START + f * 3 * 86400 + rng.randint(0, 8) * 3600,
+            "compYear": "2026",
+            "venue": venue,
+            "venuelat": str(lat),
+            "venuelng": str(lng),
+            "status": "result" if played else "fixture",
+            "homeTeamId": home["team_id"],
+            "homeClubId": home["club_id"],
+            "homeTeam": home["name"],
+            "homeClub": home["name"],
+            "homeClubLogo": "",
+            "homeClubAlternateName": "",
+            "homeScore": f"{rng.randint(0, 60)};{rng.randint(0, 8)}" if played else "",
+            "homeDrop": "0" if played else None,
+            "homePen": str(rng.randint(0, 4)) if played else None,
+            "homeConv": str(rng.randint(0, 6)) if played else None,
+            "homeResult": rng.choice("WLD") if played else "",
+            "homeTeamComment": "",
+            "homeTeamApproval": "",
+            "awayTeamId": away["team_id"],
+            "awayClubId": away["club_id"],
+            "awayTeam": away["name"],
+            "awayClub": away["name"],
+            "awayClubLogo": "",
+            "awayClubAlternateName": "",
+            "awayScore": f"{rng.randint(0, 60)};{rng.randint(0, 8)}" if played else None,
+            "awayDrop": "0" if played else None,
+            "awayPen": str(rng.randint(0, 4)) if played else None,
+            "awayConv": str(rng.randint(0, 6)) if played else None,
+            "awayResult": rng.choice("WLD") if played else "",
+            "awayTeamComment": "",
+            "awayTeamApproval": "",
+            "matchOfficials": {
+                str(i): {"role": role, "name": f"Official {rng.randint(1, 500)}"}
+                for i, role in enumerate(OFFICIAL_ROLES, start=1)
+            },
+            "competitionId": competition_id, "competitionName": "", "postponed": "0",
+            "tournamentFixture": "0", "sports": "", "fixtureComment": "",
+            "competitionShortName": "", "competitionGroupId": "", "displayWLD": "1",
+            "countyName": "", "ageid": "", "ageName": "", "gender": "", "round": str(f // 4 + 1),
+            "adminnote": "", "metaData": {}, "competitioncomment": "",
+            "competitionDispResults": "1", "scoreMetadata": {}, "officials": "",
+            "streaming": "",
+        }
+        fixture_list.append(fixture)
+
+    return {
+        "settings": {"sport": "rugby"},
+        "data": {
+            "leagueTable": table,
+            "fixtures": fixture_list,
+            "liveLeagueTable": [],
+            "pendingTeams": [],
+        },
+    }
+
+
+def generate_payloads(
+    unions: int = len(main.UNIONS),
+    competitions: int = PRODUCTION_SCALE["competitions"],
+    teams: int = PRODUCTION_SCALE["teams"],
+    fixtures: int = PRODUCTION_SCALE["fixtures"],
+    season_id: str = "2026",
+    seed: int = 0,
+) -> list[tuple[dict, dict]]:
+    """Return (params, payload) pairs for every request a scrape would make."""
+    rng = random.Random(seed)
+    user_ids = list(main.UNIONS)[:unions]
+
+    payloads = []
+    for user_id in user_ids:
+        payloads.append((
+            {"feedType": "competitions", "user_id": user_id, "type": "groups"},
+            generate_groups_payload(user_id, season_id),
+        ))
+
+        comps = generate_competitions_payload(user_id, season_id, competitions)
+        payloads.append((
+            {"feedType": "competitions", "type": "competitions", "user_id": user_id, "seasonid": season_id},
+            comps,
+        ))
+
+        for comp in comps["data"][str(user_id)]:
+            competition_id = comp["fixtureid"]
+            payloads.append((
+                {"feedType": "fixture", "competition_id": competition_id, "type": "league_table"},
+                generate_league_table_payload(int(competition_id), teams, fixtures, rng),
+            ))
+
+    return payloads
+
+
+def generate_archive(archive_dir: str, **scale) -> None:
+    """Write synthetic payloads as a replay archive for main.py --replay."""
+    transport.set_record_dir(archive_dir)
+    payloads = generate_payloads(**scale)
+    for params, payload in payloads:
+        transport.record(main.API_URL, params, payload)
+
+    print(f"✅ Wrote {len(payloads)} synthetic responses to {archive_dir}")
+
+
 if __name__ == "__main__":
-    generate_sample_data()
+    parser = argparse.ArgumentParser(description="Generate sample data")
+    parser.add_argument(
+        "--archive",
+        metavar="DIR",
+        help="Write raw API payloads as a replay archive instead of site data",
+    )
+    parser.add_argument("--unions", type=int, default=len(main.UNIONS))
+    parser.add_argument("--competitions", type=int, default=PRODUCTION_SCALE["competitions"])
+    parser.add_argument("--teams", type=int, default=PRODUCTION_SCALE["teams"])
+    parser.add_argument("--fixtures", type=int, default=PRODUCTION_SCALE["fixtures"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.archive:
+        generate_archive(
+            args.archive,
+            unions=args.unions,
+            competitions=args.competitions,
+            teams=args.teams,
+            fixtures=args.fixtures,
+            seed=args.seed,
+        )
+    else:
+        generate_sample_data()
@@ -0,0 +1,161 @@
+import json
+import os
+import re
+from typing import Iterator
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Characters read from the file at a time
+CHUNK_SIZE = 64 * 1024
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+# What may follow a complete value
+_DELIMITERS = frozenset(" \t\n\r,:]}")
+
+
+class _Reader:
+    """A window over a JSON text that only ever holds the value being decoded."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or "" at the end of the input."""
+        while True:
+            self.pos = _whitespace.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected: str) -> None:
+        if self.peek() != expected:
+            raise ValueError(f"Expected {expected!r} in JSON stream, found {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut off by the end of the window decodes as a shorter one
+            if (end == len(self.buf) or self.buf[end] not in _DELIMITERS) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def elements(self) -> Iterator:
+        """Decode an array one element at a time."""
+        self.take("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON stream, found {separator!r}")
+
+    def skip(self) -> None:
+        # Arrays are skipped element by element so a large one is never held
+        if self.peek() == "[":
+            for _ in self.elements():
+                pass
+        else:
+            self.value()
+
+    def items(self, path: tuple[str, ...]) -> Iterator:
+        """Yield the elements of the array at path, which starts at the current value."""
+        if not path:
+            if self.peek() == "[":
+                yield from self.elements()
+            elif self.value() is not None:
+                raise ValueError("JSON stream path does not lead to an array")
+            return
+
+        if self.peek() != "{":
+            self.skip()
+            return
+
+        self.take("{")
+        while self.peek() != "}":
+            key = self.value()
+            self.take(":")
+            if key == path[0]:
+                yield from self.items(path[1:])
+                return
+            self.skip()
+            if self.peek() == ",":
+                self.pos += 1
+
+
+def iter_items(path: str, keys: tuple[str, ...]) -> Iterator:
+    """Yield the elements of the array at keys in the JSON file at path.
+
+    Only one element is decoded at a time, so memory does not grow with
+    the size of the file. A missing key or null yields nothing.
+    """
+    with open(path, encoding="utf-8") as f:
+        yield from _Reader(f).items(keys)
+
+
+# ---------------------------------------------------------------------------
+# Documents
+# ---------------------------------------------------------------------------
+
+class Document:
+    """A JSON object on disk whose arrays are decoded on demand.
+
+    doc["fixtures"] iterates the array at root + ("fixtures",) straight
+    from the file, so a payload can be walked several times without ever
+    being decoded whole. Documents are small and picklable, so they can be
+    handed to worker processes instead of the data.
+    """
+
+    __slots__ = ("path", "root", "temporary")
+
+    def __init__(self, path: str, root: tuple[str, ...] = (), temporary: bool = False):
+        self.path = path
+        self.root = tuple(root)
+        # Spool files are removed by discard(); cached or archived ones are kept
+        self.temporary = temporary
+
+    def __getitem__(self, key: str) -> Iterator:
+        return iter_items(self.path, self.root + (key,))
+
+    def discard(self) -> None:
+        if self.temporary:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
@@ -1,15 +1,24 @@
 import argparse
+import itertools
 import json
 import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Iterable
-
-import requests
-
-# ics
-from ics import Calendar, Event, DisplayAlarm
-from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Iterable, Iterator
+
+import calendars
+import checkpoint
+import jsonstream
+import metrics
+import output
+import providers
+import shards
+import store
+from registry import ClubRegistry
+from schema import Projection
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -24,6 +33,15 @@ HEADERS = {
     "Referer": "https://diffusion.rseq.ca/",
 }
 
+# Standalone fixture calendars; club/<year>/ and league/<year>/ hold the subscription feeds
+CALENDAR_DIR = "public/calendar"
+
+# Seasons that were closed when fully scraped, per union
+CLOSED_SEASONS_PATH = ".cache/closed_seasons.json"
+
+# Competitions handed to --workers ahead of the one being written
+PROCESS_AHEAD = 2 * (os.cpu_count() or 1)
+
 # Rugby unions
 UNIONS = {
     13329: "BC",
@@ -41,62 +59,148 @@ UNIONS = {
 # ICS
 # ---------------------------------------------------------------------------
 
-def create_ics(fixture: dict, clubs: dict, union: str, league_name: str = "") -> None:
-    home = clubs.get(str(fixture['home']['club_id']), {}).get('name', 'Home Team')
-    away = clubs.get(str(fixture['away']['club_id']), {}).get('name', 'Away Team')
+def render_ics(
+    fixture: dict,
+    clubs: ClubRegistry,
+    union: str,
+    league_name: str = "",
+    full: bool = True,
+) -> tuple[list[str], str | None]:
+    """Render a fixture's VEVENT lines and, if full, its standalone calendar."""
+    home = clubs.team_name(fixture['home']['team_id'], fixture['home']['club_id'], 'Home Team')
+    away = clubs.team_name(fixture['away']['team_id'], fixture['away']['club_id'], 'Away Team')
 
-    start_dt = datetime.fromtimestamp(
-        fixture["fixtureDate"],
-        tz=timezone.utc
-    )
+    event = calendars.fixture_event_lines(fixture, home, away, union, league_name)
+    if not full:
+        return event, None
 
-    end_dt = start_dt + timedelta(hours=2)
+    return event, calendars.render_fixture(fixture, home, away, union, league_name, event=event)
 
-    c = Calendar()
-    e = Event()
 
-    e.uid = f"{fixture['fixtureId']}@clubrugby.ca"
-    e.name = f"{home} vs {away}"
-    e.begin = start_dt
-    e.end = end_dt
+def write_ics(fixture_id, text: str, digest: str | None = None) -> None:
+    out = Path(f"{CALENDAR_DIR}/{fixture_id}.ics")
+    output.write_file(out, text, digest=digest or calendars.content_digest(text))
 
-    e.location = fixture.get("venue", "TBD")
 
-    lat = fixture.get("venuelat")
-    lng = fixture.get("venuelng")
-    if lat and lng:
-        e.geo = (float(lat), float(lng))
+@metrics.instrument("create_ics")
+def create_ics(fixture: dict, clubs: ClubRegistry, union: str, league_name: str = "", write: bool = True) -> list[str]:
+    """Write the fixture's calendar and return its rendered VEVENT lines."""
+    event, text = render_ics(fixture, clubs, union, league_name, full=write)
 
-    e.description = (
-        f"{league_name}\n"
-        f"{home} vs {away}\n\n"
-        f"Match details:\n"
-        f"https://clubrugby.ca/{union}#/fixture/{fixture['fixtureId']}"
-    )
+    if text is not None:
+        write_ics(fixture["fixtureId"], text)
+
+    return event
+
+
+def write_feeds(feeds: calendars.FeedIndex, clubs: ClubRegistry, leagues: dict, year) -> None:
+    """Write the per-club and per-league subscription calendars of one union/year.
 
-    e.url = f"https://clubrugby.ca/{union}#/fixture/{fixture['fixtureId']}"
-    e.created = datetime.now(timezone.utc)
+    Feeds are kept per year, so backfilling several seasons (or skipping
+    the unchanged ones) never leaves a club's feed with a single season.
+    """
+    league_names = {str(k): v for k, v in leagues.items()}
 
-    # reminder
-    e.alarms = [DisplayAlarm(trigger=timedelta(hours=-3))]
+    for club_id, entries in feeds.clubs.items():
+        text = feeds.render(entries, clubs.name(club_id) or None)
+        out = Path(f"{CALENDAR_DIR}/club/{year}/{club_id}.ics")
+        output.write_file(out, text, digest=calendars.content_digest(text))
 
-    c.events.add(e)
+    for league_id, entries in feeds.leagues.items():
+        text = feeds.render(entries, league_names.get(league_id))
+        out = Path(f"{CALENDAR_DIR}/league/{year}/{league_id}.ics")
+        output.write_file(out, text, digest=calendars.content_digest(text))
 
-    out = Path(f'public/calendar/{fixture["fixtureId"]}.ics')
-    out.parent.mkdir(parents=True, exist_ok=True)
+    print(f"📆 Built {len(feeds.clubs)} club and {len(feeds.leagues)} league calendar feeds")
 
-    out.write_text(c.serialize())
+
+_CALENDAR_FILE = re.compile(r"([^/.]+)\.ics(?:\.gz|\.br)?")
+
+
+def published_calendars() -> frozenset[str]:
+    """IDs of the fixtures with a standalone calendar, per the output manifest."""
+    names = (key.rsplit("/", 1)[-1] for key in output.tracked(CALENDAR_DIR))
+    return frozenset(match[1] for match in map(_CALENDAR_FILE.fullmatch, names) if match)
+
+
+def collect_calendars() -> int:
+    """Delete the fixture calendars no stored union/year still publishes.
+
+    A calendar goes once its fixture is gone from the store, e.g. removed
+    upstream or in a league that was dropped, or once the fixture falls
+    outside the retention window. Only files recorded in the output
+    manifest are considered, so the directory is never listed.
+    """
+    live = store.get_store().fixture_ids(store.SPORTSMANAGER, *calendars.retention_window())
+    removed = 0
+    for key in output.tracked(CALENDAR_DIR):
+        match = _CALENDAR_FILE.fullmatch(key.rsplit("/", 1)[-1])
+        if match and match[1] not in live and output.remove(key):
+            removed += 1
+
+    if removed:
+        print(f"🧹 Removed {removed} stale fixture calendar file(s)")
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# Provider
+# ---------------------------------------------------------------------------
+
+class SportsManager(providers.Provider):
+    """Union competitions from the sportsmanager data feed."""
+
+    name = "sportsmanager"
+    api_url = API_URL
+    headers = HEADERS
+
+    def __init__(
+        self,
+        user_ids: list[int],
+        target_year: int | None = None,
+        concurrency: int = 1,
+        workers: int = 0,
+        seasons: tuple[int | None, int | None] | None = None,
+        stream: bool = False,
+        resume: bool = False,
+    ):
+        self.user_ids = user_ids
+        self.target_year = target_year
+        self.concurrency = concurrency
+        self.workers = workers
+        self.seasons = seasons
+        self.stream = stream
+        self.known_clubs = ClubRegistry.load()
+        self.closed_seasons = load_closed_seasons()
+        self.journal = checkpoint.Journal(resume=resume)
+
+    def scrape(self) -> None:
+        scrape(
+            user_ids=self.user_ids,
+            target_year=self.target_year,
+            concurrency=self.concurrency,
+            known_clubs=self.known_clubs,
+            workers=self.workers,
+            seasons=self.seasons,
+            closed_seasons=self.closed_seasons,
+            stream=self.stream,
+            journal=self.journal,
+        )
+
+    def finish(self) -> None:
+        self.known_clubs.save()
+        save_closed_seasons(self.closed_seasons)
+        if calendars.collect_enabled():
+            collect_calendars()
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def get_json(params: dict) -> dict:
-    """Perform a GET request and return parsed JSON."""
-    response = requests.get(API_URL, params=params, headers=HEADERS)
-    response.raise_for_status()
-    return response.json()
+get_json = SportsManager.get_json
+fetch_json = SportsManager.fetch_json
+fetch_document = SportsManager.fetch_document
 
 
 def pop_keys(obj: dict, keys: Iterable[str]) -> None:
@@ -105,16 +209,12 @@ def pop_keys(obj: dict, keys: Iterable[str]) -> None:
         obj.pop(key, None)
 
 
-def dump_json(path: str, data: dict) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
 # ---------------------------------------------------------------------------
 # Parsing
 # ---------------------------------------------------------------------------
 
-def extract_teams_from_league_table(clubs: dict, league_table: list[dict]) -> None:
+@metrics.instrument("extract_teams_from_league_table")
+def extract_teams_from_league_table(clubs: ClubRegistry, league_table: list[dict]) -> None:
     print(f"🔍 Parsing {len(league_table)} league table entries")
 
     for entry in league_table:
@@ -125,90 +225,16 @@ def extract_teams_from_league_table(clubs: dict, league_table: list[dict]) -> No
             print("⚠️  Skipping entry with missing IDs")
             continue
 
-        club_key = str(club_id)
-
-        # Create the club if it doesn't exist yet
-        if club_key not in clubs:
-            clubs[club_key] = {
-                "name": entry.get("team", "").strip(),
-                "logo": entry.get("club_logo", "").strip(),
-                "team_ids": [],
-            }
-
-        # Add the team_id if we haven't seen it before
-        if team_id not in clubs[club_key]["team_ids"]:
-            clubs[club_key]["team_ids"].append(team_id)
+        # Name and logo only apply when the club is first seen
+        clubs.add_team(
+            club_id,
+            team_id,
+            name=entry.get("team", "").strip(),
+            logo=entry.get("club_logo", "").strip(),
+        )
 
     print(f"✅ Extracted {len(clubs)} unique clubs")
 
-def normalize_fixture(fixture: dict) -> None:
-    if fixture.get("homeScore"):
-        fixture["homeScore"] = fixture["homeScore"].split(";")[0]
-    else:
-        fixture["homeScore"] = "0"
-
-    if fixture.get("awayScore"):
-        fixture["awayScore"] = fixture["awayScore"].split(";")[0]
-    else:
-        fixture["awayScore"] = "0"
-
-    stat_keys = [
-        "homeDrop",
-        "homePen",
-        "homeConv",
-        "awayDrop",
-        "awayPen",
-        "awayConv",
-    ]
-
-    for key in stat_keys:
-        if fixture.get(key) is None:
-            fixture[key] = "0"
-
-    fixture["home"] = {
-        "team_id": fixture.get("homeTeamId"),
-        "club_id": fixture.get("homeClubId"),
-        "score": fixture.get("homeScore", "0"),
-        "drop": fixture.get("homeDrop", "0"),
-        "pen": fixture.get("homePen", "0"),
-        "conv": fixture.get("homeConv", "0"),
-        "result": fixture.get("homeResult", ""),
-    }
-
-    fixture["away"] = {
-        "team_id": fixture.get("awayTeamId"),
-        "club_id": fixture.get("awayClubId"),
-        "score": fixture.get("awayScore", "0"),
-        "drop": fixture.get("awayDrop", "0"),
-        "pen": fixture.get("awayPen", "0"),
-        "conv": fixture.get("awayConv", "0"),
-        "result": fixture.get("awayResult", ""),
-    }
-
-    FIXTURE_CLEAN_KEYS = {
-        "competitionId", "competitionName", "postponed", "tournamentFixture",
-        "sports", "fixtureComment", "competitionShortName", "competitionGroupId",
-        "displayWLD", "countyName", "ageid", "ageName", "gender", "round",
-        "adminnote", "metaData", "competitioncomment", "competitionDispResults",
-        "scoreMetadata", "homeTeam", "awayTeam", "homeClub", "awayClub",
-        "homeClubLogo", "awayClubLogo", "homeClubAlternateName",
-        "awayClubAlternateName", "homeTeamComment", "homeTeamApproval",
-        "awayTeamComment", "awayTeamApproval", "officials", "streaming",
-
-        # Old flat home/away keys (now normalized)
-        "homeTeamId", "homeClubId", "homeScore", "homeDrop",
-        "homePen", "homeConv", "homeResult",
-        "awayTeamId", "awayClubId", "awayScore", "awayDrop",
-        "awayPen", "awayConv", "awayResult",
-    }
-
-    pop_keys(fixture, FIXTURE_CLEAN_KEYS)
-
-    fixture["matchOfficials"] = normalize_match_officials(
-        fixture.get("matchOfficials")
-    )
-
-
 def normalize_match_officials(match_officials):
     normalized = []
 
@@ -235,11 +261,94 @@ def normalize_match_officials(match_officials):
     return normalized
 
 
+def normalize_side(prefix: str):
+    """Build the nested home/away record from the flat fixture keys."""
+    team_key = f"{prefix}TeamId"
+    club_key = f"{prefix}ClubId"
+    score_key = f"{prefix}Score"
+    drop_key = f"{prefix}Drop"
+    pen_key = f"{prefix}Pen"
+    conv_key = f"{prefix}Conv"
+    result_key = f"{prefix}Result"
+
+    def side(fixture: dict) -> dict:
+        score = fixture.get(score_key)
+        drop = fixture.get(drop_key)
+        pen = fixture.get(pen_key)
+        conv = fixture.get(conv_key)
+        return {
+            "team_id": fixture.get(team_key),
+            "club_id": fixture.get(club_key),
+            # Scores come as "<points>;<tries>"
+            "score": score.split(";")[0] if score else "0",
+            "drop": "0" if drop is None else drop,
+            "pen": "0" if pen is None else pen,
+            "conv": "0" if conv is None else conv,
+            "result": fixture.get(result_key, ""),
+        }
+
+    return side
+
+
+# Deny-lists: the tree does not record every field upstream sends, and
+# the site may read any of them, so only known noise is left out.
+FIXTURE_PROJECTION = Projection(
+    drop={
+        "competitionId", "competitionName", "postponed", "tournamentFixture",
+        "sports", "fixtureComment", "competitionShortName", "competitionGroupId",
+        "displayWLD", "countyName", "ageid", "ageName", "gender", "round",
+        "adminnote", "metaData", "competitioncomment", "competitionDispResults",
+        "scoreMetadata", "homeTeam", "awayTeam", "homeClub", "awayClub",
+        "homeClubLogo", "awayClubLogo", "homeClubAlternateName",
+        "awayClubAlternateName", "homeTeamComment", "homeTeamApproval",
+        "awayTeamComment", "awayTeamApproval", "officials", "streaming",
+
+        # Old flat home/away keys (now normalized)
+        "homeTeamId", "homeClubId", "homeScore", "homeDrop",
+        "homePen", "homeConv", "homeResult",
+        "awayTeamId", "awayClubId", "awayScore", "awayDrop",
+        "awayPen", "awayConv", "awayResult",
+    },
+    transform={
+        "matchOfficials": normalize_match_officials,
+    },
+    extra={
+        "home": normalize_side("home"),
+        "away": normalize_side("away"),
+    },
+)
+
+COMPETITION_PROJECTION = Projection(
+    drop={
+        "shortname", "compLogo", "Description", "groupid", "seasonid",
+        "type", "gender", "displayStats", "organisationType",
+        "competitionLevel", "teamType", "comment", "sportid", "sport",
+    },
+)
+
+TABLE_ROW_PROJECTION = Projection(
+    drop={
+        "club_logo", "team", "goalsFor", "goalsAgainst", "goalsDifference",
+        "bonusPointsM", "teamDeduction", "setQuotient", "scoresFor",
+        "scoresAgainst", "scoredraw", "scorelessdraw", "scoreRatio",
+        "3-0", "3-1", "3-2", "2-3", "1-3", "0-3", "gamesBehind",
+        "fpp", "fieldingpoints", "inningsbatted", "inningsfielded", "runrate",
+    },
+)
+
+
+@metrics.instrument("normalize_fixture")
+def normalize_fixture(fixture: dict) -> dict:
+    """Return the cleaned, nested form of a raw API fixture."""
+    return FIXTURE_PROJECTION(fixture)
+
+
 # ---------------------------------------------------------------------------
 # Fetchers
 # ---------------------------------------------------------------------------
 
-def fetch_active_season(user_id: int) -> str | None:
+@metrics.instrument("fetch_seasons")
+def fetch_seasons(user_id: int) -> list[dict]:
     data = get_json({
         "feedType": "competitions",
         "user_id": user_id,
@@ -254,15 +363,21 @@ def fetch_active_season(user_id: int) -> str | None:
     )
 
     print(f"📅 Found {len(years)} seasons")
+    return years
+
 
-    for season in years:
+@metrics.instrument("fetch_active_season")
+def fetch_active_season(user_id: int) -> dict | None:
+    """The active season's entry from the groups feed, or None."""
+    for season in fetch_seasons(user_id):
         if season.get("active") == "yes":
             print(f"⭐ Active season: {season.get('seasonid')}")
-            return season.get("seasonid")
+            return season
 
     return None
 
 
+@metrics.instrument("fetch_competitions")
 def fetch_competitions(user_id: int, season_id: int) -> list[dict]:
     data = get_json({
         "feedType": "competitions",
@@ -271,108 +386,548 @@ def fetch_competitions(user_id: int, season_id: int) -> list[dict]:
         "seasonid": season_id,
     })
 
-    competitions = data["data"].get(str(user_id), [])
-
-    CLEAN_KEYS = {
-        "shortname", "compLogo", "Description", "groupid", "seasonid",
-        "type", "gender", "displayStats", "organisationType",
-        "competitionLevel", "teamType", "comment", "sportid", "sport",
-    }
-
-    for comp in competitions:
-        pop_keys(comp, CLEAN_KEYS)
+    competitions = COMPETITION_PROJECTION.many(data["data"].get(str(user_id), []))
 
     print(f"🏆 Loaded {len(competitions)} competitions")
     return competitions
 
 
-def fetch_league_table(competition_id: int) -> dict:
-    data = get_json({
+@metrics.instrument("fetch_league_table")
+def fetch_league_table(competition_id: int, stream: bool = False) -> tuple[dict | jsonstream.Document, str | None]:
+    """The competition's {"fixtures", "leagueTable"} payload and the digest of its body.
+
+    With stream, the response goes to disk and comes back as a Document
+    whose arrays are parsed one record at a time when iterated.
+    """
+    params = {
         "feedType": "fixture",
         "competition_id": competition_id,
         "type": "league_table",
-    })
+    }
+    if stream:
+        return fetch_document(params, root=("data",))
+
+    data, digest = fetch_json(params)
 
     data.pop("settings", None)
     pop_keys(data["data"], {"liveLeagueTable", "pendingTeams"})
 
-    return data["data"]
+    return data["data"], digest
 
 
 # ---------------------------------------------------------------------------
 # Main scrape
 # ---------------------------------------------------------------------------
 
-def scrape(user_ids: list[int], target_year: int | None = None) -> None:
-    if target_year is None:
-        target_year = datetime.now().year
-    
-    print(f"🚀 Starting scrape for {len(user_ids)} union(s) - Year: {target_year}")
-
-    for user_id in user_ids:
-        union_code = UNIONS.get(user_id, "UNKNOWN").lower()
-        output_dir = os.path.join("src/data/", union_code, str(target_year))
-        os.makedirs(output_dir, exist_ok=True)
-
-        leagues: dict = {}
-        clubs: dict = {}
-        fixtures: dict = {}
-        standings: dict = {}
-
-        TABLE_CLEAN_KEYS = {
-            "club_logo", "team", "goalsFor", "goalsAgainst", "goalsDifference",
-            "bonusPointsM", "teamDeduction", "setQuotient", "scoresFor",
-            "scoresAgainst", "scoredraw", "scorelessdraw", "scoreRatio",
-            "3-0", "3-1", "3-2", "2-3", "1-3", "0-3", "gamesBehind",
-            "fpp", "fieldingpoints", "inningsbatted", "inningsfielded", "runrate",
-        }
+def season_year(season: dict) -> int | None:
+    """Best-effort calendar year of a season entry from the groups feed."""
+    for key in ("year", "name", "seasonname", "seasonid"):
+        match = re.search(r"(?:19|20)\d{2}", str(season.get(key) or ""))
+        if match:
+            return int(match.group())
+    return None
 
-        season_id = fetch_active_season(user_id)
+
+def output_year(target_year: int | None = None) -> int:
+    """Year a union's active season is written under: target_year, else the current year."""
+    if target_year is not None:
+        return target_year
+    return datetime.now().year
+
+
+def parse_season_range(spec: str) -> tuple[int | None, int | None]:
+    """Parse --seasons: "all", a single year "2024" or a range "2021-2024"."""
+    if spec.lower() == "all":
+        return None, None
+
+    first, _, last = spec.partition("-")
+    try:
+        lo = int(first)
+        hi = int(last) if last else lo
+    except ValueError:
+        raise ValueError(f"Invalid season range: {spec}") from None
+
+    return lo, hi
+
+
+def plan_union_seasons(
+    user_id: int,
+    target_year: int | None,
+    season_range: tuple[int | None, int | None] | None,
+    closed: Iterable[str] = (),
+) -> list[tuple[str | None, int | str, bool]]:
+    """Return (season_id, output year, closed) for every season to scrape.
+
+    Without a season range only the active season is scraped, into
+    output_year(). Closed seasons listed in `closed` were scraped completely
+    by an earlier run and are never fetched again.
+    """
+    if season_range is None:
+        season = fetch_active_season(user_id)
+        return [(season and season.get("seasonid"), output_year(target_year), False)]
+
+    lo, hi = season_range
+    closed = set(closed)
+    plan = []
+
+    for season in fetch_seasons(user_id):
+        season_id = season.get("seasonid")
         if not season_id:
-            raise RuntimeError("❌ No active season found")
-    
-        competitions = fetch_competitions(user_id, season_id)
-        for comp in competitions:
-            league_id = comp.get("fixtureid")
-            league_name = comp.get("name")
-
-            if not league_id or not league_name:
-                continue
+            continue
 
-            print(f"  📊 Fetching {league_name} ({league_id})")
+        year = season_year(season)
+        if lo is not None and (year is None or not lo <= year <= hi):
+            continue
 
-            leagues[league_id] = league_name.strip()
-            league_data = fetch_league_table(league_id)
+        is_closed = season.get("active") != "yes"
+        if is_closed and str(season_id) in closed:
+            print(f"🔒 Season {season_id} is closed and already scraped, skipping")
+            continue
 
-            extract_teams_from_league_table(clubs, league_data["leagueTable"])
+        plan.append((season_id, year or season_id, is_closed))
+
+    return plan
+
+
+def load_closed_seasons(path: str = CLOSED_SEASONS_PATH) -> dict[str, list[str]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_closed_seasons(closed: dict[str, list[str]], path: str = CLOSED_SEASONS_PATH) -> None:
+    output.atomic_write(path, json.dumps(closed, indent=2, sort_keys=True).encode("utf-8"))
+
+
+def process_competition(
+    union_code: str,
+    league_name: str,
+    league_data: dict,
+    clubs: ClubRegistry,
+    changed: bool,
+    window: tuple[float | None, float | None] = (None, None),
+    published: frozenset[str] | None = None,
+) -> dict:
+    """CPU-bound work for one competition; pure, so it can run in a worker process.
+
+    Returns the normalized fixtures and table rows, each fixture's VEVENT
+    lines, and (fixtureId, text, digest) for every calendar to write.
+    Calendars for unchanged payloads were written on a previous run, but
+    their events are still needed for the aggregated feeds. Only fixtures
+    inside window get a calendar; those missing from published (e.g. that
+    just entered the window) get one even if the payload is unchanged.
+    """
+    fixtures = []
+    events = []
+    ics = []
+
+    for raw in league_data["fixtures"]:
+        fixture = normalize_fixture(raw)
+        full = calendars.in_window(fixture, window) and (
+            changed or (published is not None and str(fixture["fixtureId"]) not in published)
+        )
+        event, text = render_ics(fixture, clubs, union_code, league_name, full=full)
+
+        fixtures.append(fixture)
+        events.append(event)
+        if text is not None:
+            ics.append((fixture["fixtureId"], text, calendars.content_digest(text)))
+
+    return {
+        "fixtures": fixtures,
+        "table": TABLE_ROW_PROJECTION.many(league_data["leagueTable"]),
+        "events": events,
+        "ics": ics,
+    }
 
-            for fixture in league_data["fixtures"]:
-                normalize_fixture(fixture)
-                create_ics(fixture, clubs, union_code, league_name)
 
-            for row in league_data["leagueTable"]:
-                pop_keys(row, TABLE_CLEAN_KEYS)
-            
-            fixtures[league_id] = [
-                f for f in league_data["fixtures"]
-                # TODO - some competitions span multiple years, need to filter by season instead of year
-                # if str(f.get("compYear")) == str(target_year)
-            ]
-            standings[league_id] = league_data["leagueTable"]
+def _process_competition_job(job: tuple) -> dict:
+    return process_competition(*job)
+
+
+def process_competitions(jobs: list[tuple], workers: ProcessPoolExecutor | None = None) -> Iterator[dict]:
+    """process_competition results in job order, produced as they are consumed.
+
+    With workers, at most PROCESS_AHEAD competitions are in flight, so
+    results never pile up faster than they are written.
+    """
+    if workers is None:
+        for job in jobs:
+            with metrics.timed("process_competitions"):
+                result = _process_competition_job(job)
+            yield result
+        return
+
+    jobs = iter(jobs)
+    pending = deque(workers.submit(_process_competition_job, job) for job in itertools.islice(jobs, PROCESS_AHEAD))
+    while pending:
+        with metrics.timed("process_competitions"):
+            result = pending.popleft().result()
+        for job in itertools.islice(jobs, 1):
+            pending.append(workers.submit(_process_competition_job, job))
+        yield result
+
+
+def store_fixture(fixture: dict) -> dict:
+    """Indexed columns of a normalized fixture for the store."""
+    return {
+        "id": fixture["fixtureId"],
+        "date": fixture.get("fixtureDate"),
+        "status": fixture.get("status"),
+        "home_team_id": fixture["home"]["team_id"],
+        "away_team_id": fixture["away"]["team_id"],
+        "home_club_id": fixture["home"]["club_id"],
+        "away_club_id": fixture["away"]["club_id"],
+        "officials": [(o["role"], o["name"]) for o in fixture.get("matchOfficials") or []],
+        "record": fixture,
+    }
 
 
-        dump_json(os.path.join(output_dir, "leagues.json"), leagues)
-        dump_json(os.path.join(output_dir, "clubs.json"), clubs)
-        dump_json(os.path.join(output_dir, "fixtures.json"), fixtures)
-        dump_json(os.path.join(output_dir, "standings.json"), standings)
+def store_table_row(row: dict) -> dict:
+    return {"team_id": row.get("team_id"), "position": row.get("pos"), "record": row}
 
-        print(f"✅ Data saved to {output_dir}")
+
+def export_union(union_code: str, year) -> tuple[dict, dict, dict, dict]:
+    """(leagues, clubs, fixtures, standings) of a union/year as exported from the store."""
+    leagues, club_rows, fixtures, standings = store.get_store().export_union(store.SPORTSMANAGER, union_code, year)
+    clubs_json = {
+        club_id: {"name": club["name"], "logo": club["logo"], "team_ids": team_ids}
+        for club_id, club, team_ids in club_rows
+    }
+    return leagues, clubs_json, fixtures, standings
+
+
+def process_union(
+    union_code: str,
+    year,
+    output_dir: str,
+    results: list[tuple],
+    known_clubs: ClubRegistry | None = None,
+    workers: ProcessPoolExecutor | None = None,
+    completed: list | None = None,
+    refresh: bool = False,
+    digests: dict | None = None,
+) -> None:
+    """Normalize the fetched league tables of one union and write its outputs.
+
+    results holds (league_id, league_name, league_data, changed) per
+    competition, in output order. league_data is the decoded payload or a
+    jsonstream.Document over it. Either way competitions are normalized,
+    rendered and stored one at a time, and the outputs are then exported
+    from the store a league at a time.
+
+    League IDs are appended to completed once their calendars are written.
+    With refresh, the outputs are rewritten even when nothing changed.
+    digests (league_id -> payload digest) are recorded as published in the
+    store once every output is written, so a union that fails partway is
+    rebuilt by the next run.
+    """
+    leagues: dict = {}
+    clubs = ClubRegistry(known=known_clubs)
+    feeds = calendars.FeedIndex()
+
+    for league_id, league_name, *_ in results:
+        leagues[league_id] = league_name.strip()
+
+    # Fixtures enter the retention window as time passes (or when it is
+    # widened) without their payload changing, so calendars are also
+    # checked against the ones already published.
+    # Only this union's stored fixtures can have been published from it.
+    window = calendars.retention_window()
+    db = store.get_store()
+    in_window = db.fixture_ids(store.SPORTSMANAGER, *window, league_ids=leagues)
+    published = frozenset(in_window & published_calendars())
+
+    # Nothing upstream changed since the files and the store were last written
+    stored = db.leagues(store.SPORTSMANAGER, union_code, year)
+    current = stored == {str(league_id): name for league_id, name in leagues.items()}
+    unchanged = not refresh and not any(changed for *_, changed in results)
+    if unchanged:
+        unchanged = in_window <= published
+    if unchanged and current and shards.outputs_current(output_dir, leagues):
+        print(f"⏭️  No changes for {union_code.upper()}, keeping {output_dir}")
+        if completed is not None:
+            completed.extend(leagues)
+        return
+
+    # Clubs are resolved for the whole union first, so every competition
+    # renders with the same names however the work is scheduled.
+    for league_id, _, league_data, _ in results:
+        with metrics.scope(f"{union_code}/{league_id}"):
+            extract_teams_from_league_table(clubs, list(league_data["leagueTable"]))
+
+    # Workers only look up names, so they get the union's clubs without known
+    names = clubs.detached()
+    jobs = [
+        (union_code, league_name, league_data, names, changed, window, published)
+        for _, league_name, league_data, changed in results
+    ]
+
+    # The JSON files are exports of what is stored here
+    with db.union_writer(store.SPORTSMANAGER, union_code, year, leagues) as writer:
+        for (league_id, league_name, _, _), result in zip(results, process_competitions(jobs, workers)):
+            print(f"  📊 Processing {league_name} ({league_id})")
+
+            with metrics.scope(f"{union_code}/{league_id}"):
+                for fixture, event in zip(result["fixtures"], result["events"]):
+                    feeds.add(fixture, event, league_id)
+
+                for fixture_id, text, digest in result["ics"]:
+                    write_ics(fixture_id, text, digest)
+
+                # Competitions are fetched per season, so every fixture here belongs
+                # to the season being written even when it spans two compYears.
+                writer.add_league(
+                    league_id,
+                    [(row["team_id"], row["club_id"]) for row in result["table"] if row.get("team_id") and row.get("club_id")],
+                    [store_fixture(fixture) for fixture in result["fixtures"]],
+                    [store_table_row(row) for row in result["table"]],
+                )
+
+            if completed is not None:
+                completed.append(league_id)
+
+        writer.add_clubs({club_id: {"name": clubs.name(club_id), "logo": clubs.logo(club_id)} for club_id in clubs})
+
+    leagues, clubs_json, fixtures, standings = export_union(union_code, year)
+
+    SportsManager.publish(output_dir, leagues, clubs_json, fixtures, standings)
+    write_feeds(feeds, clubs, leagues, year)
+
+    if known_clubs is not None:
+        known_clubs.merge(clubs)
+
+    if digests:
+        db.set_published(store.SPORTSMANAGER, digests)
+
+    print(f"✅ Data saved to {output_dir}")
+
+
+def checkpoint_union(
+    journal: checkpoint.Journal,
+    union_code: str,
+    year,
+    digests: dict,
+    completed: list,
+    done: bool,
+    known_clubs: ClubRegistry | None,
+    closed_seasons: dict[str, list[str]],
+) -> None:
+    """Persist what a union's processing left behind and journal it.
+
+    Queued writes are flushed and the output hashes saved first, so the
+    journal never gets ahead of what is on disk.
+    """
+    output.save_manifest()
+    for league_id in completed:
+        journal.record(union_code, year, league_id, digest=digests.get(league_id))
+
+    if done:
+        if known_clubs is not None:
+            known_clubs.save()
+        save_closed_seasons(closed_seasons)
+        journal.record(union_code, year)
+
+
+def scrape(
+    user_ids: list[int],
+    target_year: int | None = None,
+    concurrency: int = 1,
+    known_clubs: ClubRegistry | None = None,
+    workers: int = 0,
+    seasons: tuple[int | None, int | None] | None = None,
+    closed_seasons: dict[str, list[str]] | None = None,
+    stream: bool = False,
+    journal: checkpoint.Journal | None = None,
+) -> None:
+    """Scrape and publish every union, each one independently of the others.
+
+    A union whose requests fail keeps its previous outputs while the rest
+    are published; the failures are raised together at the end. With a
+    journal, every finished union is checkpointed, and unions recorded by
+    an interrupted run that is being resumed are skipped.
+    """
+    if target_year is None:
+        target_year = datetime.now().year
+    if closed_seasons is None:
+        closed_seasons = {}
+
+    if seasons is None:
+        print(f"🚀 Starting scrape for {len(user_ids)} union(s) - Year: {target_year}")
+    else:
+        lo, hi = seasons
+        span = "all" if lo is None else f"{lo}-{hi}"
+        print(f"🚀 Starting backfill for {len(user_ids)} union(s) - Seasons: {span}")
+
+    resuming = journal is not None and len(journal) > 0
+    if resuming:
+        print(f"♻️  Resuming the run started at {journal.started_at} ({len(journal)} step(s) done)")
+
+    union_codes = [UNIONS.get(user_id, "UNKNOWN").lower() for user_id in user_ids]
+    failures: list[str] = []
+    db = store.get_store()
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    # With --workers, normalization and calendar rendering run in other processes
+    process_pool = None
+    if workers > 1:
+        process_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=calendars.set_backend,
+            initargs=(calendars.get_backend(),),
+        )
+
+    try:
+        # Requests for every union, season and competition are queued up
+        # front so they overlap; results are consumed below in the original
+        # order so the output files do not depend on completion order.
+        union_plans = [
+            pool.submit(
+                metrics.bind(union_code, plan_union_seasons),
+                user_id,
+                target_year,
+                seasons,
+                closed_seasons.get(union_code, []),
+            )
+            for user_id, union_code in zip(user_ids, union_codes)
+        ]
+
+        jobs = []
+        for user_id, union_code, plan in zip(user_ids, union_codes, union_plans):
+            try:
+                plan = plan.result()
+            except Exception as e:
+                print(f"❌ {union_code.upper()} failed: {e}")
+                failures.append(union_code.upper())
+                continue
+
+            for season_id, year, is_closed in plan:
+                if resuming and journal.done(union_code, year):
+                    print(f"⏩ {union_code.upper()} {year} was completed before the interruption, skipping")
+                    continue
+
+                competitions = None
+                if season_id:
+                    fetch = metrics.bind(union_code, fetch_competitions)
+                    competitions = pool.submit(fetch, user_id, season_id)
+                jobs.append((union_code, season_id, year, is_closed, competitions))
+
+        job_tables = []
+        for union_code, _, _, _, competitions in jobs:
+            try:
+                comps = competitions.result() if competitions else []
+            except Exception as e:
+                # Raised when the union is processed below
+                job_tables.append(e)
+                continue
+
+            tables = []
+            for comp in comps:
+                league_id = comp.get("fixtureid")
+                league_name = comp.get("name")
+
+                if not league_id or not league_name:
+                    continue
+
+                fetch = metrics.bind(f"{union_code}/{league_id}", fetch_league_table)
+                tables.append((league_id, league_name, pool.submit(fetch, league_id, stream)))
+            job_tables.append(tables)
+
+        for (union_code, season_id, year, is_closed, _), tables in zip(jobs, job_tables):
+            output_dir = os.path.join("src/data/", union_code, str(year))
+            os.makedirs(output_dir, exist_ok=True)
+
+            payloads = {}
+            completed = []
+            done = False
+            try:
+                if isinstance(tables, Exception):
+                    raise tables
+                if not season_id:
+                    raise RuntimeError("No active season found")
+
+                # Compared with what was last published, not with what was last
+                # fetched: a union that failed before has cached payloads whose
+                # outputs were never written.
+                published = db.published(store.SPORTSMANAGER, [league_id for league_id, *_ in tables])
+
+                results = []
+                for league_id, league_name, table in tables:
+                    league_data, payload = table.result()
+                    changed = payload is None or payload != published.get(str(league_id))
+                    payloads[league_id] = payload
+                    # The interrupted run may have cached a payload without
+                    # writing its calendars; only trust leagues it finished.
+                    if resuming and journal.digest(union_code, year, league_id) != payload:
+                        changed = True
+                    results.append((league_id, league_name, league_data, changed))
+
+                with metrics.scope(union_code):
+                    process_union(
+                        union_code,
+                        year,
+                        output_dir,
+                        results,
+                        known_clubs,
+                        process_pool,
+                        completed=completed,
+                        refresh=resuming,
+                        digests=payloads,
+                    )
+                done = True
+            except Exception as e:
+                print(f"❌ {union_code.upper()} {year} failed: {e}")
+                failures.append(f"{union_code.upper()} {year}")
+            finally:
+                for _, _, table in tables if isinstance(tables, list) else []:
+                    # Fetches not started yet are dropped
+                    if not table.cancel() and table.exception() is None:
+                        league_data, _ = table.result()
+                        if isinstance(league_data, jsonstream.Document):
+                            league_data.discard()
+
+            # A finished season's data can no longer change
+            if done and is_closed:
+                closed_seasons.setdefault(union_code, []).append(str(season_id))
+
+            if journal is not None:
+                checkpoint_union(journal, union_code, year, payloads, completed, done, known_clubs, closed_seasons)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if process_pool is not None:
+            process_pool.shutdown(wait=True, cancel_futures=True)
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} union(s) failed: {', '.join(failures)}")
+
+    if journal is not None:
+        journal.clear()
 
 
 # ---------------------------------------------------------------------------
 # Entrypoint
 # ---------------------------------------------------------------------------
 
+def resolve_unions(codes: list[str]) -> list[int]:
+    """Convert union codes (or ALL) to user IDs, warning about unknown codes."""
+    code_to_id = {v: k for k, v in UNIONS.items()}
+    user_ids = []
+
+    # Handle --unions ALL
+    if len(codes) == 1 and codes[0].upper() == "ALL":
+        return list(UNIONS.keys())
+
+    for code in codes:
+        if code.upper() in code_to_id:
+            user_ids.append(code_to_id[code.upper()])
+        else:
+            print(f"⚠️  Unknown union code: {code}")
+
+    return user_ids
+
+
 def main():
     parser = argparse.ArgumentParser(description="Scrape rugby union data")
     parser.add_argument(
@@ -387,6 +942,41 @@ def main():
         default=None,
         help="Competition year to filter fixtures (default: current year)",
     )
+    parser.add_argument(
+        "--seasons",
+        type=str,
+        default=None,
+        help="Backfill past seasons: 'all', a year or a range like 2021-2024 (default: active season only)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of API requests to run in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Processes used to normalize fixtures and render calendars (default: in-process)",
+    )
+    parser.add_argument(
+        "--ics-backend",
+        choices=calendars.BACKENDS,
+        default="fast",
+        help="Calendar renderer; 'ics' uses the ics library (default: fast)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream league tables to disk and parse them a record at a time, bounding memory",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Skip the unions an interrupted or failed run already published (journal: {checkpoint.CHECKPOINT_PATH})",
+    )
+    providers.add_shared_arguments(parser)
     args = parser.parse_args()
 
     # Require --unions argument
@@ -394,25 +984,38 @@ def main():
         print("❌ Please specify union codes with --unions (e.g., --unions BC QC AB or --unions ALL)")
         exit(1)
 
-    # Convert union codes to IDs
-    code_to_id = {v: k for k, v in UNIONS.items()}
-    user_ids = []
-    
-    # Handle --unions ALL
-    if len(args.unions) == 1 and args.unions[0].upper() == "ALL":
-        user_ids = list(UNIONS.keys())
-    else:
-        for code in args.unions:
-            if code.upper() in code_to_id:
-                user_ids.append(code_to_id[code.upper()])
-            else:
-                print(f"⚠️  Unknown union code: {code}")
-    
+    user_ids = resolve_unions(args.unions)
     if not user_ids:
         print("❌ No valid union codes provided")
         exit(1)
 
-    scrape(user_ids=user_ids, target_year=args.year)
+    seasons = None
+    if args.seasons:
+        try:
+            seasons = parse_season_range(args.seasons)
+        except ValueError as e:
+            print(f"❌ {e}")
+            exit(1)
+
+    calendars.set_backend(args.ics_backend)
+    providers.configure(args)
+
+    provider = SportsManager(user_ids, args.year, args.concurrency, args.workers, seasons, args.stream, args.resume)
+    failed = False
+    with metrics.profiled(args.profile):
+        try:
+            provider.scrape()
+        except RuntimeError as e:
+            # The other unions were published; keep their state
+            print(f"❌ {e}")
+            failed = True
+    provider.finish()
+
+    providers.finish(args)
+
+    if failed:
+        print("↩️  Re-run with --resume to retry only the failed unions")
+        exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+import cProfile
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+ROOT_SCOPE = "run"
+PROMETHEUS_PREFIX = "clubrugby"
+
+
+# ---------------------------------------------------------------------------
+# State
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+_local = threading.local()
+_scopes: dict[str, dict] = {}
+_started = time.perf_counter()
+_started_at = datetime.now(timezone.utc)
+
+
+def reset() -> None:
+    global _started, _started_at
+    with _lock:
+        _scopes.clear()
+        _started = time.perf_counter()
+        _started_at = datetime.now(timezone.utc)
+
+
+def peak_rss_kb() -> int | None:
+    """Peak resident set size of the whole process so far, in KiB.
+
+    This is a high-water mark, not a per-stage figure: scopes record how
+    much it grew while they ran (see scope()).
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+# ---------------------------------------------------------------------------
+# Scopes
+# ---------------------------------------------------------------------------
+
+def current_scope() -> str:
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else ROOT_SCOPE
+
+
+@contextmanager
+def scope(name: str):
+    """Attribute everything recorded on this thread to `name` (e.g. "bc/1234").
+
+    The scope's peak_rss_growth_kb adds up how far the process peak RSS
+    rose while it was active. Scopes running concurrently on other
+    threads may be credited with the same growth.
+    """
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(name)
+    before = peak_rss_kb()
+    try:
+        yield
+    finally:
+        stack.pop()
+        if before is not None:
+            growth = peak_rss_kb() - before
+            with _lock:
+                data = _scopes.setdefault(name, {})
+                data["peak_rss_growth_kb"] = data.get("peak_rss_growth_kb", 0) + growth
+
+
+def bind(name: str, fn: Callable) -> Callable:
+    """Wrap fn so it runs in scope `name`, for work handed to other threads."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with scope(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+def add(stage: str, seconds: float = 0.0, calls: int = 1, nbytes: int = 0, files: int = 0) -> None:
+    """Add to the counters of a stage in the current scope."""
+    name = current_scope()
+    with _lock:
+        stats = _scopes.setdefault(name, {}).setdefault("stages", {}).setdefault(stage, {
+            "calls": 0,
+            "seconds": 0.0,
+            "bytes": 0,
+            "files": 0,
+        })
+        stats["calls"] += calls
+        stats["seconds"] += seconds
+        stats["bytes"] += nbytes
+        stats["files"] += files
+
+
+@contextmanager
+def timed(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(stage, seconds=time.perf_counter() - start)
+
+
+def instrument(stage: str) -> Callable:
+    """Decorator recording the wall time and call count of a function."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                add(stage, seconds=time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+def _sum_stages(scopes) -> dict:
+    totals: dict[str, dict] = {}
+    for data in scopes:
+        for stage, stats in data.get("stages", {}).items():
+            total = totals.setdefault(stage, {"calls": 0, "seconds": 0.0, "bytes": 0, "files": 0})
+            for key, value in stats.items():
+                total[key] += value
+    return totals
+
+
+def report() -> dict:
+    """Snapshot of everything recorded so far."""
+    with _lock:
+        scopes = json.loads(json.dumps(_scopes))
+
+    return {
+        "started_at": _started_at.isoformat(),
+        "wall_seconds": time.perf_counter() - _started,
+        # Process-wide high-water mark; scopes report their growth of it
+        "peak_rss_kb": peak_rss_kb(),
+        "totals": _sum_stages(scopes.values()),
+        "scopes": dict(sorted(scopes.items())),
+    }
+
+
+def write_report(path: str) -> None:
+    from output import atomic_write
+
+    atomic_write(path, json.dumps(report(), indent=2).encode("utf-8"))
+    print(f"📈 Run report written to {path}")
+
+
+def write_prometheus(path: str) -> None:
+    """Write a node_exporter textfile; scopes are rolled up to the union level."""
+    from output import atomic_write
+
+    data = report()
+
+    unions: dict[str, list[dict]] = {}
+    for name, scope_data in data["scopes"].items():
+        unions.setdefault(name.split("/")[0], []).append(scope_data)
+
+    metrics = {
+        "calls": ("stage_calls_total", "Number of calls per pipeline stage"),
+        "seconds": ("stage_seconds_total", "Wall time spent per pipeline stage"),
+        "bytes": ("stage_bytes_total", "Bytes read or written per pipeline stage"),
+        "files": ("stage_files_total", "Files written per pipeline stage"),
+    }
+
+    lines = []
+    for key, (name, help_text) in metrics.items():
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} counter")
+        for union, scopes in sorted(unions.items()):
+            for stage, stats in sorted(_sum_stages(scopes).items()):
+                lines.append(f'{PROMETHEUS_PREFIX}_{name}{{scope="{union}",stage="{stage}"}} {stats[key]}')
+
+    lines.append(f"# HELP {PROMETHEUS_PREFIX}_run_seconds Wall time of the last run")
+    lines.append(f"# TYPE {PROMETHEUS_PREFIX}_run_seconds gauge")
+    lines.append(f"{PROMETHEUS_PREFIX}_run_seconds {data['wall_seconds']}")
+
+    if data["peak_rss_kb"] is not None:
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_peak_rss_bytes Peak resident memory of the last run")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_peak_rss_bytes gauge")
+        lines.append(f"{PROMETHEUS_PREFIX}_peak_rss_bytes {data['peak_rss_kb'] * 1024}")
+
+    atomic_write(path, ("\n".join(lines) + "\n").encode("utf-8"))
+    print(f"📈 Prometheus metrics written to {path}")
+
+
+@contextmanager
+def profiled(path: str | None):
+    """Run the block under cProfile and dump stats to path (no-op if None)."""
+    if not path:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"🔬 Profile written to {path}")
@@ -0,0 +1,608 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Callable
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # .br siblings are skipped without it
+    brotli = None
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Content hashes of every file written, used to skip unchanged rewrites
+MANIFEST_PATH = ".cache/outputs.json"
+
+# Artifacts that get precompressed siblings for static serving
+COMPRESSIBLE_SUFFIXES = (".json", ".ics")
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Artifacts waiting for the background writer before producers block
+WRITE_QUEUE_SIZE = 256
+# When published files are made durable: never (the OS decides), once per
+# batch of queued writes, or after every file
+FSYNC_POLICIES = ("none", "batch", "always")
+FSYNC_BATCH = 64
+
+
+# ---------------------------------------------------------------------------
+# State
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+_hashes: dict[str, str] | None = None
+_stats = {"written": 0, "skipped": 0, "compressed": 0, "removed": 0}
+# Compact separators instead of indent=2 in encode_json()
+_minify = False
+# Write .gz / .br siblings next to every compressible artifact
+_precompress = False
+_fsync = "none"
+# Background writer, or None to write on the calling thread
+_writer: "BackgroundWriter | None" = None
+
+
+def set_minify(enabled: bool) -> None:
+    global _minify
+    _minify = enabled
+
+
+def set_precompress(enabled: bool) -> None:
+    global _precompress
+    _precompress = enabled
+    if enabled and brotli is None:
+        print("⚠️  brotli is not installed, only .gz files will be written")
+
+
+def options() -> dict:
+    """The settings that change which files are written for the same data, and how."""
+    return {
+        "minify": _minify,
+        "precompress": [suffix for suffix, _ in _compressors()] if _precompress else [],
+    }
+
+
+def set_fsync(policy: str) -> None:
+    global _fsync
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {policy}")
+    _fsync = policy
+
+
+def set_writer(writer: "BackgroundWriter | None") -> None:
+    """Hand artifact writes to writer; the previous one is drained and stopped."""
+    global _writer
+    previous, _writer = _writer, writer
+    if previous is not None:
+        previous.close()
+
+
+def _manifest() -> dict[str, str]:
+    global _hashes
+    if _hashes is None:
+        try:
+            with open(MANIFEST_PATH, encoding="utf-8") as f:
+                _hashes = json.load(f)
+        except (OSError, ValueError):
+            _hashes = {}
+    return _hashes
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+
+def _current_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Read once, as os.umask can only be read by setting it
+_FILE_MODE = 0o666 & ~_current_umask()
+
+
+def _mkstemp(path: Path) -> tuple[int, str]:
+    """Create a temp file next to path with the mode a plain open() would give it.
+
+    mkstemp creates files readable by their owner only, and os.replace
+    keeps that mode, which would hide published files from the web server.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        os.chmod(tmp, _FILE_MODE)
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp)
+        raise
+    return fd, tmp
+
+
+def _write_temp(path: Path, data: bytes | Iterable[bytes]) -> str:
+    """Write data to a temp file next to path and return its name."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = _mkstemp(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if isinstance(data, (bytes, bytearray)):
+                f.write(data)
+            else:
+                for chunk in data:
+                    f.write(chunk)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return tmp
+
+
+def atomic_write(path: str | Path, data: bytes | Iterable[bytes]) -> None:
+    """Write data to a temp file next to path, then rename it into place.
+
+    data may also be an iterable of chunks, written as they are produced.
+    """
+    path = Path(path)
+    tmp = _write_temp(path, data)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _fsync_path(path: str | Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on Windows; their entries are durable anyway
+        if os.path.isdir(path):
+            return
+        raise
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# ---------------------------------------------------------------------------
+# Background writer
+# ---------------------------------------------------------------------------
+
+class _Write:
+    """An artifact on its way to disk, accounted for once it is in place."""
+
+    __slots__ = ("path", "key", "digest", "data", "tmp", "size", "seconds", "stage", "counter", "scope")
+
+    def __init__(self, path, key: str, digest: str, data: bytes | None = None, tmp: str | None = None,
+                 size: int = 0, seconds: float = 0.0, stage: str = "write", counter: str = "written"):
+        self.path = Path(path)
+        self.key = key
+        self.digest = digest
+        self.data = data
+        # Already written by write_chunks, otherwise created from data
+        self.tmp = tmp
+        self.size = len(data) if data is not None else size
+        self.seconds = seconds
+        self.stage = stage
+        self.counter = counter
+        self.scope = metrics.current_scope()
+
+
+def _commit(jobs: list[_Write]) -> float:
+    """Move finished writes into place, synced according to the fsync policy.
+
+    Every file of the batch is made durable before any is renamed, and
+    each directory is synced once after the renames. Returns the seconds
+    spent per write.
+    """
+    start = time.perf_counter()
+    try:
+        for job in jobs:
+            if job.tmp is None:
+                job.tmp = _write_temp(job.path, job.data)
+                job.data = None
+        if _fsync != "none":
+            for job in jobs:
+                _fsync_path(job.tmp)
+        for job in jobs:
+            os.replace(job.tmp, job.path)
+            job.tmp = None
+        if _fsync != "none":
+            for directory in {job.path.parent for job in jobs}:
+                _fsync_path(directory)
+    except BaseException:
+        for job in jobs:
+            if job.tmp is not None and os.path.exists(job.tmp):
+                os.unlink(job.tmp)
+        raise
+
+    return (time.perf_counter() - start) / len(jobs)
+
+
+def _account(job: _Write, seconds: float) -> None:
+    metrics.add(job.stage, seconds=job.seconds + seconds, nbytes=job.size, files=1)
+    with _lock:
+        _manifest()[job.key] = job.digest
+        _stats[job.counter] += 1
+
+
+class BackgroundWriter:
+    """A thread that puts artifacts on disk while the scrape carries on.
+
+    Writes are applied in the order they were queued. put() blocks once
+    `size` of them are waiting, so a slow disk holds the producers back
+    instead of letting rendered files pile up in memory. With the "batch"
+    fsync policy up to FSYNC_BATCH queued writes share one sync point.
+    A failed write is raised from the next put() or flush().
+    """
+
+    def __init__(self, size: int = WRITE_QUEUE_SIZE):
+        self._queue: queue.Queue[_Write | None] = queue.Queue(maxsize=size)
+        self._cond = threading.Condition()
+        # Absolute path -> writes queued for it and not yet in place
+        self._pending: Counter[str] = Counter()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, job: _Write) -> None:
+        self._raise()
+        # The caller may change directory before the write happens
+        job.path = Path(os.path.abspath(job.path))
+        if job.tmp is not None:
+            job.tmp = os.path.abspath(job.tmp)
+        with self._cond:
+            self._pending[str(job.path)] += 1
+        self._queue.put(job)
+
+    def pending(self, path: str | Path) -> bool:
+        with self._cond:
+            return self._pending[os.path.abspath(path)] > 0
+
+    def flush(self, path: str | Path | None = None) -> None:
+        """Wait until everything queued, or everything queued for path, is in place."""
+        name = None if path is None else os.path.abspath(path)
+        with self._cond:
+            self._cond.wait_for(lambda: not (self._pending if name is None else self._pending[name]))
+        self._raise()
+
+    def close(self) -> None:
+        """Drain the queue and stop the thread."""
+        atexit.unregister(self.close)
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise()
+
+    def _raise(self) -> None:
+        with self._cond:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            if _fsync == "batch":
+                while len(batch) < FSYNC_BATCH and batch[-1] is not None:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+            jobs = [job for job in batch if job is not None]
+            try:
+                seconds = _commit(jobs) if jobs else 0.0
+                for job in jobs:
+                    with metrics.scope(job.scope):
+                        _account(job, seconds)
+            except BaseException as e:
+                with self._cond:
+                    self._error = self._error or e
+
+            with self._cond:
+                for job in jobs:
+                    name = str(job.path)
+                    self._pending[name] -= 1
+                    if self._pending[name] <= 0:
+                        del self._pending[name]
+                self._cond.notify_all()
+
+            if batch[-1] is None:
+                return
+
+
+def _store(job: _Write) -> None:
+    if _writer is not None:
+        _writer.put(job)
+    else:
+        _account(job, _commit([job]))
+
+
+def _queued(path: str | Path) -> bool:
+    return _writer is not None and _writer.pending(path)
+
+
+def exists(path: str | Path) -> bool:
+    """Whether path is on disk or queued to be written."""
+    return _queued(path) or os.path.exists(path)
+
+
+def flush(path: str | Path | None = None) -> None:
+    """Wait for queued writes (only those for path, if given) to be in place."""
+    if _writer is not None:
+        _writer.flush(path)
+
+
+def load_json(path: str | Path):
+    """Read back a JSON file written here, or None if it is missing or unreadable."""
+    # The file may still be on its way to disk
+    flush(path)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Artifacts
+# ---------------------------------------------------------------------------
+
+def encode_json(data) -> bytes:
+    """Serialize an output document, minified when set_minify(True)."""
+    if _minify:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _encode_value(value, level: int) -> str:
+    if _minify:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n" + "  " * level)
+
+
+def _lazy(value) -> bool:
+    # Containers json.dumps cannot take: generators and store-backed mappings
+    return isinstance(value, Iterator) or (isinstance(value, Mapping) and not isinstance(value, dict))
+
+
+def iter_json(data, level: int = 0) -> Iterator[str]:
+    """encode_json in pieces, for documents too large to hold encoded.
+
+    The top-level container is written an entry at a time, and so are the
+    values of a top-level object, e.g. the leagues of {league_id: [...]}.
+    Generators and lazily loaded mappings are consumed as they are written;
+    anything deeper is encoded whole. The text matches encode_json's.
+    """
+    if isinstance(data, Mapping):
+        entries = (
+            (json.dumps(key if isinstance(key, str) else json.dumps(key), ensure_ascii=False), value)
+            for key, value in data.items()
+        )
+        brackets = "{}"
+    elif isinstance(data, (list, tuple, Iterator)):
+        entries = ((None, value) for value in data)
+        brackets = "[]"
+    else:
+        yield _encode_value(data, level)
+        return
+
+    if _minify:
+        separator, colon, close = ",", ":", brackets[1]
+    else:
+        separator = ",\n" + "  " * (level + 1)
+        colon = ": "
+        close = "\n" + "  " * level + brackets[1]
+
+    first = True
+    for key, value in entries:
+        yield (brackets[0] + separator[1:]) if first else separator
+        first = False
+        if key is not None:
+            yield key + colon
+        if _lazy(value) or (key is not None and level == 0 and isinstance(value, (dict, list))):
+            yield from iter_json(value, level + 1)
+        else:
+            yield _encode_value(value, level + 1)
+
+    yield brackets if first else close
+
+
+def _compressors() -> list[tuple[str, Callable]]:
+    variants = [(".gz", lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", lambda data: brotli.compress(data, quality=BROTLI_QUALITY)))
+    return variants
+
+
+def _write_compressed(path: str | Path, load: Callable[[], bytes], digest: str) -> None:
+    """Write the precompressed siblings of path unless they match digest already."""
+    data = None
+    for suffix, compress in _compressors():
+        variant = f"{path}{suffix}"
+        key = Path(variant).as_posix()
+        with _lock:
+            unchanged = _manifest().get(key) == digest
+        if unchanged and os.path.exists(variant) and not _queued(variant):
+            continue
+
+        if data is None:
+            data = load()
+        start = time.perf_counter()
+        packed = compress(data)
+        # Counted as a call when the file is in place
+        metrics.add("compress", seconds=time.perf_counter() - start, calls=0)
+        _store(_Write(variant, key, digest, data=packed, stage="compress", counter="compressed"))
+
+
+def write_file(path: str | Path, content: str | bytes, digest: str | None = None) -> bool:
+    """Atomically write content unless the file already holds the same content.
+
+    digest overrides the hash used for the comparison, for content that
+    embeds volatile values (e.g. a calendar DTSTAMP). Returns True if the
+    file was written, or queued to be with a background writer. With
+    set_precompress(True), .gz/.br siblings are regenerated whenever the
+    digest they were built from differs.
+    """
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    if digest is None:
+        digest = hashlib.sha256(data).hexdigest()
+
+    key = Path(path).as_posix()
+    with _lock:
+        unchanged = _manifest().get(key) == digest
+
+    if _precompress and Path(path).suffix in COMPRESSIBLE_SUFFIXES:
+        _write_compressed(path, lambda: data, digest)
+
+    # A queued write may still replace the file with other content
+    if unchanged and os.path.exists(path) and not _queued(path):
+        with _lock:
+            _stats["skipped"] += 1
+        metrics.add("write_skipped")
+        return False
+
+    _store(_Write(path, key, digest, data=data))
+    return True
+
+
+def write_chunks(path: str | Path, chunks: Iterable[str | bytes]) -> tuple[bool, str, int]:
+    """write_file for content produced piece by piece, never held whole.
+
+    The pieces go to a temp file while they are hashed, which then
+    replaces path unless path already holds the same content. Returns
+    (written, sha256, size).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+
+    start = time.perf_counter()
+    fd, tmp = _mkstemp(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                digest.update(data)
+                size += len(data)
+                f.write(data)
+        digest = digest.hexdigest()
+
+        key = path.as_posix()
+        with _lock:
+            unchanged = _manifest().get(key) == digest
+
+        if _precompress and path.suffix in COMPRESSIBLE_SUFFIXES:
+            _write_compressed(path, Path(tmp).read_bytes, digest)
+
+        if unchanged and path.exists() and not _queued(path):
+            os.unlink(tmp)
+            with _lock:
+                _stats["skipped"] += 1
+            metrics.add("write_skipped")
+            return False, digest, size
+
+        _store(_Write(path, key, digest, tmp=tmp, size=size, seconds=time.perf_counter() - start))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return True, digest, size
+
+
+def write_json(path: str | Path, data) -> tuple[bool, str, int]:
+    """Write data as a JSON document without encoding it whole (see iter_json)."""
+    return write_chunks(path, iter_json(data))
+
+
+def append_file(path: str | Path, content: str | bytes) -> int:
+    """Append content to path, creating it if needed; returns the new file size.
+
+    The file is synced unless the fsync policy is "none".
+    """
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    with open(path, "ab") as f:
+        f.write(data)
+        f.flush()
+        if _fsync != "none":
+            os.fsync(f.fileno())
+        size = f.tell()
+    metrics.add("append", seconds=time.perf_counter() - start, nbytes=len(data))
+
+    with _lock:
+        _stats["written"] += 1
+    return size
+
+
+def tracked(directory: str | Path, recursive: bool = False) -> list[str]:
+    """Manifest keys of the files written directly inside directory, or at any depth with recursive."""
+    prefix = Path(directory).as_posix().rstrip("/") + "/"
+    with _lock:
+        return [
+            key for key in _manifest()
+            if key.startswith(prefix) and (recursive or "/" not in key[len(prefix):])
+        ]
+
+
+def remove(path: str | Path) -> bool:
+    """Delete a written file and forget its hash; returns True if it was on disk."""
+    flush(path)
+    with _lock:
+        _manifest().pop(Path(path).as_posix(), None)
+
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        return False
+
+    with _lock:
+        _stats["removed"] += 1
+    return True
+
+
+@metrics.instrument("dump_json")
+def dump_json(path: str | Path, data) -> bool:
+    """Write data as a JSON document (see encode_json)."""
+    return write_file(path, encode_json(data))
+
+
+def save_manifest() -> None:
+    """Persist the content hashes of everything written so far."""
+    # Hashes are recorded once the files are in place
+    flush()
+    with _lock:
+        data = json.dumps(_manifest(), sort_keys=True).encode("utf-8")
+    atomic_write(MANIFEST_PATH, data)
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_stats)
+
+
+def print_summary() -> None:
+    counts = stats()
+    print(f"💾 Wrote {counts['written']} file(s), skipped {counts['skipped']} unchanged")
+    if counts["compressed"]:
+        print(f"🗜️  Precompressed {counts['compressed']} file(s)")
+    if counts["removed"]:
+        print(f"🧹 Removed {counts['removed']} stale file(s)")
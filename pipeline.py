@@ -0,0 +1,107 @@
+import argparse
+
+import calendars
+import main
+import metrics
+import providers
+import rseq
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+SOURCES = (main.SportsManager.name, rseq.Rseq.name)
+
+
+# ---------------------------------------------------------------------------
+# Entrypoint
+# ---------------------------------------------------------------------------
+
+def run():
+    parser = argparse.ArgumentParser(description="Refresh every published rugby data source")
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        choices=SOURCES,
+        default=list(SOURCES),
+        help="Sources to refresh (default: all)",
+    )
+    parser.add_argument(
+        "--unions",
+        nargs="+",
+        type=str,
+        default=["ALL"],
+        help="sportsmanager union codes to scrape (default: ALL)",
+    )
+    parser.add_argument(
+        "--year",
+        type=int,
+        default=None,
+        help="sportsmanager competition year (default: current year)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of sportsmanager API requests to run in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Processes used to normalize fixtures and render calendars (default: in-process)",
+    )
+    parser.add_argument(
+        "--ics-backend",
+        choices=calendars.BACKENDS,
+        default="fast",
+        help="Calendar renderer; 'ics' uses the ics library (default: fast)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream sportsmanager league tables to disk and parse them a record at a time",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the sportsmanager unions an interrupted or failed run already published",
+    )
+    parser.add_argument(
+        "--rseq-output",
+        type=str,
+        default=rseq.OUTPUT_DIR,
+        help=f"Output directory for RSEQ data (default: {rseq.OUTPUT_DIR})",
+    )
+    providers.add_shared_arguments(parser)
+    args = parser.parse_args()
+
+    user_ids = main.resolve_unions(args.unions)
+    if main.SportsManager.name in args.sources and not user_ids:
+        print("❌ No valid union codes provided")
+        exit(1)
+
+    calendars.set_backend(args.ics_backend)
+    providers.configure(args)
+
+    selected: list[providers.Provider] = []
+    if main.SportsManager.name in args.sources:
+        selected.append(main.SportsManager(
+            user_ids, args.year, args.concurrency, args.workers, stream=args.stream, resume=args.resume,
+        ))
+    if rseq.Rseq.name in args.sources:
+        selected.append(rseq.Rseq(args.rseq_output))
+
+    # Sources run side by side, so a refresh takes as long as the slowest one
+    with metrics.profiled(args.profile):
+        failures = providers.run_all(selected)
+
+    providers.finish(args)
+
+    if failures:
+        exit(1)
+
+
+if __name__ == "__main__":
+    run()
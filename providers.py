@@ -0,0 +1,249 @@
+import argparse
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+import assets
+import calendars
+import changefeed
+import jsonstream
+import metrics
+import output
+import search
+import shards
+import store
+import transport
+from cache import CACHE_DIR, ResponseCache
+
+
+# ---------------------------------------------------------------------------
+# Providers
+# ---------------------------------------------------------------------------
+
+class Provider:
+    """A data source we publish.
+
+    Subclasses set the API endpoint and implement scrape(), which fetches
+    and normalizes the feeds and hands each union/year to publish(). HTTP
+    goes through the shared transport and files through the shared
+    writers, so every source gets the same caching, limits and output
+    layout.
+    """
+
+    name = ""
+    api_url = ""
+    headers: dict = {}
+    # Field of clubs.json holding the club's logo URL
+    logo_field = "logo"
+
+    @staticmethod
+    def fixture_key(fixture: dict):
+        """Identifies a fixture across runs, for the changefeed."""
+        return fixture.get("fixtureId")
+
+    @classmethod
+    def get_json(cls, params: dict) -> dict:
+        """Perform a GET request and return parsed JSON."""
+        return cls.fetch_json(params)[0]
+
+    @classmethod
+    def fetch_json(cls, params: dict) -> tuple[dict, str | None]:
+        """Like get_json, but also return the sha256 of the body (see transport.fetch_json)."""
+        return transport.fetch_json(cls.api_url, params=params, headers=cls.headers)
+
+    @classmethod
+    def fetch_document(cls, params: dict, root: tuple[str, ...] = ()) -> tuple[jsonstream.Document, str | None]:
+        """Like fetch_json, but streamed to disk and parsed on demand (see jsonstream)."""
+        return transport.fetch_document(cls.api_url, params=params, headers=cls.headers, root=root)
+
+    @classmethod
+    def publish(cls, output_dir: str, leagues: dict, clubs: dict, fixtures: Mapping, standings: Mapping) -> None:
+        """Write one union/year: changefeed first, then the shards and manifest."""
+        logos = assets.get_logos()
+        if logos is not None:
+            clubs = logos.localize_clubs(clubs, cls.logo_field)
+
+        # Diff against the previously written fixtures and standings before replacing them
+        changefeed.record(output_dir, fixtures, standings, fixture_key=cls.fixture_key)
+
+        with metrics.timed("dump_json"):
+            shards.write_union(output_dir, leagues, clubs, fixtures, standings)
+
+    def scrape(self) -> None:
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        """Persist provider state after a run."""
+
+
+def run_all(providers: list[Provider]) -> dict[str, Exception]:
+    """Scrape every provider concurrently; returns the failures by provider name."""
+    failures: dict[str, Exception] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, len(providers))) as pool:
+        futures = {provider.name: pool.submit(provider.scrape) for provider in providers}
+
+    for provider in providers:
+        try:
+            futures[provider.name].result()
+        except Exception as e:
+            print(f"❌ {provider.name} failed: {e}")
+            failures[provider.name] = e
+        # Whatever a provider did publish before failing is kept
+        provider.finish()
+
+    return failures
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+def add_shared_arguments(parser: argparse.ArgumentParser) -> None:
+    """Transport, output and reporting flags shared by every entry point."""
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=transport.DEFAULT_PER_HOST_LIMIT,
+        help=f"Maximum concurrent requests per API host (default: {transport.DEFAULT_PER_HOST_LIMIT})",
+    )
+    parser.add_argument(
+        "--legacy-output",
+        action="store_true",
+        help="Also write the monolithic fixtures.json and standings.json",
+    )
+    parser.add_argument(
+        "--shard-months",
+        action="store_true",
+        help="Split each league's fixtures into one file per month",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Write JSON with compact separators instead of indentation",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="Write .gz and .br siblings of every JSON and calendar file",
+    )
+    parser.add_argument(
+        "--remote-logos",
+        action="store_true",
+        help="Keep the upstream logo URLs in clubs.json instead of local copies",
+    )
+    parser.add_argument(
+        "--write-queue",
+        type=int,
+        default=output.WRITE_QUEUE_SIZE,
+        metavar="N",
+        help=f"Files queued for the background writer before scraping waits; 0 writes inline (default: {output.WRITE_QUEUE_SIZE})",
+    )
+    parser.add_argument(
+        "--fsync",
+        choices=output.FSYNC_POLICIES,
+        default="none",
+        help="Sync published files to disk never, once per batch of queued writes, or after every file (default: none)",
+    )
+    parser.add_argument(
+        "--calendar-past-days",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Keep fixture calendars for N days after kickoff (default: forever)",
+    )
+    parser.add_argument(
+        "--calendar-future-days",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Only publish fixture calendars up to N days ahead (default: no limit)",
+    )
+    parser.add_argument(
+        "--keep-calendars",
+        action="store_true",
+        help="Never delete fixture calendars, even for fixtures that no longer exist",
+    )
+    parser.add_argument(
+        "--no-search-index",
+        action="store_true",
+        help=f"Skip rebuilding the client-side search index under {search.SEARCH_DIR}",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=store.STORE_PATH,
+        help=f"SQLite store the JSON outputs are exported from (default: {store.STORE_PATH})",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=CACHE_DIR,
+        help=f"Directory for the conditional-request response cache (default: {CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-download and re-process every payload",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Write a JSON report of per-stage timings and I/O to PATH",
+    )
+    parser.add_argument(
+        "--prometheus",
+        metavar="PATH",
+        help="Write per-stage metrics as a Prometheus textfile to PATH",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Run under cProfile and dump the stats to PATH",
+    )
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Archive every raw API response under DIR",
+    )
+    archive.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Serve API responses from an archive made with --record (no network)",
+    )
+
+
+def configure(args: argparse.Namespace) -> None:
+    """Apply the shared flags to the transport, store and writers."""
+    transport.set_per_host_limit(args.per_host)
+    store.set_store(store.Store(args.store))
+    shards.set_legacy(args.legacy_output)
+    shards.set_months(args.shard_months)
+    output.set_minify(args.minify)
+    output.set_precompress(args.precompress)
+    output.set_fsync(args.fsync)
+    output.set_writer(output.BackgroundWriter(args.write_queue) if args.write_queue > 0 else None)
+    calendars.set_retention(args.calendar_past_days, args.calendar_future_days, collect=not args.keep_calendars)
+    search.set_enabled(not args.no_search_index)
+    assets.set_logos(None if args.remote_logos else assets.LogoStore())
+    transport.set_record_dir(args.record)
+    transport.set_replay_dir(args.replay)
+    if not args.no_cache and not args.replay:
+        transport.set_cache(ResponseCache(args.cache_dir))
+
+
+def finish(args: argparse.Namespace) -> None:
+    """Flush the shared state and write the requested reports."""
+    if search.enabled():
+        search.build()
+    output.set_writer(None)
+    output.save_manifest()
+    output.print_summary()
+
+    if args.metrics:
+        metrics.write_report(args.metrics)
+    if args.prometheus:
+        metrics.write_prometheus(args.prometheus)
+
+    if transport.get_cache():
+        transport.get_cache().evict()
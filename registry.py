@@ -0,0 +1,120 @@
+import json
+
+from output import atomic_write
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Every club seen by previous runs, across unions and years
+REGISTRY_PATH = ".cache/clubs.json"
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+class ClubRegistry:
+    """Clubs keyed by club_id, with their teams and a team_id -> club_id index.
+
+    Team membership is kept in insertion-ordered dicts, so lookups are O(1)
+    and to_json() lists team_ids in the order they were first seen, matching
+    the clubs.json shape:
+
+        {"<club_id>": {"name": ..., "logo": ..., "team_ids": [...]}}
+    """
+
+    def __init__(self, known: "ClubRegistry | None" = None):
+        self._clubs: dict[str, dict] = {}
+        self._team_clubs: dict[str, str] = {}
+        # Clubs from previous runs, used to fill in missing names and logos
+        self.known = known
+
+    def __len__(self) -> int:
+        return len(self._clubs)
+
+    def __contains__(self, club_id) -> bool:
+        return str(club_id) in self._clubs
+
+    def __iter__(self):
+        return iter(self._clubs)
+
+    def add_team(self, club_id, team_id, name: str = "", logo: str = "") -> None:
+        """Register team_id under club_id, creating the club on first sight."""
+        club_key = str(club_id)
+        club = self._clubs.get(club_key)
+
+        if club is None:
+            if self.known is not None:
+                name = name or self.known.name(club_key, "")
+                logo = logo or self.known.logo(club_key)
+            club = self._clubs[club_key] = {"name": name, "logo": logo, "team_ids": {}}
+
+        club["team_ids"].setdefault(team_id, None)
+        self._team_clubs.setdefault(str(team_id), club_key)
+
+    def club_for_team(self, team_id) -> str | None:
+        return self._team_clubs.get(str(team_id))
+
+    def name(self, club_id, default: str = "") -> str:
+        club = self._clubs.get(str(club_id))
+        return club["name"] if club and club["name"] else default
+
+    def logo(self, club_id, default: str = "") -> str:
+        club = self._clubs.get(str(club_id))
+        return club["logo"] if club and club["logo"] else default
+
+    def team_name(self, team_id, club_id=None, default: str = "") -> str:
+        """Name of the club a team plays for, falling back to the team lookup."""
+        if club_id and str(club_id) in self._clubs:
+            return self.name(club_id, default)
+        return self.name(self.club_for_team(team_id), default)
+
+    def merge(self, other: "ClubRegistry") -> None:
+        """Add every club and team of other, keeping existing names and logos."""
+        for club_key, club in other._clubs.items():
+            for team_id in club["team_ids"]:
+                self.add_team(club_key, team_id, club["name"], club["logo"])
+
+            mine = self._clubs[club_key]
+            mine["name"] = mine["name"] or club["name"]
+            mine["logo"] = mine["logo"] or club["logo"]
+
+    def detached(self) -> "ClubRegistry":
+        """Copy of these clubs without known, small enough to send to worker processes."""
+        return ClubRegistry.from_json(self.to_json())
+
+    def to_json(self) -> dict:
+        return {
+            club_key: {
+                "name": club["name"],
+                "logo": club["logo"],
+                "team_ids": list(club["team_ids"]),
+            }
+            for club_key, club in self._clubs.items()
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ClubRegistry":
+        registry = cls()
+        for club_key, club in data.items():
+            registry._clubs[club_key] = {
+                "name": club.get("name", ""),
+                "logo": club.get("logo", ""),
+                "team_ids": {},
+            }
+            for team_id in club.get("team_ids", []):
+                registry.add_team(club_key, team_id)
+        return registry
+
+    @classmethod
+    def load(cls, path: str = REGISTRY_PATH) -> "ClubRegistry":
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_json(json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path: str = REGISTRY_PATH) -> None:
+        atomic_write(path, json.dumps(self.to_json(), ensure_ascii=False).encode("utf-8"))
@@ -1,8 +1,12 @@
 import argparse
-import json
 import os
+from datetime import datetime
+from urllib.parse import urlencode
 
-import requests
+import metrics
+import providers
+import shards
+import store
 
 
 # ---------------------------------------------------------------------------
@@ -11,6 +15,9 @@ import requests
 
 API_URL = "https://s1.rseq.ca/api/LeagueApi/GetLeagueDiffusion/"
 
+YEAR = 2026
+OUTPUT_DIR = os.path.join("src/data/", "rseq", str(YEAR))
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0",
     "Accept": "application/json, text/javascript, */*; q=0.01",
@@ -101,23 +108,39 @@ TEAM_LOGO_MAP = {
 
 
 # ---------------------------------------------------------------------------
-# Helpers
+# Provider
 # ---------------------------------------------------------------------------
 
-def get_json(params: dict) -> dict:
-    """Perform a GET request and return parsed JSON."""
-    response = requests.get(API_URL, params=params, headers=HEADERS)
-    print(f"📡 Calling: {response.url}")
-    response.raise_for_status()
-    return response.json()
+class Rseq(providers.Provider):
+    """College and university leagues from the RSEQ diffusion API."""
+
+    name = "rseq"
+    api_url = API_URL
+    headers = HEADERS
+    logo_field = "logo_url"
+
+    def __init__(self, output_dir: str = OUTPUT_DIR):
+        self.output_dir = output_dir
+
+    @staticmethod
+    def fixture_key(fixture: dict) -> str:
+        # RSEQ games have no IDs; the time tells apart two games on the same day
+        return f"{fixture['home_id']}/{fixture['away_id']}/{fixture['date']}/{fixture['time']}"
 
+    @classmethod
+    def fetch_json(cls, params: dict) -> tuple[dict, str | None]:
+        print(f"📡 Calling: {API_URL}?{urlencode(params)}")
+        return super().fetch_json(params)
 
-def dump_json(path: str, data: list | dict) -> None:
-    """Write data to a JSON file."""
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    def scrape(self) -> None:
+        with metrics.scope(self.name):
+            scrape(self.output_dir)
 
 
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
 def id_to_logo(team_id: str) -> str:
     """Get logo URL for a team ID."""
     return TEAM_LOGO_MAP.get(team_id, "")
@@ -132,31 +155,45 @@ def minutes_to_hhmm(minutes: int) -> str:
     return f"{hours:02d}:{mins:02d}"
 
 
+def game_timestamp(date: str, time: str) -> int | None:
+    """Best-effort timestamp of a game, for ordering and date queries in the store."""
+    try:
+        return int(datetime.strptime(f"{date} {time or '00:00'}", "%Y-%m-%d %H:%M").timestamp())
+    except ValueError:
+        return None
+
+
 # ---------------------------------------------------------------------------
 # Main scrape
 # ---------------------------------------------------------------------------
 
-def scrape() -> None:
-    """Fetch RSEQ data and save into JSON files inside data/ directory."""
+def scrape(output_dir: str = OUTPUT_DIR) -> None:
+    """Fetch RSEQ data, store it and export it as JSON files in output_dir."""
     print("🚀 Starting RSEQ data scrape")
 
     # Process each league
+    leagues: dict = {}
     clubs: dict = {}
+    teams: list = []
     fixtures: dict = {}
     standings: dict = {}
+    digests: dict = {}
 
     for league_name, league_id in LEAGUES.items():
         print(f"  📊 Fetching {league_name}...")
 
         try:
-            data = get_json({"leagueId": league_id})
+            data, digests[league_id] = Rseq.fetch_json({"leagueId": league_id})
         except Exception as e:
             print(f"  ❌ Error fetching {league_name}: {e}")
             continue
 
+        leagues[league_id] = league_name
+
         # Teams/Clubs
         for team in data.get("Teams", []):
             team_id = team.get("TeamId", "")
+            teams.append((league_id, team_id, team_id))
             clubs[team_id] = {
                 "name": team.get("TeamName", "").strip(),
                 "code": team.get("TeamCode", "").strip(),
@@ -211,14 +248,52 @@ def scrape() -> None:
         standings[league_id] = standings_list
 
     # Create output directory and save data
-    output_dir = os.path.join("data", "rseq", "2026")
     os.makedirs(output_dir, exist_ok=True)
 
-    dump_json(os.path.join(output_dir, "clubs.json"), clubs)
-    dump_json(os.path.join(output_dir, "leagues.json"), 
-              {id: name for name, id in LEAGUES.items()})
-    dump_json(os.path.join(output_dir, "fixtures.json"), fixtures)
-    dump_json(os.path.join(output_dir, "standings.json"), standings)
+    # Compared with the payloads last published, so a run that failed
+    # after fetching does not leave stale outputs behind for good
+    db = store.get_store()
+    stored = db.leagues(store.RSEQ, "rseq", YEAR)
+    unchanged = db.published(store.RSEQ, digests) == {str(league_id): digest for league_id, digest in digests.items()}
+    if unchanged and stored and shards.outputs_current(output_dir, stored):
+        print(f"⏭️  No changes, keeping {output_dir}")
+        return
+
+    # Leagues that failed to fetch keep what the store has from earlier runs
+    db.save_union(
+        store.RSEQ,
+        "rseq",
+        YEAR,
+        leagues,
+        clubs,
+        teams,
+        {
+            league_id: [
+                {
+                    "id": f"{league_id}/{Rseq.fixture_key(fixture)}",
+                    "date": game_timestamp(fixture["date"], fixture["time"]),
+                    "home_team_id": fixture["home_id"],
+                    "away_team_id": fixture["away_id"],
+                    "home_club_id": fixture["home_id"],
+                    "away_club_id": fixture["away_id"],
+                    "record": fixture,
+                }
+                for fixture in items
+            ]
+            for league_id, items in fixtures.items()
+        },
+        {
+            league_id: [{"team_id": row["team_id"], "position": row["pos"], "record": row} for row in rows]
+            for league_id, rows in standings.items()
+        },
+        prune=False,
+    )
+
+    leagues, club_rows, fixtures, standings = db.export_union(store.RSEQ, "rseq", YEAR)
+    clubs = {club_id: club for club_id, club, _ in club_rows}
+
+    Rseq.publish(output_dir, leagues, clubs, fixtures, standings)
+    db.set_published(store.RSEQ, digests)
 
     print(f"✅ Data saved to {output_dir}")
 
@@ -232,9 +307,15 @@ if __name__ == "__main__":
     parser.add_argument(
         "--output",
         type=str,
-        default="data/rseq/2026",
-        help="Output directory for JSON files (default: data/rseq/2026)",
+        default=OUTPUT_DIR,
+        help=f"Output directory for JSON files (default: {OUTPUT_DIR})",
     )
+    providers.add_shared_arguments(parser)
     args = parser.parse_args()
 
-    scrape()
\ No newline at end of file
+    providers.configure(args)
+
+    with metrics.profiled(args.profile):
+        Rseq(args.output).scrape()
+
+    providers.finish(args)
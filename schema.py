@@ -0,0 +1,75 @@
+from typing import Callable, Iterable
+
+
+# Upper bound on cached key layouts per projection
+MAX_PLANS = 64
+
+
+# ---------------------------------------------------------------------------
+# Projections
+# ---------------------------------------------------------------------------
+
+class Projection:
+    """A compiled record shape: builds a cleaned copy of a raw record in one pass.
+
+    - drop:      raw keys left out of the output
+    - keep:      if given, only these raw keys are copied (an allow-list)
+    - transform: raw keys whose value is rewritten in place, key -> fn(value);
+                 if the raw record lacks the key it is appended as fn(None)
+    - extra:     derived keys appended after the raw keys, key -> fn(raw)
+
+    Output key order is raw order, then extra, then missing transform keys.
+    """
+
+    __slots__ = ("drop", "keep", "transform", "extra", "_plans")
+
+    def __init__(
+        self,
+        drop: Iterable[str] = (),
+        keep: Iterable[str] | None = None,
+        transform: dict[str, Callable] | None = None,
+        extra: dict[str, Callable] | None = None,
+    ):
+        self.drop = frozenset(drop)
+        self.keep = frozenset(keep) if keep is not None else None
+        self.transform = tuple((transform or {}).items())
+        self.extra = tuple((extra or {}).items())
+        # Raw key layout -> (copied keys, transforms present, transforms missing)
+        self._plans: dict[tuple, tuple] = {}
+
+    def _plan(self, layout: tuple) -> tuple:
+        keys = tuple(
+            key for key in layout
+            if key not in self.drop and (self.keep is None or key in self.keep)
+        )
+        present = tuple((key, fn) for key, fn in self.transform if key in keys)
+        missing = tuple((key, fn) for key, fn in self.transform if key not in keys)
+        plan = (keys, present, missing)
+        if len(self._plans) < MAX_PLANS:
+            self._plans[layout] = plan
+        return plan
+
+    def __call__(self, raw: dict) -> dict:
+        # API records of one type nearly always share a key layout, so the
+        # filtering is worked out once per layout rather than once per record.
+        layout = tuple(raw)
+        plan = self._plans.get(layout)
+        if plan is None:
+            plan = self._plan(layout)
+        keys, present, missing = plan
+
+        out = {key: raw[key] for key in keys}
+
+        for key, fn in present:
+            out[key] = fn(out[key])
+
+        for key, fn in self.extra:
+            out[key] = fn(raw)
+
+        for key, fn in missing:
+            out[key] = fn(None)
+
+        return out
+
+    def many(self, raws: Iterable[dict]) -> list[dict]:
+        return [self(raw) for raw in raws]
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import re
+import unicodedata
+
+import metrics
+import output
+import store
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Served by the site alongside public/calendar and public/logos
+SEARCH_DIR = "public/search"
+INDEX_FILE = "index.json"
+
+# Records and stable IDs of the previous build, per store union/year
+CACHE_PATH = ".cache/search.json"
+
+INDEX_VERSION = 1
+
+# Term shards are named after the first characters of their tokens
+SHARD_CHARS = 2
+# Shorter tokens (e.g. the "1" of "Division 1") are not indexed
+MIN_TOKEN = 2
+# Records per docs/ file, grouped by ID so new records only touch the last ones
+DOCS_PER_SHARD = 32
+
+# Club fields indexed next to the name (RSEQ team codes and pseudonyms)
+ALIAS_FIELDS = ("code", "pseudonym")
+
+
+# ---------------------------------------------------------------------------
+# State
+# ---------------------------------------------------------------------------
+
+_enabled = True
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+# ---------------------------------------------------------------------------
+# Text
+# ---------------------------------------------------------------------------
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def fold(text: str) -> str:
+    """Lowercase text without accents or punctuation: "Stade Émile-Legault" -> "stade emile legault"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(_SEPARATORS.sub(" ", stripped.casefold()).split())
+
+
+def tokens(text: str) -> set[str]:
+    return {token for token in fold(text).split() if len(token) >= MIN_TOKEN}
+
+
+def trigrams(token: str) -> set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+# ---------------------------------------------------------------------------
+# Records
+# ---------------------------------------------------------------------------
+
+def dataset_records(db: store.Store, source: str, union_code: str, year: str) -> list[list]:
+    """[key, record] for the leagues, clubs and venues of one stored union/year."""
+    records = []
+    leagues = db.leagues(source, union_code, year)
+
+    for league_id, name in leagues.items():
+        records.append([
+            ["league", source, league_id],
+            {"type": "league", "name": name.strip(), "source": source, "id": league_id},
+        ])
+
+    for club_id, club, team_ids in db.union_clubs(source, union_code, year):
+        record = {"type": "club", "name": club.get("name", ""), "source": source, "id": club_id}
+        for field in ALIAS_FIELDS:
+            if club.get(field):
+                record[field] = club[field]
+        # RSEQ clubs are single teams under their own ID
+        if [str(team_id) for team_id in team_ids] != [club_id]:
+            record["team_ids"] = team_ids
+        records.append([["club", source, club_id], record])
+
+    for venue in db.venues(source, leagues):
+        records.append([["venue", fold(venue)], {"type": "venue", "name": venue}])
+
+    return records
+
+
+def merge_records(datasets: dict[str, dict]) -> dict[str, dict]:
+    """Records of every union/year combined, keyed by "type/..." with the unions and years they appear in."""
+    merged: dict[str, dict] = {}
+    for name, dataset in sorted(datasets.items()):
+        _, union_code, year = name.split("/")
+        for key, record in dataset["records"]:
+            key = "/".join(key)
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = {**record, "unions": [], "years": []}
+            else:
+                # Later years win for names and aliases
+                entry.update(record)
+                if "team_ids" in record:
+                    entry["team_ids"] = list(dict.fromkeys(entry.get("team_ids", []) + record["team_ids"]))
+
+            if union_code not in entry["unions"]:
+                entry["unions"].append(union_code)
+            if year not in entry["years"]:
+                entry["years"].append(year)
+    return merged
+
+
+def _texts(record: dict) -> list[str]:
+    return [record["name"]] + [record[field] for field in ALIAS_FIELDS if record.get(field)]
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+def build_shards(records: dict[int, dict]) -> tuple[dict[str, dict], dict[str, dict]]:
+    """(term shards, doc shards) of records keyed by their integer ID.
+
+    terms/<xx>.json holds every token starting with xx and the IDs of the
+    records containing it; a query token is looked up by taking every
+    token it is a prefix of. It also maps the trigrams starting with xx to
+    the tokens containing them, for matches inside a word.
+    """
+    postings: dict[str, set[int]] = {}
+    for doc_id, record in records.items():
+        for text in _texts(record):
+            for token in tokens(text):
+                postings.setdefault(token, set()).add(doc_id)
+
+    terms: dict[str, dict] = {}
+    for token in sorted(postings):
+        shard = terms.setdefault(token[:SHARD_CHARS], {"tokens": {}, "trigrams": {}})
+        shard["tokens"][token] = sorted(postings[token])
+    for token in sorted(postings):
+        for trigram in sorted(trigrams(token)):
+            shard = terms.setdefault(trigram[:SHARD_CHARS], {"tokens": {}, "trigrams": {}})
+            shard["trigrams"].setdefault(trigram, []).append(token)
+
+    docs: dict[str, dict] = {}
+    for doc_id in sorted(records):
+        docs.setdefault(str(doc_id // DOCS_PER_SHARD), {})[str(doc_id)] = records[doc_id]
+
+    return terms, docs
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def _write_shards(directory: str, shards: dict[str, dict]) -> tuple[dict[str, str], int]:
+    """Write {name: data} as directory/<name>.json, removing shards that are gone.
+
+    Returns ({name: short sha256}, files written).
+    """
+    hashes = {}
+    written = 0
+    for name, data in sorted(shards.items()):
+        content = _encode(data)
+        hashes[name] = hashlib.sha256(content).hexdigest()[:12]
+        written += output.write_file(f"{directory}/{name}.json", content)
+
+    for key in output.tracked(directory):
+        if key.rsplit("/", 1)[-1].split(".", 1)[0] not in shards:
+            output.remove(key)
+
+    return hashes, written
+
+
+def _load_cache(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@metrics.instrument("search_index")
+def build(db: store.Store | None = None, root: str = SEARCH_DIR, cache_path: str = CACHE_PATH) -> bool:
+    """Rebuild the client-side search index from the store; returns True if it changed.
+
+    Only the union/years rewritten since the previous build are read from
+    the store again, and records keep their IDs between builds, so the
+    shards that did not change are left as they are:
+
+        index.json      {"version", "records", "terms": {"<xx>": sha}, "docs": {"<n>": sha}, ...}
+        terms/<xx>.json {"tokens": {"<token>": [id, ...]}, "trigrams": {"<abc>": ["<token>", ...]}}
+        docs/<n>.json   {"<id>": {"type", "name", "unions", "years", ...}}, n = id // DOCS_PER_SHARD
+    """
+    db = db or store.get_store()
+    cache = _load_cache(cache_path)
+    if cache.get("version") != INDEX_VERSION or cache.get("store") != db.path:
+        cache = {}
+    cached = cache.get("datasets", {})
+
+    datasets = {}
+    reread = 0
+    for (source, union_code, year), revision in sorted(db.datasets().items()):
+        name = f"{source}/{union_code}/{year}"
+        dataset = cached.get(name)
+        if dataset is None or dataset["revision"] != revision:
+            dataset = {"revision": revision, "records": dataset_records(db, source, union_code, year)}
+            reread += 1
+        datasets[name] = dataset
+
+    index_path = f"{root}/{INDEX_FILE}"
+    if not reread and datasets.keys() == cached.keys() and output.exists(index_path):
+        print("⏭️  Search index is current")
+        return False
+
+    # IDs are never reused, so a client holding an older index cannot mix records up
+    ids: dict[str, int] = cache.get("ids", {})
+    next_id = cache.get("next_id", 0)
+    records = {}
+    for key, record in merge_records(datasets).items():
+        if key not in ids:
+            ids[key] = next_id
+            next_id += 1
+        records[ids[key]] = record
+    ids = {key: doc_id for key, doc_id in ids.items() if doc_id in records}
+
+    terms, docs = build_shards(records)
+    term_hashes, written = _write_shards(f"{root}/terms", terms)
+    doc_hashes, doc_written = _write_shards(f"{root}/docs", docs)
+
+    output.write_file(index_path, _encode({
+        "version": INDEX_VERSION,
+        "shard_chars": SHARD_CHARS,
+        "min_token": MIN_TOKEN,
+        "docs_per_shard": DOCS_PER_SHARD,
+        "records": len(records),
+        "terms": term_hashes,
+        "docs": doc_hashes,
+    }))
+
+    output.atomic_write(cache_path, _encode({
+        "version": INDEX_VERSION,
+        "store": db.path,
+        "datasets": datasets,
+        "ids": ids,
+        "next_id": next_id,
+    }))
+
+    print(
+        f"🔎 Indexed {len(records)} records in {len(terms)} term and {len(docs)} doc shards "
+        f"({reread} union/year(s) re-read, {written + doc_written} shard(s) rewritten)"
+    )
+    return True
@@ -0,0 +1,235 @@
+import os
+import re
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Callable, Mapping
+
+import output
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Month key for fixtures without a usable fixtureDate
+UNDATED = "undated"
+
+# Files and directories of a union/year that write_union owns
+SHARD_ROOTS = ("fixtures", "standings")
+
+_COMPRESSED = re.compile(r"\.(?:gz|br)$")
+
+
+# ---------------------------------------------------------------------------
+# State
+# ---------------------------------------------------------------------------
+
+# Also write the monolithic fixtures.json / standings.json
+_legacy = False
+# Split each league's fixtures into one file per month
+_months = False
+
+
+def set_legacy(enabled: bool) -> None:
+    global _legacy
+    _legacy = enabled
+
+
+def set_months(enabled: bool) -> None:
+    global _months
+    _months = enabled
+
+
+def options() -> dict:
+    """Output settings recorded in manifest.json; outputs built with others are stale."""
+    return {**output.options(), "legacy": _legacy, "months": _months}
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def fixture_month(fixture: dict) -> str:
+    """UTC "YYYY-MM" of a fixture's kickoff."""
+    date = fixture.get("fixtureDate")
+    if isinstance(date, (int, float)):
+        return datetime.fromtimestamp(date, timezone.utc).strftime("%Y-%m")
+
+    # RSEQ games carry a local "YYYY-MM-DD" date instead
+    date = fixture.get("date")
+    if isinstance(date, str) and re.match(r"\d{4}-\d{2}-", date):
+        return date[:7]
+
+    return UNDATED
+
+
+def write_shard(output_dir: str, rel_path: str, data, count: int | None = None) -> dict:
+    """Write one JSON file under output_dir and return its manifest entry."""
+    _, digest, size = output.write_json(os.path.join(output_dir, rel_path), data)
+
+    entry = {"path": rel_path, "bytes": size, "sha256": digest}
+    if count is not None:
+        entry["count"] = count
+    return entry
+
+
+def write_league(output_dir: str, league_id, league_name: str, fixtures: list, standings: list) -> dict:
+    """Write the fixture and standings shards of one league."""
+    if _months:
+        by_month: dict[str, list] = {}
+        for fixture in fixtures:
+            by_month.setdefault(fixture_month(fixture), []).append(fixture)
+
+        fixture_shards = []
+        for month, items in sorted(by_month.items()):
+            entry = write_shard(output_dir, f"fixtures/{league_id}/{month}.json", items, len(items))
+            fixture_shards.append({"month": month, **entry})
+    else:
+        fixture_shards = [write_shard(output_dir, f"fixtures/{league_id}.json", fixtures, len(fixtures))]
+
+    return {
+        "name": league_name,
+        "fixtures": fixture_shards,
+        "standings": write_shard(output_dir, f"standings/{league_id}.json", standings, len(standings)),
+    }
+
+
+def write_union(output_dir: str, leagues: dict, clubs: dict, fixtures: Mapping, standings: Mapping) -> None:
+    """Write a union/year as per-league shards plus manifest.json.
+
+    fixtures and standings are read one league at a time, so they can be
+    mappings that load each league on access (see store.LeagueRecords).
+
+    manifest.json lists every file with its size, sha256 and record count,
+    so the site can load it first and fetch only the league being viewed,
+    and the options the files were written with:
+
+        {"version": 1, "options": {...}, "files": {"leagues.json": {...}, "clubs.json": {...}},
+         "leagues": {"<league_id>": {"name": ...,
+                                     "fixtures": [{"path", "bytes", "sha256", "count"[, "month"]}],
+                                     "standings": {"path", "bytes", "sha256", "count"}}}}
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "options": options(),
+        "files": {
+            "leagues.json": write_shard(output_dir, "leagues.json", leagues, len(leagues)),
+            "clubs.json": write_shard(output_dir, "clubs.json", clubs, len(clubs)),
+        },
+        "leagues": {},
+    }
+
+    for league_id, league_name in leagues.items():
+        manifest["leagues"][str(league_id)] = write_league(
+            output_dir, league_id, league_name, fixtures[league_id], standings[league_id],
+        )
+
+    if _legacy:
+        manifest["files"]["fixtures.json"] = write_shard(output_dir, "fixtures.json", fixtures)
+        manifest["files"]["standings.json"] = write_shard(output_dir, "standings.json", standings)
+
+    write_shard(output_dir, MANIFEST_FILE, manifest)
+    remove_stale(output_dir, manifest)
+
+
+def remove_stale(output_dir: str, manifest: dict) -> int:
+    """Delete the shards of earlier runs that manifest no longer lists.
+
+    These are the files of dropped leagues, the other layout after
+    --shard-months is toggled, and the monolithic files once
+    --legacy-output is off. Only files recorded in the output manifest
+    are considered, along with their precompressed siblings.
+    """
+    root = Path(output_dir).as_posix()
+    keep = {f"{root}/{path}" for path in manifest_paths(manifest)}
+
+    removed = 0
+    for key in output.tracked(root, recursive=True):
+        if key[len(root) + 1:].split("/", 1)[0].split(".", 1)[0] not in SHARD_ROOTS:
+            continue
+        if _COMPRESSED.sub("", key) not in keep and output.remove(key):
+            removed += 1
+
+    if removed:
+        print(f"🧹 Removed {removed} stale shard file(s) from {output_dir}")
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def load_manifest(output_dir: str) -> dict | None:
+    return output.load_json(os.path.join(output_dir, MANIFEST_FILE))
+
+
+def expected_files(output_dir: str) -> list[str]:
+    """Every file the union's manifest refers to, plus the manifest itself."""
+    manifest = load_manifest(output_dir)
+    if manifest is None:
+        return []
+    return manifest_paths(manifest)
+
+
+def manifest_paths(manifest: dict) -> list[str]:
+    paths = [MANIFEST_FILE] + [entry["path"] for entry in manifest.get("files", {}).values()]
+    for league in manifest.get("leagues", {}).values():
+        paths += [entry["path"] for entry in league["fixtures"]]
+        paths.append(league["standings"]["path"])
+    return paths
+
+
+def _load_league(output_dir: str, league: dict) -> tuple[list, list]:
+    fixtures = []
+    for entry in league["fixtures"]:
+        fixtures += output.load_json(os.path.join(output_dir, entry["path"])) or []
+    return fixtures, output.load_json(os.path.join(output_dir, league["standings"]["path"])) or []
+
+
+def _legacy_league(fixtures: dict, standings: dict, league_id: str) -> tuple[list, list]:
+    return fixtures.get(league_id, []), standings.get(league_id, [])
+
+
+def snapshot_leagues(output_dir: str) -> dict[str, Callable[[], tuple[list, list]]] | None:
+    """Loaders of the previously written (fixtures, standings) of each league.
+
+    Each league is read from its shards only when its loader is called,
+    falling back to the monolithic files of older runs. Returns None if
+    neither exists.
+    """
+    manifest = load_manifest(output_dir)
+    if manifest is not None:
+        return {
+            league_id: partial(_load_league, output_dir, league)
+            for league_id, league in manifest.get("leagues", {}).items()
+        }
+
+    fixtures = output.load_json(os.path.join(output_dir, "fixtures.json"))
+    standings = output.load_json(os.path.join(output_dir, "standings.json"))
+    if fixtures is None or standings is None:
+        return None
+
+    return {
+        league_id: partial(_legacy_league, fixtures, standings, league_id)
+        for league_id in {**fixtures, **standings}
+    }
+
+
+def outputs_current(output_dir: str, leagues: dict) -> bool:
+    """Check the union's output files exist and were built from the same leagues and options."""
+    manifest = load_manifest(output_dir)
+    if manifest is None:
+        return False
+
+    if manifest.get("options") != options():
+        return False
+
+    if not all(output.exists(os.path.join(output_dir, path)) for path in expected_files(output_dir)):
+        return False
+
+    previous = {league_id: league["name"] for league_id, league in manifest["leagues"].items()}
+    return previous == {str(league_id): name for league_id, name in leagues.items()}
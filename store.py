@@ -0,0 +1,586 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Mapping
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from typing import Callable
+
+import metrics
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+STORE_PATH = "data/clubrugby.db"
+
+# Data sources sharing the store
+SPORTSMANAGER = "sportsmanager"
+RSEQ = "rseq"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leagues (
+    source      TEXT NOT NULL,
+    league_id   TEXT NOT NULL,
+    union_code  TEXT NOT NULL,
+    year        TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    name        TEXT NOT NULL,
+    PRIMARY KEY (source, league_id)
+);
+CREATE INDEX IF NOT EXISTS leagues_union ON leagues (source, union_code, year);
+
+CREATE TABLE IF NOT EXISTS clubs (
+    source      TEXT NOT NULL,
+    club_id     TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    data        TEXT NOT NULL,
+    PRIMARY KEY (source, club_id)
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+    source      TEXT NOT NULL,
+    team_id     TEXT NOT NULL,
+    club_id     TEXT NOT NULL,
+    PRIMARY KEY (source, team_id)
+);
+CREATE INDEX IF NOT EXISTS teams_club ON teams (source, club_id);
+
+-- Teams taking part in a league, in league table order
+CREATE TABLE IF NOT EXISTS league_teams (
+    source      TEXT NOT NULL,
+    league_id   TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    team_id     TEXT NOT NULL,
+    -- team_id as written in the exports (a JSON number or string)
+    team_json   TEXT NOT NULL,
+    PRIMARY KEY (source, league_id, seq)
+);
+CREATE INDEX IF NOT EXISTS league_teams_team ON league_teams (source, team_id);
+
+CREATE TABLE IF NOT EXISTS fixtures (
+    source        TEXT NOT NULL,
+    fixture_id    TEXT NOT NULL,
+    league_id     TEXT NOT NULL,
+    year          TEXT NOT NULL,
+    seq           INTEGER NOT NULL,
+    date          INTEGER,
+    status        TEXT,
+    home_team_id  TEXT,
+    away_team_id  TEXT,
+    home_club_id  TEXT,
+    away_club_id  TEXT,
+    data          TEXT NOT NULL,
+    PRIMARY KEY (source, fixture_id)
+);
+CREATE INDEX IF NOT EXISTS fixtures_league ON fixtures (source, league_id, seq);
+CREATE INDEX IF NOT EXISTS fixtures_date ON fixtures (source, date);
+CREATE INDEX IF NOT EXISTS fixtures_home_team ON fixtures (source, home_team_id, year);
+CREATE INDEX IF NOT EXISTS fixtures_away_team ON fixtures (source, away_team_id, year);
+CREATE INDEX IF NOT EXISTS fixtures_home_club ON fixtures (source, home_club_id, year);
+CREATE INDEX IF NOT EXISTS fixtures_away_club ON fixtures (source, away_club_id, year);
+
+CREATE TABLE IF NOT EXISTS officials (
+    source      TEXT NOT NULL,
+    fixture_id  TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    role        TEXT,
+    name        TEXT,
+    PRIMARY KEY (source, fixture_id, seq)
+);
+CREATE INDEX IF NOT EXISTS officials_name ON officials (source, name);
+
+CREATE TABLE IF NOT EXISTS standings (
+    source      TEXT NOT NULL,
+    league_id   TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    team_id     TEXT NOT NULL,
+    position    INTEGER,
+    data        TEXT NOT NULL,
+    PRIMARY KEY (source, league_id, seq)
+);
+CREATE INDEX IF NOT EXISTS standings_team ON standings (source, team_id);
+
+-- Bumped every time a union/year is rewritten, for outputs derived from many of them
+CREATE TABLE IF NOT EXISTS datasets (
+    source      TEXT NOT NULL,
+    union_code  TEXT NOT NULL,
+    year        TEXT NOT NULL,
+    revision    INTEGER NOT NULL,
+    PRIMARY KEY (source, union_code, year)
+);
+
+-- Digest of the payload each league's published outputs were built from
+CREATE TABLE IF NOT EXISTS published (
+    source      TEXT NOT NULL,
+    league_id   TEXT NOT NULL,
+    digest      TEXT NOT NULL,
+    PRIMARY KEY (source, league_id)
+);
+"""
+
+
+def _id(value) -> str | None:
+    return None if value is None or value == "" else str(value)
+
+
+def _int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _dump(record) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+# Tables holding the records of a league, replaced together
+LEAGUE_RECORDS = ("officials", "fixtures", "standings", "league_teams")
+
+
+def _delete_leagues(conn: sqlite3.Connection, source: str, league_ids: list[str], tables: tuple[str, ...]) -> None:
+    rows = [(source, league_id) for league_id in league_ids]
+    for table in tables:
+        if table == "officials":
+            # Keyed by fixture, so this goes before the fixtures themselves
+            conn.executemany(
+                "DELETE FROM officials WHERE source = ? AND fixture_id IN "
+                "(SELECT fixture_id FROM fixtures WHERE source = ? AND league_id = ?)",
+                [(source, source, league_id) for league_id in league_ids],
+            )
+        else:
+            conn.executemany(f"DELETE FROM {table} WHERE source = ? AND league_id = ?", rows)
+
+
+class UnionWriter:
+    """Inserts the records of a union/year for Store.union_writer(), one short transaction per call."""
+
+    def __init__(self, store: "Store", source: str, year: str):
+        self.store = store
+        self.source = source
+        self.year = year
+
+    @metrics.instrument("store_union")
+    def add_clubs(self, clubs: dict) -> None:
+        """Insert or update club_id -> exported club record with a "name"."""
+        with self.store.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO clubs (source, club_id, name, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (source, club_id) DO UPDATE SET name = excluded.name, data = excluded.data",
+                [
+                    (self.source, str(club_id), club.get("name", ""), _dump(club))
+                    for club_id, club in clubs.items()
+                ],
+            )
+
+    @metrics.instrument("store_union")
+    def add_league(self, league_id, teams: list[tuple], fixtures: list[dict], standings: list[dict]) -> None:
+        """Replace one league's (team_id, club_id) pairs, fixtures and table rows (see save_union)."""
+        source = self.source
+        league_id = str(league_id)
+
+        fixture_rows = []
+        official_rows = []
+        for seq, fixture in enumerate(fixtures):
+            fixture_id = str(fixture["id"])
+            fixture_rows.append((
+                source, fixture_id, league_id, self.year, seq,
+                _int(fixture.get("date")), fixture.get("status"),
+                _id(fixture.get("home_team_id")), _id(fixture.get("away_team_id")),
+                _id(fixture.get("home_club_id")), _id(fixture.get("away_club_id")),
+                _dump(fixture["record"]),
+            ))
+            for i, (role, name) in enumerate(fixture.get("officials", ())):
+                official_rows.append((source, fixture_id, i, role, name))
+
+        standing_rows = [
+            (source, league_id, seq, str(row["team_id"]), _int(row.get("position")), _dump(row["record"]))
+            for seq, row in enumerate(standings)
+        ]
+
+        with self.store.transaction() as conn:
+            _delete_leagues(conn, source, [league_id], LEAGUE_RECORDS)
+
+            conn.executemany(
+                "INSERT INTO teams (source, team_id, club_id) VALUES (?, ?, ?) "
+                "ON CONFLICT (source, team_id) DO UPDATE SET club_id = excluded.club_id",
+                [(source, str(team_id), str(club_id)) for team_id, club_id in teams],
+            )
+            conn.executemany(
+                "INSERT INTO league_teams (source, league_id, seq, team_id, team_json) VALUES (?, ?, ?, ?, ?)",
+                [(source, league_id, seq, str(team_id), _dump(team_id)) for seq, (team_id, _) in enumerate(teams)],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO fixtures (source, fixture_id, league_id, year, seq, date, status, "
+                "home_team_id, away_team_id, home_club_id, away_club_id, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                fixture_rows,
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO officials (source, fixture_id, seq, role, name) VALUES (?, ?, ?, ?, ?)",
+                official_rows,
+            )
+            conn.executemany(
+                "INSERT INTO standings (source, league_id, seq, team_id, position, data) VALUES (?, ?, ?, ?, ?, ?)",
+                standing_rows,
+            )
+
+
+class LeagueRecords(Mapping):
+    """league_id -> exported records of one league, read from the store on access.
+
+    Returned by Store.export_union so writers go through a union one league
+    at a time instead of loading all of it.
+    """
+
+    def __init__(self, load: Callable[[str], list], league_ids: list[str]):
+        self._load = load
+        self._league_ids = league_ids
+
+    def __getitem__(self, league_id) -> list[dict]:
+        if str(league_id) not in self._league_ids:
+            raise KeyError(league_id)
+        return self._load(str(league_id))
+
+    def __iter__(self):
+        return iter(self._league_ids)
+
+    def __len__(self) -> int:
+        return len(self._league_ids)
+
+
+class Store:
+    """SQLite store of every league, club, team, fixture and table row scraped.
+
+    Each exported record is kept verbatim in a `data` column next to typed,
+    indexed columns, so the JSON outputs can be regenerated from the store
+    exactly while cross-union and cross-year questions are a single query.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        # Shared by provider threads; every use goes through _lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock, self.conn:
+            yield self.conn
+
+    def _query(self, sql: str, params=()) -> list[tuple]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # -----------------------------------------------------------------------
+    # Writing
+    # -----------------------------------------------------------------------
+
+    def save_union(
+        self,
+        source: str,
+        union_code: str,
+        year,
+        leagues: dict,
+        clubs: dict,
+        teams: list[tuple],
+        fixtures: dict,
+        standings: dict,
+        prune: bool = True,
+    ) -> None:
+        """Replace the given leagues of one union/year, a league at a time (see union_writer).
+
+        With prune, other leagues stored for the union/year are removed, for
+        sources whose league list is complete; otherwise they are kept.
+
+        - leagues:   league_id -> name, in output order
+        - clubs:     club_id -> exported club record with a "name"
+        - teams:     (league_id, team_id, club_id) in league table order
+        - fixtures:  league_id -> [{"id", "date", "status", "home_team_id",
+                     "away_team_id", "home_club_id", "away_club_id",
+                     "officials": [(role, name)], "record"}]
+        - standings: league_id -> [{"team_id", "position", "record"}]
+        """
+        league_teams: dict[str, list] = {}
+        for league_id, team_id, club_id in teams:
+            league_teams.setdefault(str(league_id), []).append((team_id, club_id))
+
+        with self.union_writer(source, union_code, year, leagues, prune) as writer:
+            writer.add_clubs(clubs)
+            for league_id in leagues:
+                writer.add_league(
+                    league_id,
+                    league_teams.get(str(league_id), []),
+                    fixtures.get(league_id, []),
+                    standings.get(league_id, []),
+                )
+
+    @contextmanager
+    def union_writer(self, source: str, union_code: str, year, leagues: dict, prune: bool = True):
+        """save_union one league at a time, for callers that build leagues in turn.
+
+        Each add_league() replaces its league in a short transaction of its
+        own, so the lock is not held while the caller builds the next one
+        and other providers can write their unions in between. The leagues
+        are unpublished up front, and the league list (with the removal of
+        pruned leagues) is only replaced once the block completes, so a
+        union that fails partway keeps whole leagues and is rebuilt by the
+        next run.
+        """
+        year = str(year)
+        league_ids = [str(league_id) for league_id in leagues]
+
+        # A rewritten league is unpublished until set_published() says otherwise
+        with self.transaction() as conn:
+            _delete_leagues(conn, source, league_ids, ("published",))
+
+        yield UnionWriter(self, source, year)
+
+        with self.transaction() as conn:
+            previous = [
+                row[0] for row in conn.execute(
+                    "SELECT league_id FROM leagues WHERE source = ? AND union_code = ? AND year = ?",
+                    (source, union_code, year),
+                )
+            ]
+            if prune:
+                pruned = [league_id for league_id in previous if league_id not in league_ids]
+                _delete_leagues(conn, source, pruned, LEAGUE_RECORDS + ("leagues", "published"))
+            _delete_leagues(conn, source, league_ids, ("leagues",))
+
+            conn.executemany(
+                "INSERT INTO leagues (source, league_id, union_code, year, seq, name) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (source, league_id, union_code, year, seq, name)
+                    for seq, (league_id, name) in enumerate(zip(league_ids, leagues.values()))
+                ],
+            )
+
+            conn.execute(
+                "INSERT INTO datasets (source, union_code, year, revision) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (source, union_code, year) DO UPDATE SET revision = revision + 1",
+                (source, union_code, year),
+            )
+
+    def set_published(self, source: str, digests: dict) -> None:
+        """Record league_id -> payload digest once a union's outputs are written.
+
+        Leagues with a None digest (no response cache) stay unpublished, so
+        they are always rebuilt.
+        """
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO published (source, league_id, digest) VALUES (?, ?, ?)",
+                [(source, str(league_id), digest) for league_id, digest in digests.items() if digest is not None],
+            )
+
+    # -----------------------------------------------------------------------
+    # Exports
+    # -----------------------------------------------------------------------
+
+    def leagues(self, source: str, union_code: str, year) -> dict[str, str]:
+        rows = self._query(
+            "SELECT league_id, name FROM leagues WHERE source = ? AND union_code = ? AND year = ? ORDER BY seq",
+            (source, union_code, str(year)),
+        )
+        return dict(rows)
+
+    def published(self, source: str, league_ids: Iterable) -> dict[str, str]:
+        """league_id -> digest recorded by set_published, for the leagues that have one."""
+        league_ids = [str(league_id) for league_id in league_ids]
+        return dict(self._query(
+            "SELECT league_id, digest FROM published "
+            f"WHERE source = ? AND league_id IN ({', '.join('?' * len(league_ids))})",
+            [source] + league_ids,
+        ))
+
+    def league_fixtures(self, source: str, league_id) -> list[dict]:
+        rows = self._query(
+            "SELECT data FROM fixtures WHERE source = ? AND league_id = ? ORDER BY seq",
+            (source, str(league_id)),
+        )
+        return [json.loads(data) for data, in rows]
+
+    def league_standings(self, source: str, league_id) -> list[dict]:
+        rows = self._query(
+            "SELECT data FROM standings WHERE source = ? AND league_id = ? ORDER BY seq",
+            (source, str(league_id)),
+        )
+        return [json.loads(data) for data, in rows]
+
+    def union_clubs(self, source: str, union_code: str, year) -> list[tuple[str, dict, list]]:
+        """(club_id, club record, team_ids) of the union/year, in order of first appearance."""
+        rows = self._query(
+            "SELECT t.club_id, lt.team_json, c.data FROM leagues l "
+            "JOIN league_teams lt ON lt.source = l.source AND lt.league_id = l.league_id "
+            "JOIN teams t ON t.source = lt.source AND t.team_id = lt.team_id "
+            "JOIN clubs c ON c.source = t.source AND c.club_id = t.club_id "
+            "WHERE l.source = ? AND l.union_code = ? AND l.year = ? "
+            "ORDER BY l.seq, lt.seq",
+            (source, union_code, str(year)),
+        )
+
+        clubs: dict[str, tuple[str, dict, dict]] = {}
+        for club_id, team_json, data in rows:
+            if club_id not in clubs:
+                clubs[club_id] = (club_id, json.loads(data), {})
+            clubs[club_id][2].setdefault(json.loads(team_json), None)
+        return [(club_id, club, list(team_ids)) for club_id, club, team_ids in clubs.values()]
+
+    @metrics.instrument("store_export")
+    def export_union(self, source: str, union_code: str, year) -> tuple[dict, list, Mapping, Mapping]:
+        """(leagues, clubs, fixtures, standings) of a union/year, as stored.
+
+        fixtures and standings are LeagueRecords, loaded per league on access.
+        """
+        with self._lock:
+            leagues = self.leagues(source, union_code, year)
+            return (
+                leagues,
+                self.union_clubs(source, union_code, year),
+                LeagueRecords(partial(self.league_fixtures, source), list(leagues)),
+                LeagueRecords(partial(self.league_standings, source), list(leagues)),
+            )
+
+    # -----------------------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------------------
+
+    def datasets(self) -> dict[tuple[str, str, str], int]:
+        """(source, union_code, year) -> revision of every stored union/year.
+
+        Union/years written before revisions were kept report 0.
+        """
+        rows = self._query(
+            "SELECT DISTINCT l.source, l.union_code, l.year, COALESCE(d.revision, 0) FROM leagues l "
+            "LEFT JOIN datasets d ON d.source = l.source AND d.union_code = l.union_code AND d.year = l.year"
+        )
+        return {(source, union_code, year): revision for source, union_code, year, revision in rows}
+
+    def venues(self, source: str, league_ids: Iterable) -> list[str]:
+        """Distinct non-empty venues of the leagues' fixtures."""
+        league_ids = [str(league_id) for league_id in league_ids]
+        rows = self._query(
+            "SELECT DISTINCT json_extract(data, '$.venue') FROM fixtures "
+            f"WHERE source = ? AND league_id IN ({', '.join('?' * len(league_ids))})",
+            [source] + league_ids,
+        )
+        return sorted(venue.strip() for venue, in rows if isinstance(venue, str) and venue.strip())
+
+    def fixture_ids(
+        self,
+        source: str,
+        start: float | None = None,
+        end: float | None = None,
+        league_ids: Iterable | None = None,
+    ) -> set[str]:
+        """IDs of the stored fixtures kicking off between start and end; undated ones always count."""
+        sql = "SELECT fixture_id FROM fixtures WHERE source = ?"
+        params: list = [source]
+        if league_ids is not None:
+            league_ids = [str(league_id) for league_id in league_ids]
+            sql += f" AND league_id IN ({', '.join('?' * len(league_ids))})"
+            params += league_ids
+        bounds = []
+        if start is not None:
+            bounds.append("date >= ?")
+            params.append(int(start))
+        if end is not None:
+            bounds.append("date <= ?")
+            params.append(int(end))
+        if bounds:
+            sql += f" AND (date IS NULL OR ({' AND '.join(bounds)}))"
+        return {fixture_id for fixture_id, in self._query(sql, params)}
+
+    def _fixtures_where(self, side: str, key, year, source: str) -> list[dict]:
+        # One index lookup per side; a club's derby matches both, hence UNION
+        year_clause = "" if year is None else " AND year = ?"
+        sql = (
+            f"SELECT data FROM fixtures WHERE rowid IN ("
+            f"SELECT rowid FROM fixtures WHERE source = ? AND home_{side}_id = ?{year_clause} UNION "
+            f"SELECT rowid FROM fixtures WHERE source = ? AND away_{side}_id = ?{year_clause}"
+            f") ORDER BY date, seq"
+        )
+        params = [source, str(key)] + ([] if year is None else [str(year)])
+        return [json.loads(data) for data, in self._query(sql, params * 2)]
+
+    def fixtures_for_club(self, club_id, year=None, source: str = SPORTSMANAGER) -> list[dict]:
+        """Every fixture a club's teams play in, oldest first; year=None means all years."""
+        return self._fixtures_where("club", club_id, year, source)
+
+    def fixtures_for_team(self, team_id, year=None, source: str = SPORTSMANAGER) -> list[dict]:
+        return self._fixtures_where("team", team_id, year, source)
+
+    def standings_for_team(self, team_id, source: str = SPORTSMANAGER) -> list[dict]:
+        """Table rows of a team across every league and year."""
+        rows = self._query(
+            "SELECT l.league_id, l.name, l.year, s.data FROM standings s "
+            "JOIN leagues l ON l.source = s.source AND l.league_id = s.league_id "
+            "WHERE s.source = ? AND s.team_id = ? ORDER BY l.year, l.seq",
+            (source, str(team_id)),
+        )
+        return [
+            {"league_id": league_id, "league": name, "year": year, "row": json.loads(data)}
+            for league_id, name, year, data in rows
+        ]
+
+
+# ---------------------------------------------------------------------------
+# State
+# ---------------------------------------------------------------------------
+
+_store: Store | None = None
+
+
+def set_store(store: Store | None) -> None:
+    global _store
+    _store = store
+
+
+def get_store() -> Store:
+    """The shared store, opened at STORE_PATH on first use."""
+    global _store
+    if _store is None:
+        _store = Store()
+    return _store
+
+
+# ---------------------------------------------------------------------------
+# Entrypoint
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the scraped rugby data store")
+    parser.add_argument("kind", choices=("club", "team"), help="Look up fixtures of a club or a team")
+    parser.add_argument("id", help="Club or team ID")
+    parser.add_argument(
+        "--year",
+        type=str,
+        default=str(datetime.now().year),
+        help="Season year, or 'all' (default: current year)",
+    )
+    parser.add_argument("--source", default=SPORTSMANAGER, choices=(SPORTSMANAGER, RSEQ))
+    parser.add_argument("--store", default=STORE_PATH, help=f"Store path (default: {STORE_PATH})")
+    args = parser.parse_args()
+
+    db = Store(args.store)
+    year = None if args.year == "all" else args.year
+    lookup = db.fixtures_for_club if args.kind == "club" else db.fixtures_for_team
+    print(json.dumps(lookup(args.id, year, args.source), ensure_ascii=False, indent=2))
@@ -0,0 +1,65 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class Upstream:
+    """Local HTTP stand-in serving bodies by path, with ETag validation."""
+
+    def __init__(self):
+        # path -> (body, content type)
+        self.bodies: dict[str, tuple[bytes, str]] = {}
+        # (path, If-None-Match) of every request received
+        self.requests: list[tuple[str, str | None]] = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def serve(self, path: str, body: bytes, content_type: str = "application/json") -> None:
+        self.bodies[path] = (body, content_type)
+
+    def etag(self, path: str) -> str:
+        return f'"{hash(self.bodies[path][0]) & 0xffffffff:x}"'
+
+    def _handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                upstream.requests.append((path, self.headers.get("If-None-Match")))
+                if path not in upstream.bodies:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                body, content_type = upstream.bodies[path]
+                etag = upstream.etag(path)
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def upstream():
+    server = Upstream()
+    thread = threading.Thread(target=server.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
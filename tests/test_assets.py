@@ -0,0 +1,64 @@
+import io
+
+import pytest
+
+import assets
+import output
+
+PIL = pytest.importorskip("PIL.Image")
+
+
+def png(width: int, height: int) -> bytes:
+    buf = io.BytesIO()
+    PIL.new("RGBA", (width, height), (200, 30, 30, 255)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def logos(tmp_path, monkeypatch):
+    # The output hash manifest lives under the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(output, "_hashes", None)
+    return assets.LogoStore(root="public/logos", cache_dir=".cache/logos")
+
+
+def variant(logos: assets.LogoStore, url: str, name: str):
+    return PIL.open(logos.root / url.split("/")[-2] / name)
+
+
+def test_clubs_point_at_local_copies(upstream, logos):
+    upstream.serve("/crest.png", png(300, 150), "image/png")
+    remote = f"{upstream.url}/crest.png"
+    clubs = {"10": {"name": "Crimson Tide", "logo": remote}, "20": {"name": "No Logo", "logo": ""}}
+
+    localized = logos.localize_clubs(clubs)
+
+    local = localized["10"]["logo"]
+    assert local.startswith(f"{assets.LOGO_URL}/") and local.endswith("/128.png")
+    assert localized["20"] == clubs["20"]
+    assert variant(logos, local, "128.png").size == (128, 128)
+    assert variant(logos, local, "64.webp").size == (64, 64)
+
+
+def test_small_logos_are_not_upscaled(upstream, logos):
+    upstream.serve("/small.png", png(58, 58), "image/png")
+
+    local = logos.localize([f"{upstream.url}/small.png"])[f"{upstream.url}/small.png"]
+
+    assert variant(logos, local, "128.png").size == (58, 58)
+    assert variant(logos, local, "64.png").size == (58, 58)
+
+
+def test_next_run_fetches_conditionally(upstream, logos):
+    upstream.serve("/crest.png", png(300, 150), "image/png")
+    remote = f"{upstream.url}/crest.png"
+    first = logos.localize([remote])[remote]
+
+    # A new run starts with an empty URL map but the same validator cache
+    again = assets.LogoStore(root="public/logos", cache_dir=".cache/logos")
+    assert again.localize([remote]) == {remote: first}
+    assert upstream.requests == [("/crest.png", None), ("/crest.png", upstream.etag("/crest.png"))]
+
+    upstream.serve("/crest.png", png(200, 200), "image/png")
+    replaced = assets.LogoStore(root="public/logos", cache_dir=".cache/logos").localize([remote])[remote]
+    assert replaced != first
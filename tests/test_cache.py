@@ -0,0 +1,79 @@
+import hashlib
+import json
+
+import pytest
+
+import transport
+from cache import ResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "http"))
+    transport.set_cache(cache)
+    yield cache
+    transport.set_cache(None)
+
+
+def test_conditional_request_reports_cached_digest(upstream, cache):
+    body = json.dumps({"data": [1, 2, 3]}).encode("utf-8")
+    upstream.serve("/feed", body)
+
+    data, digest = transport.fetch_json(f"{upstream.url}/feed", {"id": 1})
+    again, same = transport.fetch_json(f"{upstream.url}/feed", {"id": 1})
+
+    assert data == again == {"data": [1, 2, 3]}
+    assert digest == same == hashlib.sha256(body).hexdigest()
+    # The second request is conditional and answered with a 304
+    assert upstream.requests == [("/feed", None), ("/feed", upstream.etag("/feed"))]
+
+
+def test_changed_body_gets_a_new_digest(upstream, cache):
+    upstream.serve("/feed", b'{"pts": 58}')
+    _, before = transport.fetch_json(f"{upstream.url}/feed")
+
+    upstream.serve("/feed", b'{"pts": 99}')
+    data, after = transport.fetch_json(f"{upstream.url}/feed")
+
+    assert data == {"pts": 99}
+    assert before != after
+
+
+def test_fetching_does_not_mark_a_payload_published(upstream, cache):
+    # Whether a payload changed is up to the caller, against what it last
+    # published: a second fetch of a changed body must report the same
+    # new digest rather than "unchanged".
+    upstream.serve("/feed", b'{"pts": 58}')
+    _, published = transport.fetch_json(f"{upstream.url}/feed")
+
+    upstream.serve("/feed", b'{"pts": 99}')
+    _, first = transport.fetch_json(f"{upstream.url}/feed")
+    _, second = transport.fetch_json(f"{upstream.url}/feed")
+
+    assert first == second != published
+
+
+def test_streamed_documents_share_the_digest(upstream, cache):
+    body = json.dumps({"data": {"fixtures": [{"id": 1}, {"id": 2}]}}).encode("utf-8")
+    upstream.serve("/feed", body)
+
+    document, digest = transport.fetch_document(f"{upstream.url}/feed", root=("data",))
+    again, same = transport.fetch_document(f"{upstream.url}/feed", root=("data",))
+
+    assert list(document["fixtures"]) == list(again["fixtures"]) == [{"id": 1}, {"id": 2}]
+    assert digest == same == hashlib.sha256(body).hexdigest()
+
+
+def test_without_cache_every_payload_counts_as_changed(upstream):
+    upstream.serve("/feed", b"{}")
+    assert transport.fetch_json(f"{upstream.url}/feed") == ({}, None)
+
+
+def test_eviction_trims_to_max_bytes(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10)
+    for i in range(3):
+        key = cache.key("https://example.invalid", {"i": i})
+        cache.store(key, "https://example.invalid", {"i": i}, b"x" * 8, {})
+
+    assert cache.evict() == 2
+    assert len(list(tmp_path.glob("*.body"))) == 1
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import calendars
+
+ics = pytest.importorskip("ics")
+
+DTSTAMP = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+# Properties that legitimately differ between the backends
+IGNORED = {"PRODID", "DTSTAMP"}
+
+FIXTURES = [
+    pytest.param(
+        {"fixtureId": 1, "fixtureDate": 1788000000, "venue": "Brockton Oval", "venuelat": "49.3", "venuelng": "-123.1"},
+        "Ravens", "Blues", "Division 1",
+        id="basic",
+    ),
+    pytest.param(
+        {"fixtureId": 2, "fixtureDate": 1788000000, "venue": "Stade Émile-Legault, Montréal; Terrain 2"},
+        "Rouge et Or", "Carabins", "Universitaire Féminin — Saison régulière",
+        id="escaping-and-accents",
+    ),
+    pytest.param(
+        {"fixtureId": 3, "fixtureDate": 1790000000},
+        "Home Team", "Away Team", "",
+        id="no-venue",
+    ),
+    pytest.param(
+        {"fixtureId": 4, "fixtureDate": 1790000000, "venue": "Pitch 1\nBehind the clubhouse"},
+        "A" * 60, "B" * 60, "Long names are folded over several content lines " * 3,
+        id="folding",
+    ),
+]
+
+
+def components(text: str) -> list:
+    """Unfolded calendar as nested (name, sorted properties, sorted children) tuples."""
+    lines = text.replace("\r\n", "\n").replace("\n ", "").splitlines()
+    stack = [("ROOT", [], [])]
+    for line in lines:
+        name, _, value = line.partition(":")
+        if name == "BEGIN":
+            stack.append((value, [], []))
+        elif name == "END":
+            component, properties, children = stack.pop()
+            assert component == value
+            stack[-1][2].append((component, sorted(properties), sorted(children)))
+        elif name not in IGNORED:
+            stack[-1][1].append(line)
+    assert len(stack) == 1
+    return stack[0][2]
+
+
+@pytest.mark.parametrize("fixture,home,away,league", FIXTURES)
+def test_fast_backend_matches_ics_library(fixture, home, away, league):
+    fast = calendars.render_calendar([
+        calendars.fixture_event_lines(fixture, home, away, "bc", league, dtstamp=DTSTAMP),
+    ])
+    slow = calendars.render_fixture_ics(fixture, home, away, "bc", league, dtstamp=DTSTAMP)
+
+    assert components(fast) == components(slow)
+
+
+def test_lines_are_folded_at_75_octets():
+    fixture = {"fixtureId": 5, "fixtureDate": 1788000000, "venue": "é" * 100}
+    text = calendars.render_calendar([calendars.fixture_event_lines(fixture, "Home", "Away", "qc", dtstamp=DTSTAMP)])
+
+    assert all(len(line.encode("utf-8")) <= calendars.MAX_LINE_OCTETS for line in text.split("\r\n"))
+    assert "LOCATION:" + "é" * 100 in text.replace("\r\n ", "")
+
+
+def test_content_digest_ignores_dtstamp():
+    fixture = {"fixtureId": 6, "fixtureDate": 1788000000}
+    first = calendars.render_calendar([calendars.fixture_event_lines(fixture, "Home", "Away", "bc", dtstamp=DTSTAMP)])
+    later = calendars.render_calendar([calendars.fixture_event_lines(fixture, "Home", "Away", "bc")])
+
+    assert first != later
+    assert calendars.content_digest(first) == calendars.content_digest(later)
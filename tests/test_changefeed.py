@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+import changefeed
+import output
+import shards
+
+LEAGUES = {"1": "Premier"}
+CLUBS = {}
+
+
+def fixture(fixture_id: int, **fields) -> dict:
+    return {"fixtureId": fixture_id, "fixtureDate": 1788000000, "venue": "Brockton Oval",
+            "status": "", "home_score": None, "away_score": None, "round": 1, **fields}
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    # The output hash manifest lives under the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(output, "_hashes", None)
+    return "src/data/bc/2026"
+
+
+def publish(output_dir: str, fixtures: list[dict], standings: list[dict]) -> int:
+    """One run: record the changes, then write the snapshot, as Provider.publish does."""
+    count = changefeed.record(output_dir, {"1": fixtures}, {"1": standings})
+    shards.write_union(output_dir, LEAGUES, CLUBS, {"1": fixtures}, {"1": standings})
+    return count
+
+
+def feed(output_dir: str) -> list[dict]:
+    with open(os.path.join(output_dir, changefeed.CHANGES_FILE), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_baseline_run_records_nothing(output_dir):
+    assert publish(output_dir, [fixture(1)], [{"team_id": 100, "pos": 1}]) == 0
+
+    assert not os.path.exists(os.path.join(output_dir, changefeed.CHANGES_FILE))
+    assert changefeed.read_cursor(output_dir) == {"seq": 0, "offset": 0, "updated_at": None}
+
+
+def test_event_types(output_dir):
+    publish(output_dir, [fixture(1), fixture(2), fixture(3), fixture(4)], [{"team_id": 100, "pos": 1}])
+
+    count = publish(output_dir, [
+        fixture(1, fixtureDate=1788086400),
+        fixture(2, status="Result", home_score=24, away_score=17),
+        fixture(3, round=2),
+        fixture(5),
+    ], [])
+
+    events = {(event["type"], event.get("fixtureId", event.get("team_id"))) for event in feed(output_dir)}
+    assert events == {
+        ("fixture_rescheduled", 1),
+        ("score_changed", 2),
+        ("fixture_updated", 3),
+        ("fixture_removed", 4),
+        ("fixture_added", 5),
+        ("table_row_removed", 100),
+    }
+    assert count == len(events)
+
+    changes = {event["type"]: event.get("changes") for event in feed(output_dir)}
+    assert changes["fixture_rescheduled"] == {"fixtureDate": 1788086400}
+    assert changes["score_changed"] == {"status": "Result", "home_score": 24, "away_score": 17}
+    assert changes["fixture_updated"] == {"round": 2}
+
+
+def test_seq_and_cursor_follow_the_feed(output_dir):
+    publish(output_dir, [fixture(1)], [])
+    publish(output_dir, [fixture(1, venue="Empire Field")], [])
+    publish(output_dir, [fixture(1, venue="Empire Field"), fixture(2)], [{"team_id": 100, "pos": 1}])
+    # Unchanged runs append nothing
+    assert publish(output_dir, [fixture(1, venue="Empire Field"), fixture(2)], [{"team_id": 100, "pos": 1}]) == 0
+
+    seqs = [event["seq"] for event in feed(output_dir)]
+    assert seqs == list(range(1, 4))
+
+    cursor = changefeed.read_cursor(output_dir)
+    assert cursor["seq"] == 3
+    assert cursor["offset"] == os.path.getsize(os.path.join(output_dir, changefeed.CHANGES_FILE))
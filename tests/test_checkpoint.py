@@ -0,0 +1,39 @@
+import checkpoint
+
+
+def test_resume_reads_what_the_interrupted_run_finished(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    journal = checkpoint.Journal(path)
+    journal.record("bc", 2026, 133290, digest="a" * 64)
+    journal.record("bc", 2026)
+    journal.record("nb", 2026, 141600, digest=None)
+    # The run was killed halfway through writing a line
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": ["nb", "2026", "1416')
+
+    resumed = checkpoint.Journal(path, resume=True)
+
+    assert len(resumed) == 3
+    assert resumed.started_at is not None
+    assert resumed.done("bc", "2026") and not resumed.done("nb", 2026)
+    assert resumed.digest("bc", 2026, "133290") == "a" * 64
+    assert resumed.done("nb", 2026, 141600) and resumed.digest("nb", 2026, 141600) is None
+
+
+def test_new_run_discards_the_journal(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    checkpoint.Journal(path).record("bc", 2026)
+
+    assert len(checkpoint.Journal(path)) == 0
+    assert len(checkpoint.Journal(path, resume=True)) == 0
+
+
+def test_clear_after_a_clean_run(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    journal = checkpoint.Journal(str(path))
+    journal.record("bc", 2026)
+
+    journal.clear()
+
+    assert not path.exists()
+    assert not journal.done("bc", 2026)
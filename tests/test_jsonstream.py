@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+import jsonstream
+import transport
+
+PAYLOAD = {
+    "status": "ok",
+    "data": {
+        "name": "Premier",
+        "leagueTable": [{"team_id": 100, "pts": 12.5}, {"team_id": 101, "pts": -3}],
+        "fixtures": [{"fixtureId": i, "venue": "Stade Émile-Legault", "tags": [i, {"x": None}]} for i in range(50)],
+        "empty": [],
+        "missing": None,
+    },
+}
+
+
+@pytest.fixture
+def document(tmp_path, monkeypatch):
+    # A tiny window so values are cut off at every possible position
+    monkeypatch.setattr(jsonstream, "CHUNK_SIZE", 7)
+    path = tmp_path / "payload.json"
+    path.write_text(json.dumps(PAYLOAD, ensure_ascii=False), encoding="utf-8")
+    return jsonstream.Document(str(path), ("data",))
+
+
+def test_arrays_decode_like_json_load(document):
+    assert list(document["fixtures"]) == PAYLOAD["data"]["fixtures"]
+    assert list(document["leagueTable"]) == PAYLOAD["data"]["leagueTable"]
+    # Documents can be walked more than once
+    assert list(document["fixtures"]) == PAYLOAD["data"]["fixtures"]
+
+
+def test_missing_and_null_arrays_are_empty(document):
+    assert list(document["empty"]) == []
+    assert list(document["missing"]) == []
+    assert list(document["absent"]) == []
+
+
+def test_path_to_a_non_array_is_an_error(document):
+    with pytest.raises(ValueError):
+        list(document["name"])
+
+
+def test_streamed_response_holds_its_host_slot(upstream, monkeypatch):
+    monkeypatch.setattr(transport, "_host_slots", {})
+    monkeypatch.setattr(transport, "_per_host_limit", 1)
+    upstream.serve("/payload", json.dumps(PAYLOAD).encode("utf-8"))
+    url = f"{upstream.url}/payload"
+    slot = transport.host_slot(url)
+
+    document, _ = transport.fetch_document(url, root=("data",))
+    try:
+        # Released once the body was spooled to disk
+        assert slot.acquire(blocking=False)
+        slot.release()
+        assert list(document["leagueTable"]) == PAYLOAD["data"]["leagueTable"]
+    finally:
+        document.discard()
+
+    with transport.get(url, stream=True) as response:
+        # Held while the body is still being read
+        assert not slot.acquire(blocking=False)
+        response.content
+    assert slot.acquire(blocking=False)
+    slot.release()
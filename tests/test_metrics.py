@@ -0,0 +1,36 @@
+import pytest
+
+import metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_stages_add_up_per_scope():
+    with metrics.scope("bc/1"):
+        metrics.add("http", seconds=1.0, nbytes=10)
+        metrics.add("http", seconds=0.5, nbytes=5)
+    with metrics.scope("nb/2"):
+        metrics.add("http", seconds=2.0)
+
+    report = metrics.report()
+    assert report["scopes"]["bc/1"]["stages"]["http"] == {"calls": 2, "seconds": 1.5, "bytes": 15, "files": 0}
+    assert report["totals"]["http"]["calls"] == 3
+
+
+@pytest.mark.skipif(metrics.resource is None, reason="needs the resource module")
+def test_scopes_report_growth_of_the_process_peak():
+    with metrics.scope("big"):
+        data = b"x" * (64 * 1024 * 1024)
+    del data
+    # Memory freed by earlier scopes does not lower the high-water mark
+    with metrics.scope("small"):
+        pass
+
+    scopes = metrics.report()["scopes"]
+    assert scopes["big"]["peak_rss_growth_kb"] > 32 * 1024
+    assert scopes["small"]["peak_rss_growth_kb"] == 0
@@ -0,0 +1,119 @@
+import os
+import stat
+import sys
+import threading
+import time
+
+import pytest
+
+import output
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # The output hash manifest lives under the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(output, "_hashes", None)
+    yield tmp_path
+    output.set_writer(None)
+
+
+def mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX permissions")
+@pytest.mark.parametrize("background", [False, True])
+def test_published_files_get_the_umask_mode(workdir, background):
+    if background:
+        output.set_writer(output.BackgroundWriter(4))
+    umask = os.umask(0)
+    os.umask(umask)
+
+    output.write_file("public/calendar/1.ics", "BEGIN:VCALENDAR\nEND:VCALENDAR\n")
+    output.write_json("src/data/bc/2026/leagues.json", {"1": "Premier"})
+    output.atomic_write("metrics.prom", b"http_calls 1\n")
+    output.flush()
+
+    for path in ("public/calendar/1.ics", "src/data/bc/2026/leagues.json", "metrics.prom"):
+        assert mode(path) == 0o666 & ~umask, path
+
+
+def test_background_writes_are_applied_in_order(workdir, monkeypatch):
+    committed = []
+    commit = output._commit
+
+    def record(jobs):
+        committed.extend(job.path.name for job in jobs)
+        return commit(jobs)
+
+    monkeypatch.setattr(output, "_commit", record)
+    output.set_writer(output.BackgroundWriter(2))
+
+    for version in range(5):
+        output.write_file("a.json", f"{version}")
+        output.write_file("b.json", f"{version}")
+    output.flush()
+
+    assert committed == ["a.json", "b.json"] * 5
+    assert open("a.json").read() == open("b.json").read() == "4"
+
+
+@pytest.mark.parametrize("stop", ["flush", "close"])
+def test_background_write_errors_reach_the_caller(workdir, monkeypatch, stop):
+    def fail(jobs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(output, "_commit", fail)
+    writer = output.BackgroundWriter(2)
+    output.set_writer(writer)
+
+    output.write_file("a.json", "{}")
+    with pytest.raises(OSError, match="disk full"):
+        getattr(writer, stop)()
+    # The error is raised once
+    writer.flush()
+
+
+def test_full_queue_holds_the_producer_back(workdir, monkeypatch):
+    release = threading.Event()
+    commit = output._commit
+
+    def slow(jobs):
+        release.wait()
+        return commit(jobs)
+
+    monkeypatch.setattr(output, "_commit", slow)
+    writer = output.BackgroundWriter(2)
+    output.set_writer(writer)
+    queued = []
+
+    def produce():
+        for n in range(6):
+            output.write_file(f"{n}.json", f"{n}")
+            queued.append(n)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    # One write is held by the worker and two wait in the queue
+    deadline = time.monotonic() + 5
+    while len(queued) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert len(queued) == 3 and producer.is_alive()
+
+    release.set()
+    producer.join(5)
+    output.flush()
+    assert len(queued) == 6
+    assert sorted(os.listdir(workdir)) == sorted(f"{n}.json" for n in range(6))
+
+
+@pytest.mark.parametrize("policy, syncs", [("none", 0), ("batch", 1), ("always", 1)])
+def test_append_follows_the_fsync_policy(workdir, monkeypatch, policy, syncs):
+    synced = []
+    monkeypatch.setattr(output.os, "fsync", synced.append)
+    monkeypatch.setattr(output, "_fsync", policy)
+
+    assert output.append_file("changes.jsonl", "{}\n") == 3
+    assert len(synced) == syncs
@@ -0,0 +1,86 @@
+import pytest
+
+import calendars
+import main
+import output
+import store
+from registry import ClubRegistry
+
+NOW = 1788000000
+DAY = calendars.DAY
+
+
+def raw_fixture(fixture_id: int, kickoff) -> dict:
+    return {
+        "fixtureId": fixture_id, "fixtureDate": kickoff, "status": "",
+        "homeTeamId": 100, "homeClubId": 10, "awayTeamId": 200, "awayClubId": 20,
+    }
+
+
+@pytest.fixture
+def retention():
+    calendars.set_retention(7, 30)
+    yield calendars.retention_window(NOW)
+    calendars.set_retention(None, None)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # The output hash manifest lives under the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(output, "_hashes", None)
+    db = store.Store(":memory:")
+    store.set_store(db)
+    yield db
+    store.set_store(None)
+    db.close()
+
+
+def test_window_bounds(retention):
+    assert retention == (NOW - 7 * DAY, NOW + 30 * DAY)
+    assert calendars.in_window({"fixtureDate": NOW - 7 * DAY}, retention)
+    assert not calendars.in_window({"fixtureDate": NOW - 8 * DAY}, retention)
+    assert not calendars.in_window({"fixtureDate": NOW + 31 * DAY}, retention)
+    # Undated fixtures are always published
+    assert calendars.in_window({"fixtureDate": None}, retention)
+
+
+def test_unlimited_by_default():
+    assert calendars.retention_window(NOW) == (None, None)
+    assert calendars.in_window({"fixtureDate": 0}, (None, None))
+
+
+def test_only_fixtures_in_the_window_get_calendars(retention):
+    league = {
+        "fixtures": [raw_fixture(1, NOW - 30 * DAY), raw_fixture(2, NOW + DAY), raw_fixture(3, NOW + 90 * DAY)],
+        "leagueTable": [],
+    }
+    clubs = ClubRegistry()
+
+    changed = main.process_competition("bc", "Premier", league, clubs, True, retention, frozenset())
+    # Every fixture still feeds the club and league calendars
+    assert len(changed["events"]) == 3
+    assert [fixture_id for fixture_id, *_ in changed["ics"]] == [2]
+
+    # Unchanged payloads only render the calendars that are not published yet
+    unchanged = main.process_competition("bc", "Premier", league, clubs, False, retention, frozenset({"2"}))
+    assert unchanged["ics"] == []
+    entered = main.process_competition("bc", "Premier", league, clubs, False, retention, frozenset())
+    assert [fixture_id for fixture_id, *_ in entered["ics"]] == [2]
+
+
+def test_collect_removes_calendars_outside_the_window(workdir, retention, monkeypatch):
+    monkeypatch.setattr(calendars, "retention_window", lambda now=None: retention)
+    fixtures = [
+        {"id": fixture_id, "date": kickoff, "home_team_id": 100, "away_team_id": 200,
+         "home_club_id": 10, "away_club_id": 20, "record": {"fixtureId": fixture_id}}
+        for fixture_id, kickoff in [(1, NOW - 30 * DAY), (2, NOW + DAY), (3, None)]
+    ]
+    workdir.save_union(store.SPORTSMANAGER, "bc", 2026, {"1": "Premier"}, {}, [], {"1": fixtures}, {})
+
+    # 4 is a fixture that no longer exists upstream
+    for fixture_id in (1, 2, 3, 4):
+        main.write_ics(fixture_id, f"BEGIN:VCALENDAR\nUID:{fixture_id}\nEND:VCALENDAR\n")
+
+    assert main.collect_calendars() == 2
+    assert main.published_calendars() == {"2", "3"}
@@ -0,0 +1,9 @@
+from rseq import Rseq
+
+
+def test_games_on_the_same_day_get_their_own_key():
+    first = {"home_id": "A1", "away_id": "B2", "date": "2026-09-12", "time": "13:00"}
+    second = {**first, "time": "15:30"}
+
+    assert Rseq.fixture_key(first) != Rseq.fixture_key(second)
+    assert Rseq.fixture_key(first) == Rseq.fixture_key(dict(first))
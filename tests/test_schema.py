@@ -0,0 +1,32 @@
+import random
+
+import main
+from generate_sample_data import generate_league_table_payload
+from schema import Projection
+
+
+def test_keep_is_an_allow_list_in_raw_order():
+    projection = Projection(keep={"b", "a"}, extra={"sum": lambda raw: raw["a"] + raw["b"]})
+    assert list(projection({"b": 2, "x": 0, "a": 1})) == ["b", "a", "sum"]
+
+
+def test_transform_of_missing_key_is_appended():
+    projection = Projection(keep={"a", "t"}, transform={"t": lambda value: value or []})
+    assert projection({"a": 1}) == {"a": 1, "t": []}
+
+
+def test_only_known_noise_is_dropped():
+    payload = generate_league_table_payload(133290, teams=4, fixtures=2, rng=random.Random(0))
+    raw = dict(payload["data"]["fixtures"][0], newUpstreamField="kept")
+    row = dict(payload["data"]["leagueTable"][0], pointsDifference=12, position=1, goalsFor=3)
+
+    fixture = main.normalize_fixture(raw)
+    table_row = main.TABLE_ROW_PROJECTION(row)
+
+    # Fields the projections do not know about still reach the site
+    assert fixture["newUpstreamField"] == "kept"
+    assert table_row["pointsDifference"] == 12 and table_row["position"] == 1
+    assert not main.FIXTURE_PROJECTION.drop & set(fixture)
+    assert "goalsFor" not in table_row
+    assert fixture["home"]["score"] == raw["homeScore"].split(";")[0]
+    assert fixture["matchOfficials"][0] == {"role": "Referee", "name": raw["matchOfficials"]["1"]["name"]}
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import output
+import search
+import store
+
+
+@pytest.mark.parametrize("text, folded", [
+    ("Stade Émile-Legault", "stade emile legault"),
+    ("  Université Laval — Rouge & Or ", "universite laval rouge or"),
+    ("STRASSE Straße", "strasse strasse"),
+    ("Ｆｕｌｌ ｗｉｄｔｈ", "full width"),
+    ("Montréal_Wanderers", "montreal wanderers"),
+])
+def test_fold(text, folded):
+    assert search.fold(text) == folded
+
+
+def test_tokens_skip_short_words():
+    assert search.tokens("Division 1 - Côte-Nord") == {"division", "cote", "nord"}
+    assert search.trigrams("cote") == {"cot", "ote"}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # The output hash manifest lives under the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(output, "_hashes", None)
+    db = store.Store(":memory:")
+    db.save_union(
+        store.SPORTSMANAGER, "qc", 2026, {"1": "Première Division"},
+        {"10": {"name": "Club de Rugby de Québec"}}, [("1", 100, 10)],
+        {"1": [{"id": 5, "date": None, "home_club_id": 10, "record": {"venue": "Stade Émile-Legault"}}]},
+        {},
+    )
+    yield db
+    db.close()
+
+
+def lookup(query: str) -> list[str]:
+    """Names of the records holding every token of query, as the site looks them up."""
+    with open(f"{search.SEARCH_DIR}/{search.INDEX_FILE}", encoding="utf-8") as f:
+        index = json.load(f)
+    matches = None
+    for token in search.tokens(query):
+        with open(f"{search.SEARCH_DIR}/terms/{token[:index['shard_chars']]}.json", encoding="utf-8") as f:
+            postings = json.load(f)["tokens"]
+        ids = {doc_id for term, doc_ids in postings.items() if term.startswith(token) for doc_id in doc_ids}
+        matches = ids if matches is None else matches & ids
+
+    names = []
+    for doc_id in sorted(matches or ()):
+        with open(f"{search.SEARCH_DIR}/docs/{doc_id // index['docs_per_shard']}.json", encoding="utf-8") as f:
+            names.append(json.load(f)[str(doc_id)]["name"])
+    return names
+
+
+def test_queries_match_without_accents(db):
+    assert search.build(db)
+
+    assert lookup("emile") == ["Stade Émile-Legault"]
+    assert lookup("QUÉBEC rugby") == ["Club de Rugby de Québec"]
+    assert lookup("prem div") == ["Première Division"]
+    assert lookup("stade") == ["Stade Émile-Legault"]
+
+
+def test_unchanged_store_keeps_the_index(db):
+    assert search.build(db)
+    assert not search.build(db)
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+
+import main
+
+SEASONS = [
+    {"seasonid": "901", "name": "2023 Season", "active": "no"},
+    {"seasonid": "902", "name": "2024 Season", "active": "no"},
+    {"seasonid": "903", "name": "2025 Season", "active": "yes"},
+]
+
+
+@pytest.fixture
+def seasons(monkeypatch):
+    monkeypatch.setattr(main, "fetch_seasons", lambda user_id: SEASONS)
+
+
+def test_active_season_defaults_to_the_current_year(seasons):
+    assert main.plan_union_seasons(1, None, None) == [("903", datetime.now().year, False)]
+    assert main.plan_union_seasons(1, 2024, None) == [("903", 2024, False)]
+
+
+def test_closed_seasons_already_scraped_are_skipped(seasons):
+    assert main.plan_union_seasons(1, None, (None, None)) == [
+        ("901", 2023, True), ("902", 2024, True), ("903", 2025, False),
+    ]
+    assert main.plan_union_seasons(1, None, (None, None), closed={"901"}) == [
+        ("902", 2024, True), ("903", 2025, False),
+    ]
+    # The active season is scraped again even once recorded
+    assert main.plan_union_seasons(1, None, (None, None), closed={"903"})[-1] == ("903", 2025, False)
+
+
+def test_closed_seasons_stay_skipped_across_runs(seasons, tmp_path):
+    path = str(tmp_path / "closed_seasons.json")
+    main.save_closed_seasons({"bc": ["901", "902"]}, path)
+
+    closed = main.load_closed_seasons(path)
+    assert main.plan_union_seasons(1, None, (None, None), closed.get("bc", [])) == [("903", 2025, False)]
+    assert main.plan_union_seasons(1, None, (None, None), closed.get("nb", []))[0] == ("901", 2023, True)
+
+
+@pytest.mark.parametrize("spec, season_ids", [
+    ("2024", ["902"]),
+    ("2024-2025", ["902", "903"]),
+    ("2019-2022", []),
+])
+def test_season_range_picks_the_requested_seasons(seasons, spec, season_ids):
+    plan = main.plan_union_seasons(1, None, main.parse_season_range(spec))
+    assert [season_id for season_id, _, _ in plan] == season_ids
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+import output
+import shards
+
+LEAGUES = {"1": "Premier", "2": "Division 1"}
+CLUBS = {"10": {"name": "Crimson Tide", "logo": "", "team_ids": [100]}}
+FIXTURES = {
+    "1": [{"fixtureId": 1, "fixtureDate": 1788000000}, {"fixtureId": 2, "fixtureDate": 1790000000}],
+    "2": [{"fixtureId": 3, "fixtureDate": None}],
+}
+STANDINGS = {"1": [{"pos": 1, "team_id": 100}], "2": []}
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    # The output hash manifest lives under the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(output, "_hashes", None)
+    yield "src/data/bc/2026"
+    shards.set_legacy(False)
+    shards.set_months(False)
+    output.set_minify(False)
+
+
+def files(output_dir: str) -> set[str]:
+    return {
+        os.path.relpath(os.path.join(root, name), output_dir)
+        for root, _, names in os.walk(output_dir)
+        for name in names
+    }
+
+
+def test_dropped_league_shards_are_removed(output_dir):
+    shards.write_union(output_dir, LEAGUES, CLUBS, FIXTURES, STANDINGS)
+    assert "fixtures/2.json" in files(output_dir)
+
+    shards.write_union(output_dir, {"1": "Premier"}, CLUBS, FIXTURES, STANDINGS)
+
+    assert files(output_dir) == {
+        "manifest.json", "leagues.json", "clubs.json", "fixtures/1.json", "standings/1.json",
+    }
+
+
+def test_layout_toggles_leave_no_stale_files(output_dir):
+    shards.set_legacy(True)
+    shards.write_union(output_dir, LEAGUES, CLUBS, FIXTURES, STANDINGS)
+    assert {"fixtures.json", "standings.json", "fixtures/1.json"} <= files(output_dir)
+
+    shards.set_legacy(False)
+    shards.set_months(True)
+    shards.write_union(output_dir, LEAGUES, CLUBS, FIXTURES, STANDINGS)
+
+    written = files(output_dir)
+    assert {"fixtures/1/2026-08.json", "fixtures/1/2026-09.json", "fixtures/2/undated.json"} <= written
+    assert not {"fixtures.json", "standings.json", "fixtures/1.json", "fixtures/2.json"} & written
+    assert set(shards.expected_files(output_dir)) == written
+
+    shards.set_months(False)
+    shards.write_union(output_dir, LEAGUES, CLUBS, FIXTURES, STANDINGS)
+
+    assert "fixtures/1.json" in files(output_dir)
+    assert not any(path.startswith(("fixtures/1/", "fixtures/2/")) for path in files(output_dir))
+
+
+@pytest.mark.parametrize("toggle", [
+    lambda: shards.set_months(True),
+    lambda: shards.set_legacy(True),
+    lambda: output.set_minify(True),
+])
+def test_outputs_are_stale_under_other_options(output_dir, toggle):
+    shards.write_union(output_dir, LEAGUES, CLUBS, FIXTURES, STANDINGS)
+    assert shards.outputs_current(output_dir, LEAGUES)
+
+    toggle()
+
+    assert not shards.outputs_current(output_dir, LEAGUES)
@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+import store
+
+
+def fixture(fixture_id, date=1788000000) -> dict:
+    return {
+        "id": fixture_id, "date": date, "status": "", "home_team_id": 1, "away_team_id": 2,
+        "home_club_id": 10, "away_club_id": 20, "officials": [], "record": {"fixtureId": fixture_id},
+    }
+
+
+@pytest.fixture
+def db():
+    db = store.Store(":memory:")
+    yield db
+    db.close()
+
+
+def test_writer_does_not_hold_the_lock_between_leagues(db):
+    written = threading.Event()
+
+    def other_union():
+        with db.union_writer(store.SPORTSMANAGER, "nb", 2026, {"2": "NB League"}) as writer:
+            writer.add_league("2", [], [fixture(200)], [])
+        written.set()
+
+    with db.union_writer(store.SPORTSMANAGER, "bc", 2026, {"1": "BC League"}) as writer:
+        writer.add_league("1", [], [fixture(100)], [])
+        thread = threading.Thread(target=other_union)
+        thread.start()
+        # The other union is written while this one is still being built
+        assert written.wait(5)
+        thread.join()
+
+    assert db.leagues(store.SPORTSMANAGER, "bc", 2026) == {"1": "BC League"}
+    assert db.leagues(store.SPORTSMANAGER, "nb", 2026) == {"2": "NB League"}
+    assert db.fixture_ids(store.SPORTSMANAGER) == {"100", "200"}
+
+
+def test_failed_union_keeps_whole_leagues_and_is_unpublished(db):
+    leagues = {"1": "Premier", "2": "Division 1"}
+    db.save_union(store.SPORTSMANAGER, "bc", 2026, leagues, {}, [], {"1": [fixture(1)], "2": [fixture(2)]}, {})
+    db.set_published(store.SPORTSMANAGER, {"1": "a", "2": "b"})
+
+    with pytest.raises(RuntimeError):
+        with db.union_writer(store.SPORTSMANAGER, "bc", 2026, leagues) as writer:
+            writer.add_league("1", [], [fixture(3)], [])
+            raise RuntimeError("fetch failed")
+
+    assert db.leagues(store.SPORTSMANAGER, "bc", 2026) == leagues
+    assert db.fixture_ids(store.SPORTSMANAGER) == {"2", "3"}
+    assert db.published(store.SPORTSMANAGER, leagues) == {}
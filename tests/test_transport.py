@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+import transport
+
+URL = "https://upstream.test/feed"
+
+
+def response(status: int, retry_after: str | None = None) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    r._content = b"{}"
+    if retry_after is not None:
+        r.headers["Retry-After"] = retry_after
+    return r
+
+
+class FakeSession:
+    """Hands out the queued outcomes in order; exceptions are raised."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(transport.time, "sleep", delays.append)
+    return delays
+
+
+def use(monkeypatch, session: FakeSession) -> FakeSession:
+    monkeypatch.setattr(transport, "get_session", lambda: session)
+    return session
+
+
+def test_retries_connection_errors(monkeypatch, sleeps):
+    session = use(monkeypatch, FakeSession(requests.ConnectionError("reset"), requests.Timeout("slow"), response(200)))
+
+    assert transport.get(URL).status_code == 200
+    assert session.calls == 3
+    assert len(sleeps) == 2
+    assert all(0 <= delay <= transport.BACKOFF_MAX for delay in sleeps)
+
+
+def test_connection_errors_raise_once_retries_are_exhausted(monkeypatch, sleeps):
+    use(monkeypatch, FakeSession(*[requests.ConnectionError("reset")] * (transport.MAX_RETRIES + 1)))
+
+    with pytest.raises(requests.ConnectionError):
+        transport.get(URL)
+    assert len(sleeps) == transport.MAX_RETRIES
+
+
+@pytest.mark.parametrize("status", sorted(transport.RETRY_STATUSES))
+def test_retries_transient_statuses(monkeypatch, sleeps, status):
+    session = use(monkeypatch, FakeSession(response(status), response(200)))
+
+    assert transport.get(URL).status_code == 200
+    assert session.calls == 2
+
+
+def test_other_statuses_are_returned_at_once(monkeypatch, sleeps):
+    session = use(monkeypatch, FakeSession(response(404)))
+
+    assert transport.get(URL).status_code == 404
+    assert session.calls == 1 and sleeps == []
+
+
+def test_retry_after_in_seconds(monkeypatch, sleeps):
+    use(monkeypatch, FakeSession(response(429, "7"), response(200)))
+
+    assert transport.get(URL).status_code == 200
+    assert sleeps == [7.0]
+
+
+def test_retry_after_as_http_date(monkeypatch, sleeps):
+    when = datetime.now(timezone.utc) + timedelta(seconds=20)
+    use(monkeypatch, FakeSession(response(503, format_datetime(when, usegmt=True)), response(200)))
+
+    assert transport.get(URL).status_code == 200
+    assert len(sleeps) == 1 and 18 <= sleeps[0] <= 20
+
+
+def test_gives_up_when_retry_after_exceeds_backoff_max(monkeypatch, sleeps):
+    session = use(monkeypatch, FakeSession(response(429, str(int(transport.BACKOFF_MAX) + 1)), response(200)))
+
+    assert transport.get(URL).status_code == 429
+    assert session.calls == 1 and sleeps == []
+
+
+def test_last_response_is_returned_after_max_retries(monkeypatch, sleeps):
+    session = use(monkeypatch, FakeSession(*[response(502) for _ in range(transport.MAX_RETRIES + 1)]))
+
+    assert transport.get(URL).status_code == 502
+    assert session.calls == transport.MAX_RETRIES + 1
+    assert len(sleeps) == transport.MAX_RETRIES
@@ -0,0 +1,33 @@
+import main
+import watch
+
+NOW = 1788000000
+
+
+def test_union_is_written_once_every_league_has_loaded(monkeypatch):
+    failing = {"2"}
+
+    def fetch_league_table(league_id):
+        if league_id in failing:
+            raise ConnectionError("upstream down")
+        return {"fixtures": [], "leagueTable": []}, f"digest-{league_id}"
+
+    monkeypatch.setattr(main, "fetch_active_season", lambda user_id: {"seasonid": "903"})
+    monkeypatch.setattr(main, "fetch_competitions", lambda user_id, season_id: [
+        {"fixtureid": "1", "name": "Premier"},
+        {"fixtureid": "2", "name": "Division 1"},
+    ])
+    monkeypatch.setattr(main, "fetch_league_table", fetch_league_table)
+    written = []
+    monkeypatch.setattr(watch.Watcher, "emit", lambda self, union: written.append(
+        sorted(c.league_id for c in union.competitions.values() if c.data is not None)
+    ))
+
+    watcher = watch.Watcher([1])
+    watcher.tick(NOW)
+    # Writing Premier alone would prune Division 1 from the outputs
+    assert written == []
+
+    failing.clear()
+    watcher.tick(NOW + watch.RETRY_INTERVAL)
+    assert written == [["1", "2"]]
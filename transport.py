@@ -0,0 +1,396 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from cache import ResponseCache
+from jsonstream import Document
+from output import atomic_write
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (5, 30)
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Maximum number of in-flight requests against a single API host
+DEFAULT_PER_HOST_LIMIT = 4
+POOL_SIZE = 16
+
+# Bytes read at a time when a response is streamed to disk
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+# ---------------------------------------------------------------------------
+# Session
+# ---------------------------------------------------------------------------
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the shared pooled session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+_cache: ResponseCache | None = None
+
+
+def set_cache(cache: ResponseCache | None) -> None:
+    """Enable (or disable with None) the conditional-request response cache."""
+    global _cache
+    _cache = cache
+
+
+def get_cache() -> ResponseCache | None:
+    return _cache
+
+
+# ---------------------------------------------------------------------------
+# Record / replay
+# ---------------------------------------------------------------------------
+
+_record_dir: Path | None = None
+_replay_dir: Path | None = None
+
+
+def set_record_dir(path: str | None) -> None:
+    """Archive every API response under path, keyed by url + params."""
+    global _record_dir
+    _record_dir = Path(path) if path else None
+
+
+def set_replay_dir(path: str | None) -> None:
+    """Serve every API request from an archive written with set_record_dir."""
+    global _replay_dir
+    _replay_dir = Path(path) if path else None
+
+
+def record(url: str, params: dict | None, data: dict) -> None:
+    entry = {
+        "url": url,
+        "params": {str(k): str(v) for k, v in (params or {}).items()},
+        "body": data,
+    }
+    path = _record_dir / f"{ResponseCache.key(url, params)}.json"
+    atomic_write(path, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+
+def record_file(url: str, params: dict | None, body_path: str) -> None:
+    """record() for a body on disk, copied into the archive without decoding it."""
+    envelope = json.dumps({
+        "url": url,
+        "params": {str(k): str(v) for k, v in (params or {}).items()},
+    }, ensure_ascii=False)
+
+    def chunks():
+        yield f'{envelope[:-1]}, "body": '.encode("utf-8")
+        with open(body_path, "rb") as f:
+            while chunk := f.read(STREAM_CHUNK_SIZE):
+                yield chunk
+        yield b"}"
+
+    atomic_write(_record_dir / f"{ResponseCache.key(url, params)}.json", chunks())
+
+
+def _replay_path(url: str, params: dict | None) -> Path:
+    path = _replay_dir / f"{ResponseCache.key(url, params)}.json"
+    if not path.exists():
+        raise RuntimeError(f"❌ No recorded response for {url} {params}")
+    return path
+
+
+def replay(url: str, params: dict | None) -> dict:
+    with open(_replay_path(url, params), encoding="utf-8") as f:
+        return json.load(f)["body"]
+
+
+# ---------------------------------------------------------------------------
+# Per-host limits
+# ---------------------------------------------------------------------------
+
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+_per_host_limit = DEFAULT_PER_HOST_LIMIT
+
+
+def set_per_host_limit(limit: int) -> None:
+    """Set the maximum number of concurrent requests allowed per host."""
+    global _per_host_limit
+    with _host_slots_lock:
+        _per_host_limit = max(1, limit)
+        _host_slots.clear()
+
+
+def host_slot(url: str) -> threading.BoundedSemaphore:
+    """Return the semaphore bounding concurrent requests to the url's host."""
+    host = urlsplit(url).netloc
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(_per_host_limit)
+        return slot
+
+
+# ---------------------------------------------------------------------------
+# Retries
+# ---------------------------------------------------------------------------
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry attempt."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def retry_after(response: requests.Response) -> float | None:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+# ---------------------------------------------------------------------------
+# Requests
+# ---------------------------------------------------------------------------
+
+def _release_on_close(response: requests.Response, slot: threading.BoundedSemaphore) -> None:
+    """Release slot once a streamed response is closed, i.e. its body has been read or dropped."""
+    close = response.close
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        try:
+            close()
+        finally:
+            if not released:
+                released = True
+                slot.release()
+
+    response.close = release
+
+
+def get(url: str, params: dict | None = None, headers: dict | None = None, stream: bool = False) -> requests.Response:
+    """GET a url through the shared session, retrying transient failures.
+
+    The last response is returned once retries are exhausted, or as soon
+    as Retry-After asks for more than BACKOFF_MAX seconds; callers are
+    expected to call ``raise_for_status`` themselves. With stream, the body
+    is left unread for iter_content() and the response holds its host slot
+    until it is closed, so callers must close it (e.g. ``with response:``).
+    """
+    session = get_session()
+
+    for attempt in range(MAX_RETRIES + 1):
+        start = time.perf_counter()
+        try:
+            slot = host_slot(url)
+            slot.acquire()
+            try:
+                response = session.get(url, params=params, headers=headers, timeout=TIMEOUT, stream=stream)
+            except BaseException:
+                slot.release()
+                raise
+            if stream:
+                _release_on_close(response, slot)
+            else:
+                slot.release()
+            metrics.add("http", seconds=time.perf_counter() - start, nbytes=0 if stream else len(response.content))
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"  🔁 {type(e).__name__} on {url}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        # A server asking for a longer pause than BACKOFF_MAX fails the request instead of stalling a worker
+        wait = retry_after(response) or 0.0
+        if wait > BACKOFF_MAX:
+            print(f"  ❌ HTTP {response.status_code} on {url}, Retry-After {wait:.0f}s exceeds {BACKOFF_MAX:.0f}s")
+            return response
+
+        delay = max(wait, backoff_delay(attempt))
+        print(f"  🔁 HTTP {response.status_code} on {url}, retrying in {delay:.1f}s")
+        response.close()
+        time.sleep(delay)
+
+    return response
+
+
+def fetch_json(url: str, params: dict | None = None, headers: dict | None = None) -> tuple[dict, str | None]:
+    """GET a url and return (parsed JSON, sha256 of the body).
+
+    With a cache enabled the request is made conditional on the cached
+    validators, and a 304 reports the digest of the cached body. Callers
+    compare the digest with the one their outputs were last built from;
+    the cache itself never decides what is unchanged, since a payload that
+    was fetched is not necessarily published. Without a cache, and when
+    replaying, the digest is None and every payload counts as changed.
+    """
+    if _replay_dir is not None:
+        return replay(url, params), None
+
+    data, digest = _fetch_json(url, params, headers)
+
+    if _record_dir is not None:
+        record(url, params, data)
+
+    return data, digest
+
+
+def _fetch_json(url: str, params: dict | None, headers: dict | None) -> tuple[dict, str | None]:
+    body, digest = _fetch_body(url, params, headers, _cache)
+    return json.loads(body), digest
+
+
+def _fetch_body(url: str, params: dict | None, headers: dict | None, cache: ResponseCache | None) -> tuple[bytes, str | None]:
+    if cache is None:
+        response = get(url, params=params, headers=headers)
+        response.raise_for_status()
+        return response.content, None
+
+    key = cache.key(url, params)
+    response = get(url, params=params, headers={**(headers or {}), **cache.validators(key)})
+
+    if response.status_code == 304:
+        body = cache.load(key)
+        if body is not None:
+            return body, cache.digest(key)
+        # Cache entry vanished underneath us, fetch unconditionally
+        response = get(url, params=params, headers=headers)
+
+    response.raise_for_status()
+    body = response.content
+    return body, cache.store(key, url, params, body, response.headers)
+
+
+def fetch_bytes(url: str, cache: ResponseCache | None = None, headers: dict | None = None) -> tuple[bytes, str | None]:
+    """GET a binary asset and return (body, sha256 of the body or None).
+
+    Conditional on the validators in cache, like fetch_json. Assets are not
+    part of record/replay archives, so when replaying only what cache
+    already holds is served.
+    """
+    if _replay_dir is not None:
+        body = cache.load(cache.key(url, None)) if cache else None
+        if body is None:
+            raise RuntimeError(f"❌ No cached copy of {url}")
+        return body, cache.digest(cache.key(url, None))
+
+    return _fetch_body(url, None, headers, cache)
+
+
+def fetch_document(
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+    root: tuple[str, ...] = (),
+) -> tuple[Document, str | None]:
+    """Like fetch_json, but stream the body to disk and return a Document over it.
+
+    The body is never held in memory: with a cache enabled the Document
+    reads the cached copy, otherwise a temporary spool file that
+    Document.discard() removes. Replayed responses are read from the
+    archive itself. root is the path of the object the Document exposes.
+    """
+    if _replay_dir is not None:
+        return Document(str(_replay_path(url, params)), ("body",) + root), None
+
+    document, digest = _fetch_document(url, params, headers, root)
+
+    if _record_dir is not None:
+        record_file(url, params, document.path)
+
+    return document, digest
+
+
+def _spool(response: requests.Response) -> str:
+    fd, path = tempfile.mkstemp(prefix="clubrugby-", suffix=".json")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                f.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def _fetch_document(url: str, params: dict | None, headers: dict | None, root: tuple[str, ...]) -> tuple[Document, str | None]:
+    cache = _cache
+    if cache is None:
+        with get(url, params=params, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            path = _spool(response)
+        metrics.add("http", calls=0, nbytes=os.path.getsize(path))
+        return Document(path, root, temporary=True), None
+
+    key = cache.key(url, params)
+    response = get(url, params=params, headers={**(headers or {}), **cache.validators(key)}, stream=True)
+
+    if response.status_code == 304:
+        response.close()
+        path = cache.body_path(key)
+        if path is not None:
+            return Document(str(path), root), cache.digest(key)
+        # Cache entry vanished underneath us, fetch unconditionally
+        response = get(url, params=params, headers=headers, stream=True)
+
+    with response:
+        response.raise_for_status()
+        digest = cache.store_stream(key, url, params, response.iter_content(STREAM_CHUNK_SIZE), response.headers)
+    path = cache.body_path(key)
+    metrics.add("http", calls=0, nbytes=os.path.getsize(path))
+    return Document(str(path), root), digest
+
+
+def get_json(url: str, params: dict | None = None, headers: dict | None = None) -> dict:
+    """GET a url and return parsed JSON."""
+    return fetch_json(url, params=params, headers=headers)[0]
@@ -0,0 +1,270 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import calendars
+import main
+import metrics
+import output
+import providers
+import search
+import transport
+from registry import ClubRegistry
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Polling starts this long before kickoff ...
+PRE_KICKOFF = 15 * 60
+# ... and stays tight until the score has usually been entered
+LIVE_WINDOW = 2 * 3600 + 30 * 60
+# Late results are still picked up for a while after the match
+SCORE_GRACE = 12 * 3600
+
+LIVE_INTERVAL = 2 * 60
+RECENT_INTERVAL = 30 * 60
+IDLE_INTERVAL = 12 * 3600
+
+# How often the season and competition lists are re-read
+COMPETITIONS_INTERVAL = 6 * 3600
+
+# Failed refreshes and writes are retried after this long
+RETRY_INTERVAL = 10 * 60
+
+
+# ---------------------------------------------------------------------------
+# Scheduling
+# ---------------------------------------------------------------------------
+
+def next_refresh(fixtures: list[dict], now: float) -> float:
+    """When a competition with these raw fixtures should next be polled."""
+    kickoffs = [f["fixtureDate"] for f in fixtures if isinstance(f.get("fixtureDate"), (int, float))]
+
+    if any(k - PRE_KICKOFF <= now <= k + LIVE_WINDOW for k in kickoffs):
+        return now + LIVE_INTERVAL
+
+    delay = IDLE_INTERVAL
+    if any(k + LIVE_WINDOW < now <= k + SCORE_GRACE for k in kickoffs):
+        delay = RECENT_INTERVAL
+
+    upcoming = [k for k in kickoffs if k > now]
+    if upcoming:
+        delay = min(delay, max(min(upcoming) - PRE_KICKOFF - now, LIVE_INTERVAL))
+
+    return now + delay
+
+
+def payload_digest(data: dict) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# State
+# ---------------------------------------------------------------------------
+
+class Competition:
+    __slots__ = ("league_id", "name", "data", "digest", "changed", "next_poll")
+
+    def __init__(self, league_id, name: str):
+        self.league_id = league_id
+        self.name = name
+        self.data: dict | None = None
+        self.digest: str | None = None
+        # Changed since its union's outputs were last written
+        self.changed = False
+        self.next_poll = 0.0
+
+
+class Union:
+    __slots__ = ("user_id", "code", "season_id", "year", "competitions", "next_refresh", "dirty")
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.code = main.UNIONS.get(user_id, "UNKNOWN").lower()
+        self.season_id: str | None = None
+        # Output directory year, as main.scrape resolves it
+        self.year: int | None = None
+        self.competitions: dict[str, Competition] = {}
+        self.next_refresh = 0.0
+        self.dirty = False
+
+
+# ---------------------------------------------------------------------------
+# Watcher
+# ---------------------------------------------------------------------------
+
+class Watcher:
+    """Keeps every union's league tables in memory and re-polls them on a schedule."""
+
+    def __init__(self, user_ids: list[int], known_clubs: ClubRegistry | None = None):
+        self.unions = [Union(user_id) for user_id in user_ids]
+        self.known_clubs = known_clubs
+
+    def refresh_union(self, union: Union, now: float) -> None:
+        """Re-read the active season and its competition list."""
+        union.next_refresh = now + RETRY_INTERVAL
+        season = main.fetch_active_season(union.user_id)
+        union.next_refresh = now + COMPETITIONS_INTERVAL
+        season_id = season and season.get("seasonid")
+
+        if not season_id:
+            # Finished season: nothing to poll until a new one is activated
+            if union.competitions:
+                print(f"💤 {union.code.upper()} has no active season, pausing")
+            union.season_id = None
+            union.competitions = {}
+            return
+
+        if season_id != union.season_id:
+            union.season_id = season_id
+            union.year = main.output_year()
+            union.competitions = {}
+
+        seen = {}
+        for comp in main.fetch_competitions(union.user_id, season_id):
+            league_id = comp.get("fixtureid")
+            league_name = comp.get("name")
+            if not league_id or not league_name:
+                continue
+            seen[league_id] = union.competitions.get(league_id) or Competition(league_id, league_name)
+            seen[league_id].name = league_name
+
+        if list(seen) != list(union.competitions):
+            union.dirty = True
+        union.competitions = seen
+
+    def refresh_competition(self, union: Union, comp: Competition, now: float) -> None:
+        # Rescheduled up front, so a failed fetch is retried rather than polled every tick
+        comp.next_poll = now + RETRY_INTERVAL
+        data, digest = main.fetch_league_table(comp.league_id)
+
+        # Without a response cache there is no body digest to compare
+        digest = digest or payload_digest(data)
+        if digest != comp.digest:
+            comp.data = data
+            comp.digest = digest
+            comp.changed = True
+            union.dirty = True
+            print(f"  🔄 {union.code.upper()} {comp.name.strip()} changed")
+
+        comp.next_poll = next_refresh(comp.data["fixtures"], now)
+
+    def emit(self, union: Union) -> None:
+        """Rewrite the union's outputs; unchanged files are skipped by the writer."""
+        comps = list(union.competitions.values())
+        results = [(c.league_id, c.name, c.data, c.changed) for c in comps]
+
+        output_dir = os.path.join("src/data/", union.code, str(union.year))
+        os.makedirs(output_dir, exist_ok=True)
+
+        # Digests of decoded payloads would never match the ones a scrape compares
+        digests = {c.league_id: c.digest for c in comps} if transport.get_cache() else None
+        main.process_union(union.code, union.year, output_dir, results, self.known_clubs, digests=digests)
+
+        for comp in comps:
+            comp.changed = False
+        union.dirty = False
+
+        if calendars.collect_enabled():
+            main.collect_calendars()
+        if search.enabled():
+            search.build()
+        output.save_manifest()
+        if self.known_clubs is not None:
+            self.known_clubs.save()
+
+    def tick(self, now: float) -> float:
+        """Run everything that is due; return the time of the next due item.
+
+        Each refresh and write fails on its own: the other unions and
+        competitions still run, and the failed item is retried later.
+        """
+        due = []
+        for union in self.unions:
+            if now >= union.next_refresh:
+                try:
+                    self.refresh_union(union, now)
+                except Exception as e:
+                    print(f"❌ {union.code.upper()} refresh failed: {e}")
+
+            for comp in union.competitions.values():
+                if now >= comp.next_poll:
+                    try:
+                        self.refresh_competition(union, comp, now)
+                    except Exception as e:
+                        print(f"❌ {union.code.upper()} {comp.name.strip()} refresh failed: {e}")
+
+            # Leagues missing from a write are pruned, so wait until every one has loaded
+            if union.dirty and all(c.data is not None for c in union.competitions.values()):
+                try:
+                    self.emit(union)
+                except Exception as e:
+                    print(f"❌ {union.code.upper()} write failed: {e}")
+                    due.append(now + RETRY_INTERVAL)
+
+        due += [union.next_refresh for union in self.unions]
+        due += [c.next_poll for union in self.unions for c in union.competitions.values()]
+        return min(due)
+
+    def run(self, once: bool = False) -> None:
+        print(f"👀 Watching {len(self.unions)} union(s)")
+        while True:
+            try:
+                wake = self.tick(time.time())
+            except Exception as e:
+                # Keep the daemon alive; the failed items are retried next tick
+                print(f"❌ Refresh failed: {e}")
+                wake = time.time() + LIVE_INTERVAL
+
+            if once:
+                return
+
+            delay = max(0.0, wake - time.time())
+            print(f"⏳ Next refresh in {delay / 60:.1f} min")
+            time.sleep(delay)
+
+
+# ---------------------------------------------------------------------------
+# Entrypoint
+# ---------------------------------------------------------------------------
+
+def main_watch():
+    parser = argparse.ArgumentParser(description="Continuously refresh rugby union data")
+    parser.add_argument(
+        "--unions",
+        nargs="+",
+        type=str,
+        default=["ALL"],
+        help="Union codes to watch (default: ALL)",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run a single refresh pass and exit",
+    )
+    providers.add_shared_arguments(parser)
+    args = parser.parse_args()
+
+    user_ids = main.resolve_unions(args.unions)
+    if not user_ids:
+        print("❌ No valid union codes provided")
+        exit(1)
+
+    calendars.set_backend("fast")
+    providers.configure(args)
+
+    try:
+        with metrics.profiled(args.profile):
+            Watcher(user_ids, ClubRegistry.load()).run(once=args.once)
+    except KeyboardInterrupt:
+        print("👋 Stopping watch")
+    finally:
+        providers.finish(args)
+
+
+if __name__ == "__main__":
+    main_watch()